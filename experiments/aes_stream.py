@@ -0,0 +1,196 @@
+import os
+import struct
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+STREAM_MAGIC = b"FZGS"
+STREAM_VERSION = 1
+CHUNK_BYTES = 64 * 1024
+TAG_BYTES = 16
+NONCE_BYTES = 12
+NONCE_PREFIX_BYTES = 7
+MAX_CHUNKS = 2 ** 32
+
+# magic || version (u8) || chunk size (u32) || nonce prefix; also the AAD of every chunk
+_HEADER = struct.Struct(f"<4sBI{NONCE_PREFIX_BYTES}s")
+
+
+class _IterableReader:
+    """
+    File-like ``read(n)`` over an iterable of byte strings.
+    """
+
+    def __init__(self, pieces):
+        self._pieces = iter(pieces)
+        self._buffer = bytearray()
+
+    def read(self, size):
+        while len(self._buffer) < size:
+            piece = next(self._pieces, None)
+            if piece is None:
+                break
+            self._buffer += piece
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+
+def _as_reader(source):
+    return source if hasattr(source, "read") else _IterableReader(source)
+
+
+def _read_exactly(reader, size):
+    """
+    Read ``size`` bytes, fewer only at end of stream (short reads from pipes are retried).
+    """
+    data = reader.read(size)
+    if len(data) == size or not data:
+        return data
+    parts = [data]
+    remaining = size - len(data)
+    while remaining:
+        data = reader.read(remaining)
+        if not data:
+            break
+        parts.append(data)
+        remaining -= len(data)
+    return b"".join(parts)
+
+
+def _blocks_with_last_flag(reader, size):
+    """
+    Yield (block, is_last) for fixed-size blocks; reads one block ahead to know which is last.
+    """
+    current = _read_exactly(reader, size)
+    while True:
+        following = _read_exactly(reader, size) if len(current) == size else b""
+        if not following:
+            yield current, True
+            return
+        yield current, False
+        current = following
+
+
+def _chunk_nonce(prefix, counter, is_last):
+    if counter >= MAX_CHUNKS:
+        raise OverflowError(f"A stream can hold at most {MAX_CHUNKS} chunks")
+    return prefix + counter.to_bytes(4, "big") + (b"\x01" if is_last else b"\x00")
+
+
+def encrypt_stream(key, source, chunk_size=CHUNK_BYTES):
+    """
+    Encrypt a byte stream with AES-GCM in fixed-size chunks (the STREAM construction).
+
+    Chunk i is sealed under nonce = random prefix || i || last-chunk flag with
+    the stream header as associated data, so reordering, dropping,
+    truncating or extending chunks makes decryption fail. One AESGCM context
+    is reused for the whole stream and memory stays at about two chunks.
+
+    :param key: AES key (16, 24 or 32 bytes), e.g. ``derive_aes_key(proxy_key)``
+    :param source: Binary file-like object, or iterable of bytes
+    :param chunk_size: Plaintext bytes per chunk
+    :return: Iterator of ciphertext pieces: the header, then one sealed chunk at a time
+    """
+    if not 0 < chunk_size < 2 ** 32:
+        raise ValueError(f"chunk_size must be between 1 and 2^32 - 1, got {chunk_size}")
+    aead = AESGCM(key)
+    prefix = os.urandom(NONCE_PREFIX_BYTES)
+    header = _HEADER.pack(STREAM_MAGIC, STREAM_VERSION, chunk_size, prefix)
+    yield header
+
+    for counter, (block, is_last) in enumerate(_blocks_with_last_flag(_as_reader(source), chunk_size)):
+        yield aead.encrypt(_chunk_nonce(prefix, counter, is_last), block, header)
+
+
+def decrypt_stream(key, source):
+    """
+    Decrypt and authenticate a stream produced by ``encrypt_stream``, one chunk at a time.
+
+    Plaintext is released chunk by chunk as each tag verifies; a stream that
+    is cut short or tampered with raises before its remaining data is
+    released, but earlier chunks have already been yielded.
+
+    :param key: AES key used to encrypt
+    :param source: Binary file-like object, or iterable of bytes
+    :return: Iterator of plaintext chunks
+    :raises cryptography.exceptions.InvalidTag: If any chunk fails authentication (including truncation)
+    :raises ValueError: If the header is malformed
+    """
+    reader = _as_reader(source)
+    header = _read_exactly(reader, _HEADER.size)
+    if len(header) != _HEADER.size:
+        raise ValueError("Stream is shorter than its header")
+    magic, version, chunk_size, prefix = _HEADER.unpack(header)
+    if magic != STREAM_MAGIC or version != STREAM_VERSION:
+        raise ValueError(f"Not a version {STREAM_VERSION} encrypted stream")
+
+    aead = AESGCM(key)
+    for counter, (sealed, is_last) in enumerate(_blocks_with_last_flag(reader, chunk_size + TAG_BYTES)):
+        yield aead.decrypt(_chunk_nonce(prefix, counter, is_last), sealed, header)
+
+
+def encrypt_file(key, input_path, output_path, chunk_size=CHUNK_BYTES):
+    """
+    Encrypt a file of any size with ``encrypt_stream``.
+    """
+    with open(input_path, "rb") as source, open(output_path, "wb") as sink:
+        for piece in encrypt_stream(key, source, chunk_size):
+            sink.write(piece)
+
+
+def decrypt_file(key, input_path, output_path):
+    """
+    Decrypt a file written by ``encrypt_file``.
+
+    Plaintext goes to a temporary file that replaces output_path only once
+    the whole stream has authenticated, so a failure leaves any existing
+    output untouched.
+    """
+    temporary_path = f"{output_path}.tmp"
+    try:
+        with open(input_path, "rb") as source, open(temporary_path, "wb") as sink:
+            for chunk in decrypt_stream(key, source):
+                sink.write(chunk)
+        os.replace(temporary_path, output_path)
+    except BaseException:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+        raise
+
+
+def encrypt_batch(key, messages, associated_data=None):
+    """
+    Encrypt many small messages under one key with a single AESGCM context.
+
+    Each message gets its own random 96-bit nonce (all drawn in one call),
+    which is safe for up to about 2^32 messages per key.
+
+    :param key: AES key
+    :param messages: Iterable of bytes
+    :param associated_data: Optional bytes authenticated with every message
+    :return: List of nonce || ciphertext || tag
+    """
+    messages = list(messages)
+    aead = AESGCM(key)
+    nonces = os.urandom(NONCE_BYTES * len(messages))
+    sealed = []
+    for i, message in enumerate(messages):
+        nonce = nonces[i * NONCE_BYTES:(i + 1) * NONCE_BYTES]
+        sealed.append(nonce + aead.encrypt(nonce, message, associated_data))
+    return sealed
+
+
+def decrypt_batch(key, sealed_messages, associated_data=None):
+    """
+    Decrypt messages produced by ``encrypt_batch``.
+
+    :param key: AES key
+    :param sealed_messages: Iterable of nonce || ciphertext || tag
+    :param associated_data: Associated data given at encryption
+    :return: List of plaintexts
+    :raises cryptography.exceptions.InvalidTag: If any message fails authentication
+    """
+    aead = AESGCM(key)
+    return [
+        aead.decrypt(sealed[:NONCE_BYTES], sealed[NONCE_BYTES:], associated_data)
+        for sealed in sealed_messages
+    ]
@@ -0,0 +1,263 @@
+import argparse
+import asyncio
+import hashlib
+import hmac
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from experiments.fc import check_ecc_bytes, fuzzy_commitment_login, fuzzy_commitment_register
+from experiments.hkdf import derive_aes_key, derive_aes_keys
+from linear_sketch.linear_sketch import LinearSketch
+
+
+class ServiceOverloaded(RuntimeError):
+    """
+    Raised when the login queue is full and the service is set to reject instead of wait.
+    """
+
+
+class AuthService:
+    """
+    Asyncio front end for registration and login with sketch + DiffRec + HKDF.
+
+    Registration stores the enrolled sketch c1 and SHA-256 of the AES key
+    derived from a1. Login sketches the fresh scan, recovers a1 with DiffRec
+    and returns the AES key if its hash matches.
+
+    Concurrent logins are queued and coalesced into micro-batches of up to
+    ``max_batch`` requests (waiting at most ``max_delay`` seconds after the
+    first one), so a batch is sketched and decoded in one vectorized call.
+    The CPU-bound work runs on a bounded thread pool, at most ``workers``
+    batches at a time. The queue holds at most ``max_pending`` logins; when
+    it is full callers wait (or get ``ServiceOverloaded``), which keeps tail
+    latency bounded instead of letting work pile up.
+
+    Use as ``async with AuthService(linear_sketch) as service: ...``; the
+    service object is itself the in-process client.
+    """
+
+    def __init__(self, linear_sketch, workers=4, max_batch=64, max_delay=0.002, max_pending=4096,
+                 reject_when_full=False, ecc_bytes=2):
+        """
+        :param linear_sketch: LinearSketch shared by every request
+        :param workers: Threads running CPU-bound work, and the number of batches in flight
+        :param max_batch: Largest login micro-batch
+        :param max_delay: Longest wait (seconds) for a micro-batch to fill
+        :param max_pending: Logins queued before backpressure applies
+        :param reject_when_full: Raise ServiceOverloaded instead of waiting for queue space
+        :param ecc_bytes: RS parity bytes of the fuzzy commitments; must leave part of the sketch uncorrected
+        """
+        check_ecc_bytes(linear_sketch.lattice.dimension, ecc_bytes)
+        self.linear_sketch = linear_sketch
+        self.workers = workers
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.max_pending = max_pending
+        self.reject_when_full = reject_when_full
+        self.ecc_bytes = ecc_bytes
+        self._users = {}
+        self._executor = None
+        self._queue = None
+        self._slots = None
+        self._batcher = None
+        self._in_flight = set()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    async def start(self):
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="auth")
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._slots = asyncio.Semaphore(self.workers)
+        self._batcher = asyncio.create_task(self._run_batches())
+
+    async def stop(self):
+        """
+        Finish queued logins, then shut down the batcher and the thread pool.
+        """
+        if self._batcher is None:
+            return
+        await self._queue.join()
+        self._batcher.cancel()
+        try:
+            await self._batcher
+        except asyncio.CancelledError:
+            pass
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight)
+        self._executor.shutdown()
+        self._batcher = None
+
+    async def _run_in_executor(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    def _register(self, vector):
+        sketch, proxy_key = self.linear_sketch.sketch(vector)
+        aes_key = derive_aes_key(proxy_key)
+        return sketch, hashlib.sha256(aes_key).digest()
+
+    async def register(self, user_id, vector):
+        """
+        Enroll a user, replacing any previous enrolment.
+
+        :param user_id: Hashable user id
+        :param vector: Fingerprint feature vector
+        """
+        self._users[user_id] = await self._run_in_executor(self._register, vector)
+
+    async def login(self, user_id, vector):
+        """
+        Authenticate a fresh scan; the request joins the next micro-batch.
+
+        :param user_id: Id used at registration
+        :param vector: Fingerprint feature vector of the fresh scan
+        :return: AES key (bytes), or None if the user is unknown or the key does not match
+        """
+        future = asyncio.get_running_loop().create_future()
+        item = (user_id, np.asarray(vector, dtype=np.float64), future)
+        if self.reject_when_full:
+            try:
+                self._queue.put_nowait(item)
+            except asyncio.QueueFull:
+                raise ServiceOverloaded(f"{self.max_pending} logins already pending") from None
+        else:
+            await self._queue.put(item)
+        return await future
+
+    async def _run_batches(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            # Take a worker slot before draining the queue, so a busy pool leaves requests queued
+            await self._slots.acquire()
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                item = await self._get_before(timeout)
+                if item is None:
+                    break
+                batch.append(item)
+            task = asyncio.create_task(self._finish_batch(batch))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _get_before(self, timeout):
+        """
+        Next queued login, or None if none arrives within timeout seconds.
+
+        Unlike ``asyncio.wait_for`` before Python 3.12, an item taken just as
+        the timeout fires is returned rather than dropped (which would leave
+        ``task_done`` uncalled and ``stop`` waiting forever).
+        """
+        getter = asyncio.ensure_future(self._queue.get())
+        try:
+            done, _ = await asyncio.wait({getter}, timeout=timeout)
+            if not done:
+                # The get may still win the race; wait for it to settle either way
+                getter.cancel()
+                await asyncio.wait({getter})
+        except asyncio.CancelledError:
+            getter.cancel()
+            raise
+        return None if getter.cancelled() else getter.result()
+
+    async def _finish_batch(self, batch):
+        try:
+            enrolled = [self._users.get(user_id) for user_id, _, _ in batch]
+            vectors = np.stack([vector for _, vector, _ in batch])
+            keys = await self._run_in_executor(self._login_batch, vectors, enrolled)
+            for (_, _, future), key in zip(batch, keys):
+                if not future.done():
+                    future.set_result(key)
+        except Exception as error:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+        finally:
+            self._slots.release()
+            for _ in batch:
+                self._queue.task_done()
+
+    def _login_batch(self, vectors, enrolled):
+        """
+        Worker: sketch a batch of scans, recover the enrolled proxy keys and check the key hashes.
+        """
+        known = [i for i, entry in enumerate(enrolled) if entry is not None]
+        keys = [None] * len(enrolled)
+        if not known:
+            return keys
+
+        sketches, proxy_keys = self.linear_sketch.sketch_batch(vectors[known])
+        enrolled_sketches = np.stack([enrolled[i][0] for i in known])
+        _, recovered = self.linear_sketch.diff_rec_batch(sketches, enrolled_sketches, proxy_keys)
+        for i, aes_key in zip(known, derive_aes_keys(recovered)):
+            if hmac.compare_digest(hashlib.sha256(aes_key).digest(), enrolled[i][1]):
+                keys[i] = aes_key
+        return keys
+
+    async def commitment_register(self, vector):
+        """
+        Run ``fuzzy_commitment_register`` with the service's ECC size on the thread pool.
+        """
+        return await self._run_in_executor(fuzzy_commitment_register, self.linear_sketch, vector, self.ecc_bytes)
+
+    async def commitment_login(self, vector, commitment, key_hash):
+        """
+        Run ``fuzzy_commitment_login`` with the service's ECC size on the thread pool.
+        """
+        return await self._run_in_executor(
+            fuzzy_commitment_login, self.linear_sketch, vector, commitment, key_hash, self.ecc_bytes
+        )
+
+
+async def _load_test(users, logins, noise, seed, **service_options):
+    basis_vectors = [[1, 0], [0.5, np.sqrt(3) / 2]]
+    linear_sketch = LinearSketch(basis_vectors, 7)
+    rng = np.random.default_rng(seed)
+    templates = rng.normal(0, 300, size=(users, 2))
+
+    async with AuthService(linear_sketch, **service_options) as service:
+        await asyncio.gather(*(service.register(user_id, template) for user_id, template in enumerate(templates)))
+
+        latencies = []
+
+        async def timed_login(user_id):
+            start = time.perf_counter()
+            key = await service.login(user_id, templates[user_id] + rng.normal(0, noise, size=2))
+            latencies.append(time.perf_counter() - start)
+            return key is not None
+
+        start = time.perf_counter()
+        accepted = await asyncio.gather(*(timed_login(int(user_id)) for user_id in rng.integers(0, users, size=logins)))
+        elapsed = time.perf_counter() - start
+
+    latencies = np.array(latencies) * 1e3
+    print(f"{logins} concurrent logins in {elapsed:.2f} s ({logins / elapsed:.0f}/s), accepted {np.mean(accepted):.3f}")
+    print(f"latency p50 {np.percentile(latencies, 50):.1f} ms, p99 {np.percentile(latencies, 99):.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the async registration/login service in-process.")
+    parser.add_argument("--users", type=int, default=1000, help="Enrolled users")
+    parser.add_argument("--logins", type=int, default=5000, help="Concurrent logins")
+    parser.add_argument("--noise", type=float, default=0.01, help="Standard deviation of the login scan noise")
+    parser.add_argument("--workers", type=int, default=4, help="Executor threads")
+    parser.add_argument("--max-batch", type=int, default=64, help="Largest login micro-batch")
+    parser.add_argument("--max-pending", type=int, default=4096, help="Queued logins before backpressure")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for templates and noise")
+    args = parser.parse_args()
+
+    asyncio.run(_load_test(
+        args.users, args.logins, args.noise, args.seed,
+        workers=args.workers, max_batch=args.max_batch, max_pending=args.max_pending,
+    ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+import argparse
+import contextlib
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+import numpy as np
+
+RAW_DATA_DIR = "data/raw/fingerprints"
+RESULTS_DIR = "results/benchmarks"
+TRIANGULAR_BASIS = [[1, 0], [0.5, np.sqrt(3) / 2]]
+MODULUS = 7
+
+
+def run_stage(name, fn, iterations, warmup):
+    """
+    Time a benchmark stage and measure its peak memory.
+
+    Latencies come from a plain timed loop; peak memory comes from a separate
+    tracemalloc pass so tracing overhead does not leak into the timings.
+
+    :param name: Stage name
+    :param fn: Zero-argument callable running one operation
+    :param iterations: Number of timed calls
+    :param warmup: Number of untimed calls made first
+    :return: Dict of stage metrics
+    """
+    # Several stages print as they go; keep the harness output readable
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for _ in range(warmup):
+            fn()
+
+        latencies = np.empty(iterations)
+        for i in range(iterations):
+            start = time.perf_counter()
+            fn()
+            latencies[i] = time.perf_counter() - start
+
+        tracemalloc.start()
+        fn()
+        _, peak_bytes = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    total_seconds = float(np.sum(latencies))
+    return {
+        "stage": name,
+        "iterations": iterations,
+        "throughput_per_s": iterations / total_seconds if total_seconds > 0 else float("inf"),
+        "latency_p50_us": float(np.percentile(latencies, 50) * 1e6),
+        "latency_p99_us": float(np.percentile(latencies, 99) * 1e6),
+        "latency_mean_us": float(np.mean(latencies) * 1e6),
+        "peak_memory_bytes": int(peak_bytes),
+    }
+
+
+def build_stages(seed, raw_data_dir):
+    """
+    Build the zero-argument callables benchmarked for each pipeline stage.
+
+    Heavy dependencies are imported here so that ``--stages`` can skip them.
+
+    :param seed: Seed for the synthetic fingerprint vectors
+    :param raw_data_dir: Directory holding the raw .bmp fingerprints
+    :return: Dict mapping stage name to a factory returning the callable
+    """
+    rng = np.random.default_rng(seed)
+    fingerprint_1 = rng.normal(0, 300, size=2)
+    fingerprint_2 = fingerprint_1 + rng.normal(0, 0.01, size=2)
+
+    def preprocess():
+        from preprocessing.preprocess_fingerprints import preprocess_fingerprints_as_float
+
+        image_paths = sorted(
+            os.path.join(raw_data_dir, file) for file in os.listdir(raw_data_dir) if file.endswith(".bmp")
+        )
+        return lambda: preprocess_fingerprints_as_float(image_paths)
+
+    def sketch():
+        from linear_sketch.linear_sketch import LinearSketch
+
+        linear_sketch = LinearSketch(TRIANGULAR_BASIS, MODULUS)
+        return lambda: linear_sketch.sketch(fingerprint_1)
+
+    def diff_rec():
+        from linear_sketch.linear_sketch import LinearSketch
+
+        linear_sketch = LinearSketch(TRIANGULAR_BASIS, MODULUS)
+        sketch_1, _ = linear_sketch.sketch(fingerprint_1)
+        sketch_2, _ = linear_sketch.sketch(fingerprint_2)
+        return lambda: linear_sketch.diff_rec(sketch_1, sketch_2)
+
+    def hkdf():
+        from experiments.hkdf import derive_aes_key
+
+        return lambda: derive_aes_key(5)
+
+    def keygen():
+        from linear_sketch.linear_sketch import LinearSketch
+        from signature.key_generation import generate_key_pair
+
+        linear_sketch = LinearSketch(TRIANGULAR_BASIS, MODULUS)
+        sketch_1, _ = linear_sketch.sketch(fingerprint_1)
+        lattice_basis = np.array(TRIANGULAR_BASIS)
+        return lambda: generate_key_pair(sketch_1, lattice_basis)
+
+    def sign():
+        from signature.fuzzy_signature import sign
+        from signature.key_generation import generate_key_pair
+
+        key_pair = generate_key_pair(fingerprint_1, np.array(TRIANGULAR_BASIS))
+        return lambda: sign(key_pair["private_key"], b"benchmark message")
+
+    def verify():
+        from signature.fuzzy_signature import sign, verify
+        from signature.key_generation import generate_key_pair
+
+        key_pair = generate_key_pair(fingerprint_1, np.array(TRIANGULAR_BASIS))
+        signature = sign(key_pair["private_key"], b"benchmark message")
+        return lambda: verify(key_pair["public_key"], b"benchmark message", signature)
+
+    def aes_encrypt():
+        from experiments.fuzzy_aes import aes_encrypt
+
+        key = bytes(range(32))
+        plaintext = "This is a test message for AES encryption." * 24  # ~1 KiB
+        return lambda: aes_encrypt(key, plaintext)
+
+    def aes_decrypt():
+        from experiments.fuzzy_aes import aes_decrypt, aes_encrypt
+
+        key = bytes(range(32))
+        ciphertext, iv = aes_encrypt(key, "This is a test message for AES encryption." * 24)
+        return lambda: aes_decrypt(key, ciphertext, iv)
+
+    return {
+        "preprocess": preprocess,
+        "sketch": sketch,
+        "diff_rec": diff_rec,
+        "hkdf": hkdf,
+        "keygen": keygen,
+        "sign": sign,
+        "verify": verify,
+        "aes_encrypt": aes_encrypt,
+        "aes_decrypt": aes_decrypt,
+    }
+
+
+def compare_to_baseline(results, baseline_path, tolerance):
+    """
+    Flag stages whose p50 latency regressed by more than ``tolerance`` against a previous report.
+
+    :param results: Stage results from this run
+    :param baseline_path: Path to an earlier JSON report
+    :param tolerance: Allowed relative slowdown (0.2 means 20%)
+    :return: List of (stage, baseline_us, current_us) for regressed stages
+    """
+    with open(baseline_path) as f:
+        baseline = {stage["stage"]: stage for stage in json.load(f)["stages"]}
+
+    regressions = []
+    for stage in results:
+        previous = baseline.get(stage["stage"])
+        if previous and stage["latency_p50_us"] > previous["latency_p50_us"] * (1 + tolerance):
+            regressions.append((stage["stage"], previous["latency_p50_us"], stage["latency_p50_us"]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the fingerprint-to-key pipeline stage by stage.")
+    parser.add_argument("--iterations", type=int, default=1000, help="Timed calls per stage")
+    parser.add_argument("--preprocess-iterations", type=int, default=20, help="Timed calls for preprocessing")
+    parser.add_argument("--warmup", type=int, default=10, help="Untimed calls before timing")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for synthetic fingerprint vectors")
+    parser.add_argument("--stages", nargs="+", help="Subset of stages to run (default: all)")
+    parser.add_argument("--raw-data-dir", default=RAW_DATA_DIR, help="Directory of raw .bmp fingerprints")
+    parser.add_argument("--output", help="JSON report path (default: results/benchmarks/<timestamp>.json)")
+    parser.add_argument("--baseline", help="Earlier JSON report to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative p50 slowdown vs baseline")
+    args = parser.parse_args()
+
+    stages = build_stages(args.seed, args.raw_data_dir)
+    selected = args.stages or list(stages)
+    unknown = set(selected) - set(stages)
+    if unknown:
+        parser.error(f"Unknown stages: {', '.join(sorted(unknown))}")
+
+    results = []
+    print(f"{'stage':<14}{'ops/s':>12}{'p50 (µs)':>12}{'p99 (µs)':>12}{'peak mem (KiB)':>16}")
+    for name in selected:
+        iterations = args.preprocess_iterations if name == "preprocess" else args.iterations
+        result = run_stage(name, stages[name](), iterations, args.warmup)
+        results.append(result)
+        print(
+            f"{name:<14}{result['throughput_per_s']:>12.1f}{result['latency_p50_us']:>12.1f}"
+            f"{result['latency_p99_us']:>12.1f}{result['peak_memory_bytes'] / 1024:>16.1f}"
+        )
+
+    timestamp = datetime.now(timezone.utc)
+    report = {
+        "timestamp": timestamp.isoformat(),
+        "environment": {
+            "python": sys.version.split()[0],
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+            "cpu_count": os.cpu_count(),
+        },
+        "config": {"iterations": args.iterations, "warmup": args.warmup, "seed": args.seed},
+        "stages": results,
+    }
+
+    output_path = args.output or os.path.join(RESULTS_DIR, f"benchmark_{timestamp:%Y%m%dT%H%M%SZ}.json")
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    with open(output_path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Benchmark report saved to {output_path}")
+
+    if args.baseline:
+        regressions = compare_to_baseline(results, args.baseline, args.tolerance)
+        for stage, previous_us, current_us in regressions:
+            print(f"Regression in {stage}: p50 {previous_us:.1f} µs -> {current_us:.1f} µs")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# Optional backends that the login path must not pull in
+HEAVY_MODULES = ("Crypto", "cryptography", "reedsolo", "cv2", "sklearn", "scipy", "matplotlib")
+
+ENTRY_POINTS = {
+    "login": "from linear_sketch import LinearSketch; from experiments.hkdf import derive_aes_key",
+    "linear_sketch": "import linear_sketch",
+    "signature": "import signature",
+    "key_generation": "import signature.key_generation",
+    "fuzzy_signature": "import signature.fuzzy_signature",
+    "fc": "import experiments.fc",
+    "aes_stream": "import experiments.aes_stream",
+    "preprocess": "import preprocessing.preprocess_fingerprints",
+    "pca_projector": "import preprocessing.pca_projector",
+}
+
+_REPORT_LOADED = (
+    "; import json as _json, sys as _sys"
+    f"; print(_json.dumps(sorted(m for m in _sys.modules if m.split('.')[0] in {HEAVY_MODULES!r})))"
+)
+
+
+def _import_time_us(stderr):
+    """
+    Total cumulative import time of the top-level imports in ``-X importtime`` output.
+    """
+    total = 0
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit() and not name.startswith("  "):
+            total += int(cumulative)
+    return total
+
+
+def measure_import(statement, runs=5):
+    """
+    Cold-start cost of an import statement, each run in a fresh interpreter.
+
+    :param statement: Python import statement(s)
+    :param runs: Number of fresh interpreters
+    :return: Dict with median import and process times (ms) and the heavy modules left loaded
+    """
+    import_us = []
+    process_s = []
+    loaded = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", statement + _REPORT_LOADED],
+            capture_output=True, text=True, check=True,
+        )
+        process_s.append(time.perf_counter() - start)
+        import_us.append(_import_time_us(completed.stderr))
+        loaded = json.loads(completed.stdout.strip().splitlines()[-1])
+    return {
+        "import_ms": statistics.median(import_us) / 1e3,
+        "process_ms": statistics.median(process_s) * 1e3,
+        "heavy_modules": loaded,
+    }
+
+
+def heavy_modules_loaded(statement):
+    """
+    :param statement: Python import statement(s)
+    :return: Sorted heavy modules present in sys.modules after running it in a fresh interpreter
+    """
+    completed = subprocess.run(
+        [sys.executable, "-c", statement + _REPORT_LOADED], capture_output=True, text=True, check=True
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold-start import time of each entry point.")
+    parser.add_argument("--entry-points", nargs="+", help="Subset of entry points (default: all)")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per entry point")
+    parser.add_argument("--output", help="Optional JSON report path")
+    args = parser.parse_args()
+
+    selected = args.entry_points or list(ENTRY_POINTS)
+    unknown = set(selected) - set(ENTRY_POINTS)
+    if unknown:
+        parser.error(f"Unknown entry points: {', '.join(sorted(unknown))}")
+
+    results = {}
+    print(f"{'entry point':<18}{'import (ms)':>12}{'process (ms)':>14}  heavy modules")
+    for name in selected:
+        result = measure_import(ENTRY_POINTS[name], args.runs)
+        results[name] = result
+        top_level = sorted({module.split(".")[0] for module in result["heavy_modules"]})
+        print(f"{name:<18}{result['import_ms']:>12.1f}{result['process_ms']:>14.1f}  {', '.join(top_level) or '-'}")
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump({"python": sys.version.split()[0], "runs": args.runs, "entry_points": results}, f, indent=2)
+        print(f"Report saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import timeit
+import numpy as np
+from linear_sketch.lattices import DnLattice, ProductLattice, TriangularLattice
+from linear_sketch.linear_sketch import LinearSketch
+
+
+class SolvePerCallSketch(LinearSketch):
+    """
+    Reference implementation that re-solves against the basis on every call,
+    as LinearSketch did before the basis inverse was cached.
+    """
+
+    def g_L(self, vector):
+        lattice_coords = np.linalg.solve(self.basis_vectors.T, vector)
+        rounded_coords = np.round(lattice_coords)
+        return self.basis_vectors.T @ rounded_coords
+
+    def sketch(self, vector):
+        y = self.g_L(vector)
+        c = vector - y
+        B_inv_y = np.linalg.solve(self.basis_vectors.T, y)
+        a = self.universal_hash(B_inv_y)
+        return c, a
+
+
+def time_per_call(fn, vector, number=20000, repeat=5):
+    """
+    Best-of-repeat latency of a single call in microseconds.
+
+    :param fn: Callable taking one vector
+    :param vector: Input vector
+    :param number: Calls per timing run
+    :param repeat: Number of timing runs
+    :return: Per-call latency (µs)
+    """
+    timings = timeit.repeat(lambda: fn(vector), number=number, repeat=repeat)
+    return min(timings) / number * 1e6
+
+
+def main():
+    triangular_basis = [[1, 0], [0.5, np.sqrt(3) / 2]]
+    scaled_basis = [[2, 0], [1, np.sqrt(3)]]  # Same lattice shape, takes the cached-inverse path
+    modulus = 7
+
+    vector = np.random.default_rng(0).normal(0, 300, size=2)
+
+    candidates = {
+        "solve per call": SolvePerCallSketch(triangular_basis, modulus),
+        "cached inverse": LinearSketch(scaled_basis, modulus),
+        "triangular fast path": LinearSketch(triangular_basis, modulus),
+    }
+
+    timings = {
+        name: (time_per_call(linear_sketch.sketch, vector), time_per_call(linear_sketch.g_L, vector))
+        for name, linear_sketch in candidates.items()
+    }
+
+    baseline = timings["solve per call"][0]
+    print(f"{'path':<22}{'sketch (µs)':>14}{'g_L (µs)':>12}{'speedup':>10}")
+    for name, (sketch_us, g_l_us) in timings.items():
+        print(f"{name:<22}{sketch_us:>14.2f}{g_l_us:>12.2f}{baseline / sketch_us:>9.1f}x")
+
+    # 300-component PCA vectors: dense solve against structured O(n) decoders
+    product = ProductLattice.repeat(TriangularLattice(), 150)
+    high_dim = {
+        "solve per call": SolvePerCallSketch(product.basis, modulus),
+        "cached inverse": LinearSketch(product.basis, modulus),
+        "product of A2 blocks": LinearSketch(product, modulus),
+        "D_300": LinearSketch(DnLattice(300), modulus),
+    }
+    vector = np.random.default_rng(0).normal(0, 300, size=300)
+    timings = {name: time_per_call(linear_sketch.sketch, vector, number=500) for name, linear_sketch in high_dim.items()}
+
+    baseline = timings["solve per call"]
+    print(f"\n{'n = 300':<22}{'sketch (µs)':>14}{'speedup':>10}")
+    for name, sketch_us in timings.items():
+        print(f"{name:<22}{sketch_us:>14.2f}{baseline / sketch_us:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
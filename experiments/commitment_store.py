@@ -0,0 +1,246 @@
+import os
+import struct
+import numpy as np
+
+STORE_MAGIC = b"FZCS"
+STORE_VERSION = 1
+DIGEST_BYTES = 32
+_HEADER = struct.Struct("<4sBxxxII")  # magic, version, codeword bytes, id bytes
+
+_TOMBSTONE = 0
+_LIVE = 1
+
+
+class CommitmentStore:
+    """
+    Append-only, memory-mapped store of fuzzy commitments.
+
+    The file is a 16-byte header followed by fixed-width records:
+    status (u8) || user id (id_bytes, NUL padded) || codeword || SHA-256 digest (32 raw bytes).
+    Registering again or deleting appends a record (deletes append a
+    tombstone), so writes never touch existing bytes. Each append is fsynced
+    before the index points at it, and a partial trailing record left by an
+    interrupted append is truncated away on open. On open the records are
+    scanned once to build an in-memory id -> record index; lookups are then a
+    dict hit plus a view into the memory map, with no copy. ``compact`` rewrites
+    the live records to a new file and swaps it in atomically; writes call
+    ``maybe_compact`` so superseded records do not accumulate.
+    """
+
+    def __init__(self, path, codeword_bytes, id_bytes=32, max_garbage_ratio=0.5, min_records=1024, auto_compact=True):
+        """
+        :param path: Store file, created if missing
+        :param codeword_bytes: Length of every commitment codeword
+        :param id_bytes: Maximum encoded length of a user id
+        :param max_garbage_ratio: Superseded share of the records above which the store is compacted
+        :param min_records: Smallest file (in records) worth compacting
+        :param auto_compact: Run ``maybe_compact`` after every put or delete
+        """
+        self.path = path
+        self.codeword_bytes = codeword_bytes
+        self.id_bytes = id_bytes
+        self.max_garbage_ratio = max_garbage_ratio
+        self.min_records = min_records
+        self.auto_compact = auto_compact
+        self.record_dtype = np.dtype([
+            ("status", "u1"),
+            ("user_id", f"S{id_bytes}"),
+            ("codeword", "u1", (codeword_bytes,)),
+            ("digest", "u1", (DIGEST_BYTES,)),
+        ])
+
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            with open(path, "wb") as f:
+                f.write(_HEADER.pack(STORE_MAGIC, STORE_VERSION, codeword_bytes, id_bytes))
+        self._open()
+
+    def _open(self):
+        with open(self.path, "rb") as f:
+            magic, version, codeword_bytes, id_bytes = _HEADER.unpack(f.read(_HEADER.size))
+        if magic != STORE_MAGIC or version != STORE_VERSION:
+            raise ValueError(f"{self.path} is not a version {STORE_VERSION} commitment store")
+        if (codeword_bytes, id_bytes) != (self.codeword_bytes, self.id_bytes):
+            raise ValueError(
+                f"{self.path} holds {codeword_bytes}-byte codewords and {id_bytes}-byte ids, "
+                f"expected {self.codeword_bytes} and {self.id_bytes}"
+            )
+
+        self._file = open(self.path, "r+b")
+        self._file.seek(0, os.SEEK_END)
+        data_bytes = self._file.tell() - _HEADER.size
+        self._record_count = data_bytes // self.record_dtype.itemsize
+        if data_bytes % self.record_dtype.itemsize:
+            # An append was interrupted; the records before it are intact
+            self._truncate()
+        self._records = None
+        self._remap()
+
+        # Later records win; tombstones drop the id
+        self._index = {}
+        for row, (status, user_id) in enumerate(zip(self._records["status"].tolist(), self._records["user_id"].tolist())):
+            if status == _LIVE:
+                self._index[user_id] = row
+            else:
+                self._index.pop(user_id, None)
+
+    def _remap(self):
+        if self._record_count:
+            self._records = np.memmap(
+                self.path, dtype=self.record_dtype, mode="r", offset=_HEADER.size, shape=(self._record_count,)
+            )
+        else:
+            self._records = np.zeros(0, dtype=self.record_dtype)
+
+    def _encode_id(self, user_id):
+        encoded = user_id.encode() if isinstance(user_id, str) else bytes(user_id)
+        if len(encoded) > self.id_bytes or encoded.endswith(b"\x00"):
+            raise ValueError(f"User id must encode to at most {self.id_bytes} bytes without trailing NULs")
+        return encoded
+
+    def _truncate(self):
+        self._file.truncate(_HEADER.size + self._record_count * self.record_dtype.itemsize)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.seek(0, os.SEEK_END)
+
+    def _append(self, records):
+        """
+        Write records durably; the caller publishes index entries only after this returns.
+        """
+        try:
+            self._file.write(records.tobytes())
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        except BaseException:
+            self._truncate()
+            raise
+        first_row = self._record_count
+        self._record_count += len(records)
+        return first_row
+
+    def put(self, user_id, commitment, key_digest):
+        """
+        Store or replace the commitment of one user.
+
+        :param user_id: str or bytes id
+        :param commitment: Codeword bytes (codeword_bytes long)
+        :param key_digest: Raw 32-byte SHA-256 of the AES key (``bytes.fromhex`` of a hex key hash)
+        """
+        self.put_batch([user_id], np.frombuffer(bytes(commitment), dtype=np.uint8)[np.newaxis], [key_digest])
+
+    def put_batch(self, user_ids, commitments, key_digests):
+        """
+        Store or replace many commitments with a single append.
+
+        :param user_ids: str or bytes ids
+        :param commitments: (N, codeword_bytes) uint8 matrix
+        :param key_digests: N raw 32-byte digests, or an (N, 32) uint8 matrix
+        """
+        commitments = np.asarray(commitments, dtype=np.uint8)
+        digests = np.asarray(
+            [np.frombuffer(bytes(digest), dtype=np.uint8) for digest in key_digests]
+            if not isinstance(key_digests, np.ndarray) else key_digests,
+            dtype=np.uint8,
+        )
+        if commitments.shape != (len(user_ids), self.codeword_bytes):
+            raise ValueError(f"Expected ({len(user_ids)}, {self.codeword_bytes}) commitments, got {commitments.shape}")
+        if digests.shape != (len(user_ids), DIGEST_BYTES):
+            raise ValueError(f"Expected {DIGEST_BYTES}-byte digests, got shape {digests.shape}")
+
+        records = np.zeros(len(user_ids), dtype=self.record_dtype)
+        encoded_ids = [self._encode_id(user_id) for user_id in user_ids]
+        records["status"] = _LIVE
+        records["user_id"] = encoded_ids
+        records["codeword"] = commitments
+        records["digest"] = digests
+        first_row = self._append(records)
+        for offset, encoded in enumerate(encoded_ids):
+            self._index[encoded] = first_row + offset
+        if self.auto_compact:
+            self.maybe_compact()
+
+    def delete(self, user_id):
+        """
+        Remove a user by appending a tombstone.
+
+        :raises KeyError: If the user is not stored
+        """
+        encoded = self._encode_id(user_id)
+        if encoded not in self._index:
+            raise KeyError(f"No commitment stored for {user_id!r}")
+        tombstone = np.zeros(1, dtype=self.record_dtype)
+        tombstone["user_id"] = encoded
+        self._append(tombstone)
+        del self._index[encoded]
+        if self.auto_compact:
+            self.maybe_compact()
+
+    def get(self, user_id):
+        """
+        Look up a commitment without copying it out of the memory map.
+
+        :param user_id: str or bytes id
+        :return: (codeword, digest) read-only uint8 views, or None if the user is not stored
+        """
+        row = self._index.get(self._encode_id(user_id))
+        if row is None:
+            return None
+        if row >= len(self._records):
+            self._remap()  # Records appended since the last mapping
+        record = self._records[row]
+        return record["codeword"], record["digest"]
+
+    def __contains__(self, user_id):
+        return self._encode_id(user_id) in self._index
+
+    def __len__(self):
+        return len(self._index)
+
+    @property
+    def garbage_ratio(self):
+        """
+        Fraction of records that are superseded or tombstones.
+        """
+        return 1 - len(self._index) / self._record_count if self._record_count else 0.0
+
+    def compact(self):
+        """
+        Rewrite the file with only the live record of each user, then swap it in atomically.
+        """
+        if self._record_count > len(self._records):
+            self._remap()
+        live_rows = np.fromiter(sorted(self._index.values()), dtype=np.int64, count=len(self._index))
+        temporary_path = f"{self.path}.compact"
+        with open(temporary_path, "wb") as f:
+            f.write(_HEADER.pack(STORE_MAGIC, STORE_VERSION, self.codeword_bytes, self.id_bytes))
+            f.write(np.ascontiguousarray(self._records[live_rows]).tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        self.close()
+        os.replace(temporary_path, self.path)
+        self._open()
+
+    def maybe_compact(self, max_garbage_ratio=None, min_records=None):
+        """
+        Compact once superseded records make up more than ``max_garbage_ratio`` of the file.
+
+        :param max_garbage_ratio: Threshold (default: the store's)
+        :param min_records: Smallest file worth compacting (default: the store's)
+        :return: True if the store was compacted
+        """
+        max_garbage_ratio = self.max_garbage_ratio if max_garbage_ratio is None else max_garbage_ratio
+        min_records = self.min_records if min_records is None else min_records
+        if self._record_count >= min_records and self.garbage_ratio > max_garbage_ratio:
+            self.compact()
+            return True
+        return False
+
+    def close(self):
+        self._records = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -1,7 +1,5 @@
 import numpy as np
-from cryptography.hazmat.primitives.kdf.hkdf import HKDF
-from cryptography.hazmat.primitives.hashes import SHA256
-from cryptography.hazmat.backends import default_backend
+from experiments.hkdf import derive_aes_key
 
 class LinearSketch:
     def __init__(self, basis_vectors, modulus, default_radius=5.0):
@@ -33,34 +31,14 @@ class LinearSketch:
         a = self.universal_hash(B_inv_y)
         return c, a
 
-def derive_aes_key(proxy_key):
-    hkdf = HKDF(
-        algorithm=SHA256(),
-        length=32,
-        salt=None,
-        info=b"fingerprint-key",
-        backend=default_backend()
-    )
-    proxy_key_bytes = int(proxy_key).to_bytes(32, byteorder="big")
-    aes_key = hkdf.derive(proxy_key_bytes)
-    return aes_key
-
 def register(fingerprint, linear_sketch):
-    sketch, proxy_key = linear_sketch.sketch(fingerprint)
-    print(f"Sketch (Registration): {sketch}")
-    print(f"Proxy Key (Registration): {proxy_key}")
-    aes_key = derive_aes_key(proxy_key)
-    print(f"Derived AES Key (Registration): {aes_key.hex()}")
-    return aes_key
+    _, proxy_key = linear_sketch.sketch(fingerprint)
+    return derive_aes_key(proxy_key)
 
 def login(fingerprint, linear_sketch):
     sketch, _ = linear_sketch.sketch(fingerprint)
-    print(f"Sketch (Login): {sketch}")
     proxy_key_reconstructed = linear_sketch.universal_hash(sketch)
-    print(f"Reconstructed Proxy Key (Login): {proxy_key_reconstructed}")
-    aes_key = derive_aes_key(proxy_key_reconstructed)
-    print(f"Reconstructed AES Key (Login): {aes_key.hex()}")
-    return aes_key
+    return derive_aes_key(proxy_key_reconstructed)
 
 
 def main():
@@ -1,108 +1,179 @@
 import hashlib
+import hmac
+import os
 import numpy as np
-from reedsolo import RSCodec
-from cryptography.hazmat.primitives.kdf.hkdf import HKDF
-from cryptography.hazmat.primitives.hashes import SHA256
-from cryptography.hazmat.backends import default_backend
+from experiments.hkdf import FUZZY_COMMITMENT_INFO, derive_aes_key, derive_aes_keys
+from experiments.reed_solomon import QUANTIZER_STEP, decode_batch, encode_batch, get_codec, quantize_sketch
+from linear_sketch import instrumentation
+from linear_sketch.lattices import IntegerLattice
 from linear_sketch.linear_sketch import LinearSketch
 
 
-def derive_aes_key(sketch, key_length=32):
+def check_ecc_bytes(dimension, ecc_bytes):
     """
-    Derive AES key from sketch using HKDF.
-    :param sketch: Sketch (secret) used for key derivation.
-    :param key_length: Length of the derived key in bytes.
-    :return: AES key.
+    Reject codes that correct every byte of an n-byte sketch, since any scan would then open the commitment.
+
+    :param dimension: Sketch length n
+    :param ecc_bytes: Error-correcting capability of the code
+    :raises ValueError: If ecc_bytes // 2 >= dimension
+    """
+    if ecc_bytes // 2 >= dimension:
+        raise ValueError(
+            f"{ecc_bytes} ECC bytes correct every byte of a {dimension}-byte sketch, so any scan would open the commitment"
+        )
+
+
+def _witness(sketches, quantizer_step, ecc_bytes):
+    """
+    Quantized sketches padded with zeros over the parity symbols: (N, n + ecc_bytes) uint8.
     """
-    hkdf = HKDF(
-        algorithm=SHA256(),
-        length=key_length,
-        salt=None,
-        info=b"fuzzy-commitment",
-        backend=default_backend()
-    )
-    sketch_bytes = sketch.tobytes() if isinstance(sketch, np.ndarray) else bytes(sketch)
-    aes_key = hkdf.derive(sketch_bytes)
-    return aes_key
-
-
-def fuzzy_commitment_register(linear_sketch, biometric, ecc_bytes=10):
+    witness = quantize_sketch(np.atleast_2d(sketches), quantizer_step)
+    check_ecc_bytes(witness.shape[1], ecc_bytes)
+    return np.pad(witness, ((0, 0), (0, ecc_bytes)))
+
+
+def fuzzy_commitment_register(linear_sketch, biometric, ecc_bytes=10, quantizer_step=QUANTIZER_STEP):
     """
-    Registration phase of fuzzy commitment using the sketch as the secret.
+    Registration phase of fuzzy commitment (code-offset construction) with the quantized sketch as the witness.
+
+    A random secret m is RS-encoded and the codeword is XORed with the quantized
+    sketch, so the commitment reveals neither m nor the sketch on its own.
     :param linear_sketch: Instance of LinearSketch.
     :param biometric: Biometric feature vector (numpy array).
     :param ecc_bytes: Error-correcting capability of the code.
-    :return: Commitment (v), hash of AES key.
+    :param quantizer_step: Step used to quantize the sketch to bytes.
+    :return: Commitment (codeword XOR witness), hash of AES key.
     """
-    # Generate sketch from biometric
+    # Generate sketch from biometric and quantize it to bytes
     sketch, _ = linear_sketch.sketch(biometric)
+    witness = _witness(sketch, quantizer_step, ecc_bytes)[0]
 
-    # Encode sketch using error-correcting code
-    rsc = RSCodec(ecc_bytes)
-    codeword = rsc.encode(sketch.astype(np.uint8))
+    # Encode a random secret of the same length using error-correcting code
+    secret = np.frombuffer(os.urandom(sketch.shape[0]), dtype=np.uint8)
+    codeword = np.frombuffer(get_codec(ecc_bytes).encode(secret.tobytes()), dtype=np.uint8)
 
-    # Store the commitment (encoded sketch)
-    commitment = codeword
+    # Store the commitment (codeword offset by the witness)
+    commitment = (codeword ^ witness).tobytes()
 
-    # Derive AES key and store its hash
-    aes_key = derive_aes_key(sketch)
+    # Derive AES key from the secret, and store its hash
+    aes_key = derive_aes_key(secret, FUZZY_COMMITMENT_INFO)
     key_hash = hashlib.sha256(aes_key).hexdigest()
 
     return commitment, key_hash
 
 
-def fuzzy_commitment_login(linear_sketch, biometric, commitment, key_hash, ecc_bytes=10):
+def fuzzy_commitment_register_batch(linear_sketch, biometrics, ecc_bytes=10, quantizer_step=QUANTIZER_STEP):
     """
-    Login phase of fuzzy commitment using the sketch as the secret.
+    Registration for many biometrics at once.
+    :param linear_sketch: Instance of LinearSketch.
+    :param biometrics: (N, n) matrix of biometric feature vectors.
+    :param ecc_bytes: Error-correcting capability of the code.
+    :param quantizer_step: Step used to quantize the sketches to bytes.
+    :return: (N, n + ecc_bytes) uint8 commitments and the key hashes.
+    """
+    sketches, _ = linear_sketch.sketch_batch(biometrics)
+    secret_messages = np.frombuffer(os.urandom(sketches.size), dtype=np.uint8).reshape(sketches.shape)
+    commitments = encode_batch(secret_messages, ecc_bytes) ^ _witness(sketches, quantizer_step, ecc_bytes)
+    key_hashes = [hashlib.sha256(aes_key).hexdigest() for aes_key in derive_aes_keys(secret_messages, FUZZY_COMMITMENT_INFO)]
+    return commitments, key_hashes
+
+
+def fuzzy_commitment_login(linear_sketch, biometric, commitment, key_hash, ecc_bytes=10, quantizer_step=QUANTIZER_STEP):
+    """
+    Login phase of fuzzy commitment: the fresh scan must be close enough to open the commitment.
     :param linear_sketch: Instance of LinearSketch.
     :param biometric: Biometric feature vector (numpy array).
-    :param commitment: Commitment from registration (encoded sketch).
+    :param commitment: Commitment from registration.
     :param key_hash: Hash of the AES key from registration.
     :param ecc_bytes: Error-correcting capability of the code.
+    :param quantizer_step: Step used to quantize the sketch to bytes.
     :return: AES key or None if verification fails.
     """
-    # Generate sketch from biometric
+    # Generate sketch from biometric and remove it from the commitment
     sketch, _ = linear_sketch.sketch(biometric)
-
-    # Decode sketch using error-correcting code
-    rsc = RSCodec(ecc_bytes)
-    try:
-        recovered_sketch = rsc.decode(commitment)
-    except Exception as e:
-        print(f"Error in decoding: {e}")
+    received = np.frombuffer(bytes(commitment), dtype=np.uint8) ^ _witness(sketch, quantizer_step, ecc_bytes)[0]
+
+    # Decode; up to ecc_bytes / 2 differing sketch bytes are corrected
+    sink = instrumentation.get_instrumentation()
+    with sink.timer(instrumentation.RS_DECODE):
+        secret, decoded = decode_batch(received[np.newaxis], ecc_bytes)
+    if not decoded[0]:
+        sink.count("rs_decode_failures")
         return None
 
-    # Derive AES key from recovered sketch
-    aes_key = derive_aes_key(recovered_sketch)
+    # Derive AES key from recovered secret
+    aes_key = derive_aes_key(secret[0], FUZZY_COMMITMENT_INFO)
 
     # Verify key hash
     reconstructed_key_hash = hashlib.sha256(aes_key).hexdigest()
-    if reconstructed_key_hash == key_hash:
-        print("Key verification successful!")
+    if hmac.compare_digest(reconstructed_key_hash, key_hash):
         return aes_key
     else:
-        print("Key verification failed.")
+        sink.count("key_verification_failures")
         return None
 
+
+def fuzzy_commitment_check_batch(linear_sketch, biometrics, commitments, key_hashes, ecc_bytes=10,
+                                 quantizer_step=QUANTIZER_STEP):
+    """
+    Login for many (fresh scan, stored commitment) pairs at once.
+
+    Row i is ``fuzzy_commitment_login(linear_sketch, biometrics[i], commitments[i], key_hashes[i])``.
+    Pairs whose scan reproduces the enrolled bytes exactly are recognised by one
+    vectorized syndrome pass; only the others are corrected individually.
+    :param linear_sketch: Instance of LinearSketch.
+    :param biometrics: (N, n) matrix of fresh biometric feature vectors.
+    :param commitments: (N, n + ecc_bytes) uint8 matrix of commitments.
+    :param key_hashes: Hex SHA-256 of each registered AES key.
+    :param ecc_bytes: Error-correcting capability of the code.
+    :param quantizer_step: Step used to quantize the sketches to bytes.
+    :return: List with the AES key, or None where decoding or verification fails.
+    """
+    sketches, _ = linear_sketch.sketch_batch(biometrics)
+    received = np.asarray(commitments, dtype=np.uint8) ^ _witness(sketches, quantizer_step, ecc_bytes)
+
+    sink = instrumentation.get_instrumentation()
+    with sink.timer(instrumentation.RS_DECODE):
+        secret_messages, decoded = decode_batch(received, ecc_bytes)
+
+    aes_keys = iter(derive_aes_keys(secret_messages[decoded], FUZZY_COMMITMENT_INFO))
+    results = []
+    for ok, key_hash in zip(decoded, key_hashes):
+        if not ok:
+            sink.count("rs_decode_failures")
+            results.append(None)
+            continue
+        aes_key = next(aes_keys)
+        if hmac.compare_digest(hashlib.sha256(aes_key).hexdigest(), key_hash):
+            results.append(aes_key)
+        else:
+            sink.count("key_verification_failures")
+            results.append(None)
+    return results
+
+
 def main():
-    # Initialize LinearSketch
-    basis_vectors = [[1, 0], [0.5, np.sqrt(3) / 2]]
-    modulus = 7
-    linear_sketch = LinearSketch(basis_vectors, modulus)
+    # Initialize LinearSketch; the code-offset commitment needs sketches longer than ecc_bytes / 2
+    dimension = 32
+    ecc_bytes = 8
+    linear_sketch = LinearSketch(IntegerLattice(dimension), 7)
 
     # Example biometric data
-    biometric_register = np.array([0.8, 0.6, 0.9, 1.0])  # Registration biometric
-    biometric_login = biometric_register + np.random.normal(0, 0.01, biometric_register.shape)  # Slightly noisy biometric
+    biometric_register = np.random.normal(0, 10, dimension)  # Registration biometric
+    biometric_login = biometric_register + np.random.normal(0, 0.001, dimension)  # Slightly noisy biometric
+    biometric_impostor = np.random.normal(0, 10, dimension)
 
     # Registration
-    commitment, key_hash = fuzzy_commitment_register(linear_sketch, biometric_register)
-    print(f"Commitment: {commitment}")
+    commitment, key_hash = fuzzy_commitment_register(linear_sketch, biometric_register, ecc_bytes)
+    print(f"Commitment: {commitment.hex()}")
     print(f"Key Hash: {key_hash}")
 
     # Login
-    recovered_key = fuzzy_commitment_login(linear_sketch, biometric_login, commitment, key_hash)
+    recovered_key = fuzzy_commitment_login(linear_sketch, biometric_login, commitment, key_hash, ecc_bytes)
     if recovered_key is not None:
         print(f"Recovered AES Key: {recovered_key.hex()}")
+    impostor_key = fuzzy_commitment_login(linear_sketch, biometric_impostor, commitment, key_hash, ecc_bytes)
+    print(f"Impostor rejected: {impostor_key is None}")
 
 if __name__ == "__main__":
     main()
@@ -2,7 +2,7 @@ import numpy as np
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 from cryptography.hazmat.primitives import padding
 from cryptography.hazmat.backends import default_backend
-from experiments.hkdf import derive_aes_key_from_proxy_key
+from experiments.hkdf import derive_aes_key
 from linear_sketch.linear_sketch import LinearSketch
 
 def aes_encrypt(key, plaintext):
@@ -73,9 +73,9 @@ def main():
         print(f"Recalculated Proxy Key for Second Fingerprint: {recalculated_proxy_key}")
 
         # Derive AES keys using HKDF
-        aes_key_1 = bytes.fromhex(derive_aes_key_from_proxy_key(proxy_key_1))
+        aes_key_1 = derive_aes_key(proxy_key_1)
         print(f"AES Key from Proxy Key 1: {aes_key_1}")
-        aes_key_2 = bytes.fromhex(derive_aes_key_from_proxy_key(recalculated_proxy_key))
+        aes_key_2 = derive_aes_key(recalculated_proxy_key)
         print(f"AES Key from Recalculated Proxy Key: {aes_key_2}")
         if aes_key_1 == aes_key_2:
             print("Success: AES keys derived from proxy keys match!")
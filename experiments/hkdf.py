@@ -1,26 +1,85 @@
+import hashlib
+import hmac
 import numpy as np
-from cryptography.hazmat.primitives.kdf.hkdf import HKDF
-from cryptography.hazmat.primitives.hashes import SHA256
-from cryptography.hazmat.backends import default_backend
+from linear_sketch import instrumentation
 from linear_sketch.linear_sketch import LinearSketch
 
+# HKDF "info" labels of the two key derivations in the experiments
+FINGERPRINT_KEY_INFO = b"fingerprint-key"
+FUZZY_COMMITMENT_INFO = b"fuzzy-commitment"
+
+HASH_BYTES = hashlib.sha256().digest_size
+PROXY_KEY_BYTES = 32
+
+
+def _key_material_bytes(key_material):
+    """
+    Input keying material as bytes: ints (proxy keys) become 32 big-endian bytes, arrays their raw buffer.
+    """
+    if isinstance(key_material, (int, np.integer)):
+        return int(key_material).to_bytes(PROXY_KEY_BYTES, byteorder="big")
+    if isinstance(key_material, np.ndarray):
+        return key_material.tobytes()
+    return bytes(key_material)
+
+
+def derive_aes_keys(key_materials, info=FINGERPRINT_KEY_INFO, salt=None, key_length=32):
+    """
+    Derive many keys with HKDF-SHA256 (RFC 5869) under one salt and info.
+
+    Extract and expand are single ``hmac.digest`` calls (one-shot HMAC in C),
+    so no HMAC object is created per key. Output matches ``cryptography``'s
+    HKDF with the same parameters.
+
+    :param key_materials: Iterable of proxy keys (ints), sketch arrays, or byte buffers
+    :param info: HKDF info label
+    :param salt: HKDF salt; None means HashLen zero bytes, as in RFC 5869
+    :param key_length: Bytes of key to derive (at most 255 * 32)
+    :return: List of keys as raw bytes
+    """
+    if not 0 < key_length <= 255 * HASH_BYTES:
+        raise ValueError(f"HKDF-SHA256 can derive 1 to {255 * HASH_BYTES} bytes, got {key_length}")
+    salt = bytes(HASH_BYTES) if salt is None else bytes(salt)
+    blocks = -(-key_length // HASH_BYTES)
+
+    keys = []
+    with instrumentation.get_instrumentation().timer(instrumentation.HKDF):
+        for key_material in key_materials:
+            # Extract: PRK = HMAC(salt, IKM)
+            prk = hmac.digest(salt, _key_material_bytes(key_material), "sha256")
+
+            # Expand: T(i) = HMAC(PRK, T(i-1) || info || i)
+            block = b""
+            okm = b""
+            for counter in range(1, blocks + 1):
+                block = hmac.digest(prk, block + info + bytes((counter,)), "sha256")
+                okm += block
+            keys.append(okm[:key_length])
+    return keys
+
+
+def derive_aes_key(key_material, info=FINGERPRINT_KEY_INFO, salt=None, key_length=32):
+    """
+    Derive one key with HKDF-SHA256; see ``derive_aes_keys``.
+
+    :param key_material: Proxy key (int), sketch array, or byte buffer
+    :param info: HKDF info label
+    :param salt: HKDF salt; None means HashLen zero bytes
+    :param key_length: Bytes of key to derive
+    :return: Key as raw bytes
+    """
+    return derive_aes_keys((key_material,), info, salt, key_length)[0]
+
+
 def derive_aes_key_from_proxy_key(proxy_key):
     """
     Derive AES key from a proxy key using HKDF.
     
     :param proxy_key: The proxy key (integer) to derive the AES key from.
-    :return: AES key (hexadecimal string).
+    :return: AES key (hexadecimal string); use ``derive_aes_key`` for raw bytes.
     """
-    hkdf = HKDF(
-        algorithm=SHA256(),
-        length=32,
-        salt=None,
-        info=b"fingerprint-key",
-        backend=default_backend()
-    )
-    proxy_key_bytes = int(proxy_key).to_bytes(32, byteorder="big")
-    aes_key = hkdf.derive(proxy_key_bytes)
-    return aes_key.hex()
+    return derive_aes_key(int(proxy_key)).hex()
+
 
 def main():
     # Initialize LinearSketch
@@ -0,0 +1,131 @@
+import argparse
+import glob
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from linear_sketch.lattices import DnLattice, TRIANGULAR_BASIS
+from linear_sketch.linear_sketch import LinearSketch
+from preprocessing.template_corpus import TemplateCorpus
+
+PROCESSED_DATA_DIR = "data/processed/fingerprints"
+MODULUS = 7
+
+
+def _simulate_chunk(task):
+    """
+    Worker: sketch ``scans`` noisy re-scans of one template and count recovered keys.
+    """
+    linear_sketch, template, noise_level, scans, batch_size, seed_sequence = task
+    rng = np.random.default_rng(seed_sequence)
+    enrolled_sketch, enrolled_key = linear_sketch.sketch(template)
+
+    recovered = 0
+    same_key = 0
+    for start in range(0, scans, batch_size):
+        rows = min(batch_size, scans - start)
+        rescans = template + rng.normal(0.0, noise_level, size=(rows, template.shape[0]))
+        sketches, proxy_keys = linear_sketch.sketch_batch(rescans)
+        _, recalculated = linear_sketch.diff_rec_batch(sketches, enrolled_sketch, proxy_keys)
+        recovered += int(np.count_nonzero(recalculated == enrolled_key))
+        same_key += int(np.count_nonzero(proxy_keys == enrolled_key))
+    return recovered, same_key
+
+
+def simulate(linear_sketch, templates, noise_levels, scans_per_template, workers=1, seed=0,
+             chunk_size=250_000, batch_size=50_000):
+    """
+    Estimate the key-recovery success rate of sketch + DiffRec at several noise levels.
+
+    Every (noise level, template) pair is split into chunks of at most
+    ``chunk_size`` re-scans, and each chunk draws its Gaussian noise from its
+    own child of ``np.random.SeedSequence(seed)``. The chunking depends only on
+    the arguments, so results are identical for any number of workers.
+
+    :param linear_sketch: LinearSketch used for enrolment and re-scans
+    :param templates: (T, n) enrolled fingerprint vectors
+    :param noise_levels: Standard deviations of the per-coordinate Gaussian noise
+    :param scans_per_template: Re-scans simulated per template and noise level
+    :param workers: Worker processes (1 runs in-process)
+    :param seed: Root seed
+    :param chunk_size: Re-scans per task handed to a worker
+    :param batch_size: Re-scans sketched per vectorized call inside a task
+    :return: List of per-noise-level result dicts
+    """
+    templates = np.atleast_2d(np.asarray(templates, dtype=np.float64))
+    tasks = []
+    for level_index, noise_level in enumerate(noise_levels):
+        for template in templates:
+            for start in range(0, scans_per_template, chunk_size):
+                scans = min(chunk_size, scans_per_template - start)
+                tasks.append((level_index, (linear_sketch, template, float(noise_level), scans, batch_size)))
+    seed_sequences = np.random.SeedSequence(seed).spawn(len(tasks))
+    tasks = [(level_index, task + (seed_sequence,)) for (level_index, task), seed_sequence in zip(tasks, seed_sequences)]
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            counts = list(executor.map(_simulate_chunk, [task for _, task in tasks]))
+    else:
+        counts = [_simulate_chunk(task) for _, task in tasks]
+
+    totals = np.zeros((len(noise_levels), 2), dtype=np.int64)
+    for (level_index, _), chunk_counts in zip(tasks, counts):
+        totals[level_index] += chunk_counts
+
+    trials = scans_per_template * len(templates)
+    return [
+        {
+            "noise_level": float(noise_level),
+            "trials": trials,
+            "recovered": int(recovered),
+            "success_rate": recovered / trials if trials else 0.0,
+            "same_key_rate": same_key / trials if trials else 0.0,
+        }
+        for noise_level, (recovered, same_key) in zip(noise_levels, totals)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo key-recovery rate of sketch + DiffRec under Gaussian noise.")
+    parser.add_argument("--data-dir", default=PROCESSED_DATA_DIR, help="Directory with processed fingerprint vectors")
+    parser.add_argument("--pattern", default="fingerprint_*_processed_2.npy", help="Template file pattern in --data-dir")
+    parser.add_argument("--corpus", help="Template corpus file (preprocessing.template_corpus); overrides --data-dir")
+    parser.add_argument("--noise-levels", type=float, nargs="+", default=[0.01, 0.05, 0.1, 0.2, 0.3, 0.5])
+    parser.add_argument("--scans", type=int, default=1_000_000, help="Re-scans per template and noise level")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Worker processes")
+    parser.add_argument("--seed", type=int, default=0, help="Root seed")
+    parser.add_argument("--scale", type=float, default=1.0, help="D_n lattice scale for templates that are not 2-D")
+    parser.add_argument("--output", help="Optional JSON report path")
+    args = parser.parse_args()
+
+    if args.corpus:
+        templates = TemplateCorpus(args.corpus).vectors
+    else:
+        paths = sorted(glob.glob(os.path.join(args.data_dir, args.pattern)))
+        if not paths:
+            raise ValueError(f"No templates matching {args.pattern} in {args.data_dir}")
+        templates = np.stack([np.load(path) for path in paths])
+
+    dimension = templates.shape[1]
+    basis = TRIANGULAR_BASIS if dimension == 2 else DnLattice(dimension, args.scale)
+    linear_sketch = LinearSketch(basis, MODULUS)
+
+    start = time.perf_counter()
+    results = simulate(linear_sketch, templates, args.noise_levels, args.scans, workers=args.workers, seed=args.seed)
+    elapsed = time.perf_counter() - start
+
+    print(f"{'noise':>8}{'trials':>12}{'success':>10}{'same key':>10}")
+    for result in results:
+        print(f"{result['noise_level']:>8.3f}{result['trials']:>12}{result['success_rate']:>10.4f}{result['same_key_rate']:>10.4f}")
+    print(f"{len(templates)} templates x {args.scans} re-scans x {len(args.noise_levels)} noise levels in {elapsed:.1f} s")
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump({"seed": args.seed, "dimension": dimension, "results": results}, f, indent=2)
+        print(f"Report saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+from functools import lru_cache
+import numpy as np
+
+# reedsolo's defaults: GF(2^8) with primitive polynomial 0x11d, generator 2, first consecutive root 0
+PRIMITIVE_POLY = 0x11D
+FIELD_GENERATOR = 2
+MAX_CODEWORD_BYTES = 255
+
+# Sketch coordinates are quantized to multiples of this step, centred on 128
+QUANTIZER_STEP = 1 / 128
+
+
+def _gf_tables():
+    exp = np.zeros(512, dtype=np.int64)
+    log = np.zeros(256, dtype=np.int64)
+    value = 1
+    for power in range(255):
+        exp[power] = value
+        log[value] = power
+        value <<= 1
+        if value & 0x100:
+            value ^= PRIMITIVE_POLY
+    exp[255:510] = exp[:255]  # log a + log b < 510, so products need no modulo
+    return exp, log
+
+
+_GF_EXP, _GF_LOG = _gf_tables()
+
+
+def _gf_mul(a, b):
+    """
+    Element-wise product in GF(2^8) of two broadcastable uint8 arrays.
+    """
+    a = np.asarray(a)
+    b = np.asarray(b)
+    product = _GF_EXP[_GF_LOG[a] + _GF_LOG[b]]
+    return np.where((a == 0) | (b == 0), 0, product).astype(np.uint8)
+
+
+@lru_cache(maxsize=None)
+def get_codec(ecc_bytes):
+    """
+    Shared RSCodec per ECC size; building one recomputes the field tables and generator polynomials.
+
+    :param ecc_bytes: Number of ECC symbols
+    :return: RSCodec
+    """
+    from reedsolo import RSCodec
+
+    return RSCodec(ecc_bytes)
+
+
+@lru_cache(maxsize=None)
+def generator_poly(ecc_bytes):
+    """
+    Generator polynomial Π (x - 2^i), i < ecc_bytes, highest degree first.
+
+    :param ecc_bytes: Number of ECC symbols
+    :return: uint8 array of ecc_bytes + 1 coefficients (monic)
+    """
+    poly = np.array([1], dtype=np.uint8)
+    for i in range(ecc_bytes):
+        root = _GF_EXP[i]
+        shifted = np.append(poly, 0).astype(np.uint8)
+        shifted[1:] ^= _gf_mul(poly, root)
+        poly = shifted
+    poly.setflags(write=False)
+    return poly
+
+
+def quantize_sketch(sketch, step=QUANTIZER_STEP):
+    """
+    Map a float sketch to bytes deterministically: round(c / step) + 128, clipped to 0..255.
+
+    :param sketch: Sketch c (float vector)
+    :param step: Quantization step
+    :return: uint8 array of the same shape
+    """
+    levels = np.rint(np.asarray(sketch, dtype=np.float64) / step) + 128
+    return np.clip(levels, 0, 255).astype(np.uint8)
+
+
+def _check_batch(buffer, ecc_bytes):
+    buffer = np.ascontiguousarray(buffer, dtype=np.uint8)
+    if buffer.ndim != 2:
+        raise ValueError(f"Expected an (N, length) uint8 matrix, got shape {buffer.shape}")
+    return buffer
+
+
+def encode_batch(messages, ecc_bytes):
+    """
+    Systematically RS-encode many equal-length messages at once.
+
+    The parity is the remainder of m(x)·x^ecc modulo the generator, computed
+    by one LFSR that steps through the message columns for the whole batch.
+    Row i equals ``get_codec(ecc_bytes).encode(messages[i])``.
+
+    :param messages: (N, k) uint8 matrix, k + ecc_bytes <= 255
+    :param ecc_bytes: Number of ECC symbols
+    :return: (N, k + ecc_bytes) uint8 codewords, message first
+    """
+    messages = _check_batch(messages, ecc_bytes)
+    if messages.shape[1] + ecc_bytes > MAX_CODEWORD_BYTES:
+        raise ValueError(f"Codewords longer than {MAX_CODEWORD_BYTES} bytes are not supported by the batch path")
+
+    generator = generator_poly(ecc_bytes)[1:]
+    parity = np.zeros((messages.shape[0], ecc_bytes), dtype=np.uint8)
+    for column in messages.T:
+        feedback = column ^ parity[:, 0]
+        parity[:, :-1] = parity[:, 1:]
+        parity[:, -1] = 0
+        parity ^= _gf_mul(feedback[:, np.newaxis], generator)
+    return np.hstack((messages, parity))
+
+
+def syndromes_batch(codewords, ecc_bytes):
+    """
+    RS syndromes of many codewords; an all-zero row means the codeword is intact.
+
+    :param codewords: (N, n) uint8 matrix
+    :param ecc_bytes: Number of ECC symbols
+    :return: (N, ecc_bytes) uint8 syndromes
+    """
+    codewords = _check_batch(codewords, ecc_bytes)
+    roots = _GF_EXP[:ecc_bytes].astype(np.uint8)
+    syndromes = np.zeros((codewords.shape[0], ecc_bytes), dtype=np.uint8)
+    for column in codewords.T:  # Horner's rule at every root, for every row
+        syndromes = _gf_mul(syndromes, roots) ^ column[:, np.newaxis]
+    return syndromes
+
+
+def decode_batch(codewords, ecc_bytes):
+    """
+    Decode many codewords, correcting errors only where the syndromes say so.
+
+    Intact rows are detected with one vectorized syndrome pass and their
+    messages are sliced out directly; only damaged rows go through reedsolo.
+
+    :param codewords: (N, n) uint8 matrix
+    :param ecc_bytes: Number of ECC symbols
+    :return: (messages (N, n - ecc_bytes) uint8, ok (N,) bool); rows that could not be corrected are left as received
+    """
+    from reedsolo import ReedSolomonError
+
+    codewords = _check_batch(codewords, ecc_bytes)
+    messages = codewords[:, :codewords.shape[1] - ecc_bytes].copy()
+    ok = np.ones(codewords.shape[0], dtype=bool)
+
+    damaged = np.flatnonzero(syndromes_batch(codewords, ecc_bytes).any(axis=1))
+    codec = get_codec(ecc_bytes)
+    for row in damaged:
+        try:
+            messages[row] = np.frombuffer(codec.decode(codewords[row].tobytes())[0], dtype=np.uint8)
+        except ReedSolomonError:
+            ok[row] = False
+    return messages, ok
@@ -0,0 +1,70 @@
+import io
+import pytest
+from cryptography.exceptions import InvalidTag
+from experiments.aes_stream import decrypt_batch, decrypt_file, decrypt_stream, encrypt_batch, encrypt_file, encrypt_stream
+from experiments.hkdf import derive_aes_key
+
+KEY = derive_aes_key(5)
+
+
+def _encrypt(payload, chunk_size):
+    return b"".join(encrypt_stream(KEY, io.BytesIO(payload), chunk_size))
+
+
+def test_round_trip_sources_and_sizes():
+    for length in (0, 1, 99, 100, 101, 1000):
+        payload = bytes(range(256)) * 4
+        payload = payload[:length]
+        ciphertext = _encrypt(payload, 100)
+        assert b"".join(decrypt_stream(KEY, io.BytesIO(ciphertext))) == payload
+
+        # Iterables with arbitrary piece boundaries on both sides
+        pieces = [payload[i:i + 7] for i in range(0, len(payload), 7)]
+        ciphertext = b"".join(encrypt_stream(KEY, pieces, 100))
+        ciphertext_pieces = [ciphertext[i:i + 13] for i in range(0, len(ciphertext), 13)]
+        assert b"".join(decrypt_stream(KEY, ciphertext_pieces)) == payload
+
+
+def test_tampering_is_detected():
+    ciphertext = _encrypt(b"x" * 350, 100)
+    chunk = 100 + 16
+    header = 16
+
+    truncated = ciphertext[:header + 2 * chunk]  # Ends on a chunk boundary without the last chunk
+    swapped = ciphertext[:header] + ciphertext[header + chunk:header + 2 * chunk] + ciphertext[header:header + chunk] + ciphertext[header + 2 * chunk:]
+    flipped = bytearray(ciphertext)
+    flipped[-1] ^= 1
+    for damaged in (truncated, swapped, bytes(flipped), ciphertext + ciphertext[-chunk:]):
+        with pytest.raises(InvalidTag):
+            b"".join(decrypt_stream(KEY, io.BytesIO(damaged)))
+
+
+def test_decrypt_file_keeps_existing_output_on_failure(tmp_path):
+    plaintext, encrypted, output = tmp_path / "plain", tmp_path / "sealed", tmp_path / "out"
+    plaintext.write_bytes(b"y" * 5000)
+    encrypt_file(KEY, plaintext, encrypted)
+    output.write_bytes(b"previous")
+
+    with pytest.raises(FileNotFoundError):
+        decrypt_file(KEY, tmp_path / "missing", output)
+    damaged = bytearray(encrypted.read_bytes())
+    damaged[-1] ^= 1
+    encrypted.write_bytes(bytes(damaged))
+    with pytest.raises(InvalidTag):
+        decrypt_file(KEY, encrypted, output)
+    assert output.read_bytes() == b"previous"
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["out", "plain", "sealed"]
+
+    damaged[-1] ^= 1
+    encrypted.write_bytes(bytes(damaged))
+    decrypt_file(KEY, encrypted, output)
+    assert output.read_bytes() == b"y" * 5000
+
+
+def test_batch_round_trip():
+    messages = [f"message {i}".encode() for i in range(50)]
+    sealed = encrypt_batch(KEY, messages, b"vault")
+    assert len({message[:12] for message in sealed}) == 50
+    assert decrypt_batch(KEY, sealed, b"vault") == messages
+    with pytest.raises(InvalidTag):
+        decrypt_batch(KEY, sealed, b"other")
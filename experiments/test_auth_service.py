@@ -0,0 +1,112 @@
+import asyncio
+import numpy as np
+import pytest
+from experiments.auth_service import AuthService, ServiceOverloaded
+from linear_sketch.linear_sketch import LinearSketch
+
+
+def _linear_sketch():
+    return LinearSketch([[1, 0], [0.5, np.sqrt(3) / 2]], 1_000_003)
+
+
+def _templates(users=20, seed=0):
+    return np.random.default_rng(seed).normal(0, 300, size=(users, 2))
+
+
+def test_register_login_and_impostors():
+    templates = _templates()
+
+    async def run():
+        async with AuthService(_linear_sketch(), workers=2) as service:
+            await asyncio.gather(*(service.register(user_id, template) for user_id, template in enumerate(templates)))
+            genuine = await asyncio.gather(*(service.login(user_id, template + 1e-3) for user_id, template in enumerate(templates)))
+            impostors = await asyncio.gather(*(service.login(user_id, templates[user_id - 1]) for user_id in range(len(templates))))
+            unknown = await service.login("nobody", templates[0])
+        return genuine, impostors, unknown
+
+    genuine, impostors, unknown = asyncio.run(run())
+    assert all(isinstance(key, bytes) and len(key) == 32 for key in genuine)
+    assert len(set(genuine)) == len(genuine)
+    assert impostors == [None] * len(templates)
+    assert unknown is None
+
+
+def test_concurrent_logins_are_coalesced():
+    templates = _templates(users=40)
+    batch_sizes = []
+
+    async def run():
+        service = AuthService(_linear_sketch(), workers=1, max_batch=16, max_delay=0.05)
+        login_batch = service._login_batch
+        service._login_batch = lambda vectors, enrolled: batch_sizes.append(len(vectors)) or login_batch(vectors, enrolled)
+        async with service:
+            for user_id, template in enumerate(templates):
+                await service.register(user_id, template)
+            return await asyncio.gather(*(service.login(user_id, template) for user_id, template in enumerate(templates)))
+
+    keys = asyncio.run(run())
+    assert all(key is not None for key in keys)
+    assert sum(batch_sizes) == len(templates)
+    assert max(batch_sizes) == 16
+    assert len(batch_sizes) <= 4
+
+
+def test_full_queue_rejects_logins():
+    templates = _templates(users=10)
+
+    async def run():
+        async with AuthService(_linear_sketch(), workers=1, max_pending=3, reject_when_full=True) as service:
+            for user_id, template in enumerate(templates):
+                await service.register(user_id, template)
+            # Every login is enqueued before the batcher runs, so only max_pending fit
+            return await asyncio.gather(
+                *(service.login(user_id, template) for user_id, template in enumerate(templates)), return_exceptions=True
+            )
+
+    results = asyncio.run(run())
+    assert [isinstance(result, bytes) for result in results] == [True] * 3 + [False] * 7
+    assert all(isinstance(result, ServiceOverloaded) for result in results[3:])
+
+
+def test_stop_without_start():
+    asyncio.run(AuthService(_linear_sketch()).stop())
+
+
+def test_short_batch_window_drops_no_logins():
+    templates = _templates(users=5)
+
+    async def run():
+        async with AuthService(_linear_sketch(), workers=2, max_batch=64, max_delay=1e-6) as service:
+            for user_id, template in enumerate(templates):
+                await service.register(user_id, template)
+            keys = []
+            for _ in range(50):
+                keys += await asyncio.gather(*(service.login(user_id, template) for user_id, template in enumerate(templates)))
+            return keys
+
+    keys = asyncio.run(asyncio.wait_for(run(), timeout=30))
+    assert len(keys) == 250 and all(key is not None for key in keys)
+
+
+def test_commitment_round_trip():
+    templates = _templates(users=10)
+
+    async def run():
+        async with AuthService(_linear_sketch(), workers=2) as service:
+            results = []
+            for i, template in enumerate(templates):
+                commitment, key_hash = await service.commitment_register(template)
+                genuine = await service.commitment_login(template + 1e-4, commitment, key_hash)
+                impostor = await service.commitment_login(templates[i - 1], commitment, key_hash)
+                results.append((genuine, impostor))
+            return results
+
+    for genuine, impostor in asyncio.run(run()):
+        assert isinstance(genuine, bytes) and len(genuine) == 32
+        assert impostor is None
+
+
+def test_ecc_bytes_must_leave_part_of_the_sketch():
+    # A 2-D sketch is two bytes; 4 parity bytes would correct both
+    with pytest.raises(ValueError):
+        AuthService(_linear_sketch(), ecc_bytes=4)
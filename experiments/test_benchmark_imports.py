@@ -0,0 +1,10 @@
+from experiments.benchmark_imports import ENTRY_POINTS, heavy_modules_loaded
+
+
+def test_login_path_loads_no_optional_backends():
+    assert heavy_modules_loaded(ENTRY_POINTS["login"]) == []
+
+
+def test_packages_defer_their_backends():
+    assert heavy_modules_loaded("import signature, signature.key_generation") == []
+    assert heavy_modules_loaded("import experiments.fc, preprocessing.preprocess_fingerprints") == []
@@ -0,0 +1,71 @@
+import hashlib
+import numpy as np
+from experiments.commitment_store import CommitmentStore
+
+
+def _digest(i):
+    return hashlib.sha256(str(i).encode()).digest()
+
+
+def test_put_get_delete_and_reopen(tmp_path):
+    path = tmp_path / "commitments.bin"
+    codewords = np.random.default_rng(0).integers(0, 256, size=(100, 12), dtype=np.uint8)
+
+    with CommitmentStore(str(path), codeword_bytes=12) as store:
+        store.put_batch([f"user-{i}" for i in range(100)], codewords, [_digest(i) for i in range(100)])
+        store.put("user-5", bytes(12), _digest("new"))  # Re-registration supersedes the old record
+        store.delete("user-7")
+
+        codeword, digest = store.get("user-3")
+        assert bytes(codeword) == codewords[3].tobytes() and bytes(digest) == _digest(3)
+        assert bytes(store.get("user-5")[0]) == bytes(12)
+        assert store.get("user-7") is None
+        assert len(store) == 99
+
+    with CommitmentStore(str(path), codeword_bytes=12) as store:
+        assert len(store) == 99
+        assert "user-7" not in store
+        assert bytes(store.get("user-5")[1]) == _digest("new")
+        assert store.garbage_ratio > 0
+
+        store.compact()
+        assert store.garbage_ratio == 0
+        assert len(store) == 99
+        assert bytes(store.get("user-42")[0]) == codewords[42].tobytes()
+
+        store.put("user-100", codewords[0].tobytes(), _digest(100))
+        assert bytes(store.get("user-100")[1]) == _digest(100)
+
+
+def test_interrupted_append_is_truncated_on_open(tmp_path):
+    path = tmp_path / "commitments.bin"
+    codewords = np.random.default_rng(1).integers(0, 256, size=(10, 12), dtype=np.uint8)
+    with CommitmentStore(str(path), codeword_bytes=12) as store:
+        store.put_batch([f"user-{i}" for i in range(10)], codewords, [_digest(i) for i in range(10)])
+        record_bytes = store.record_dtype.itemsize
+    complete_size = path.stat().st_size
+
+    # Simulate a crash halfway through appending an eleventh record
+    with open(path, "ab") as f:
+        f.write(b"\x01user-10" + bytes(record_bytes // 2))
+
+    with CommitmentStore(str(path), codeword_bytes=12) as store:
+        assert path.stat().st_size == complete_size
+        assert len(store) == 10 and "user-10" not in store
+        assert bytes(store.get("user-9")[0]) == codewords[9].tobytes()
+        store.put("user-10", codewords[0].tobytes(), _digest(10))
+    with CommitmentStore(str(path), codeword_bytes=12) as store:
+        assert bytes(store.get("user-10")[1]) == _digest(10)
+
+
+def test_writes_compact_automatically(tmp_path):
+    path = tmp_path / "commitments.bin"
+    codewords = np.zeros((1, 12), dtype=np.uint8)
+    with CommitmentStore(str(path), codeword_bytes=12, min_records=64) as store:
+        for i in range(200):
+            store.put_batch(["same-user"], codewords, [_digest(i)])
+            assert store.garbage_ratio <= 0.5 or store._record_count < 64
+        store.delete("same-user")
+        assert len(store) == 0
+        assert path.stat().st_size < 64 * store.record_dtype.itemsize
+        assert store.get("same-user") is None
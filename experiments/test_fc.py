@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+from experiments.fc import (
+    fuzzy_commitment_check_batch, fuzzy_commitment_login, fuzzy_commitment_register, fuzzy_commitment_register_batch,
+)
+from linear_sketch.lattices import IntegerLattice
+from linear_sketch.linear_sketch import LinearSketch
+
+DIMENSION = 32
+ECC_BYTES = 8
+
+
+def _setup(users=50, seed=0):
+    linear_sketch = LinearSketch(IntegerLattice(DIMENSION), 7)
+    rng = np.random.default_rng(seed)
+    return linear_sketch, rng, rng.normal(0, 10, size=(users, DIMENSION))
+
+
+def test_login_needs_a_close_scan():
+    linear_sketch, rng, templates = _setup()
+    for template in templates[:10]:
+        commitment, key_hash = fuzzy_commitment_register(linear_sketch, template, ECC_BYTES)
+        key = fuzzy_commitment_login(linear_sketch, template + rng.normal(0, 1e-4, DIMENSION), commitment, key_hash, ECC_BYTES)
+        assert key is not None and len(key) == 32
+        # The commitment alone does not open: an unrelated scan is rejected
+        assert fuzzy_commitment_login(linear_sketch, rng.normal(0, 10, DIMENSION), commitment, key_hash, ECC_BYTES) is None
+
+
+def test_batch_register_and_check():
+    linear_sketch, rng, templates = _setup()
+    commitments, key_hashes = fuzzy_commitment_register_batch(linear_sketch, templates, ECC_BYTES)
+    assert commitments.shape == (len(templates), DIMENSION + ECC_BYTES)
+
+    genuine = fuzzy_commitment_check_batch(linear_sketch, templates + rng.normal(0, 1e-4, templates.shape),
+                                           commitments, key_hashes, ECC_BYTES)
+    impostors = fuzzy_commitment_check_batch(linear_sketch, np.roll(templates, 1, axis=0), commitments, key_hashes, ECC_BYTES)
+    assert all(key is not None for key in genuine)
+    assert all(key is None for key in impostors)
+    for template, commitment, key_hash, key in zip(templates[:5], commitments, key_hashes, genuine):
+        assert fuzzy_commitment_login(linear_sketch, template, commitment.tobytes(), key_hash, ECC_BYTES) == key
+
+
+def test_rejects_codes_that_correct_the_whole_sketch():
+    linear_sketch = LinearSketch([[1, 0], [0.5, np.sqrt(3) / 2]], 7)
+    with pytest.raises(ValueError):
+        fuzzy_commitment_register(linear_sketch, np.array([0.8, 0.6]), ecc_bytes=10)
@@ -0,0 +1,25 @@
+import numpy as np
+from cryptography.hazmat.primitives.hashes import SHA256
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+from experiments.hkdf import (
+    FINGERPRINT_KEY_INFO, FUZZY_COMMITMENT_INFO, derive_aes_key, derive_aes_key_from_proxy_key, derive_aes_keys,
+)
+
+
+def _reference(key_material, info, salt=None, length=32):
+    return HKDF(algorithm=SHA256(), length=length, salt=salt, info=info).derive(key_material)
+
+
+def test_matches_cryptography_hkdf():
+    proxy_keys = list(range(7)) + [2 ** 200 + 3]
+    expected = [_reference(int(k).to_bytes(32, "big"), FINGERPRINT_KEY_INFO) for k in proxy_keys]
+    assert derive_aes_keys(proxy_keys) == expected
+    assert derive_aes_keys(np.arange(7, dtype=np.int64)) == expected[:7]
+    assert derive_aes_key_from_proxy_key(5) == expected[5].hex()
+
+    sketch = np.array([0.25, -0.5])
+    assert derive_aes_key(sketch, FUZZY_COMMITMENT_INFO) == _reference(sketch.tobytes(), FUZZY_COMMITMENT_INFO)
+
+    # Explicit salts and multi-block output
+    for salt, length in ((b"salt", 32), (bytes(64), 80), (b"s" * 7, 255)):
+        assert derive_aes_key(b"input", b"ctx", salt, length) == _reference(b"input", b"ctx", salt, length)
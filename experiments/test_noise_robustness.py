@@ -0,0 +1,34 @@
+import numpy as np
+from experiments.noise_robustness import simulate
+from linear_sketch.lattices import TRIANGULAR_BASIS
+from linear_sketch.linear_sketch import LinearSketch
+
+
+def _setup():
+    linear_sketch = LinearSketch(TRIANGULAR_BASIS, 7)
+    templates = np.random.default_rng(5).normal(0, 100, size=(4, 2))
+    return linear_sketch, templates
+
+
+def test_counts_do_not_depend_on_workers():
+    linear_sketch, templates = _setup()
+    options = dict(noise_levels=[0.05, 0.3], scans_per_template=3000, seed=11, chunk_size=1000, batch_size=400)
+    serial = simulate(linear_sketch, templates, workers=1, **options)
+    assert simulate(linear_sketch, templates, workers=2, **options) == serial
+    assert simulate(linear_sketch, templates, workers=3, **options) == serial
+    assert simulate(linear_sketch, templates, workers=1, **dict(options, seed=12)) != serial
+
+
+def test_rates_are_consistent():
+    linear_sketch, templates = _setup()
+    results = simulate(linear_sketch, templates, [1e-6, 0.05, 0.2, 0.5], 2000, seed=3, chunk_size=700, batch_size=300)
+
+    assert [result["trials"] for result in results] == [8000] * 4
+    assert results[0]["recovered"] == 8000 and results[0]["success_rate"] == 1.0
+    for result in results:
+        # Landing in the enrolled cell always recovers the key; DiffRec also recovers neighbouring cells
+        assert result["same_key_rate"] <= result["success_rate"]
+        assert result["success_rate"] == result["recovered"] / result["trials"]
+    rates = [result["success_rate"] for result in results]
+    assert rates == sorted(rates, reverse=True)
+    assert rates[-1] < 1.0
@@ -0,0 +1,40 @@
+import numpy as np
+from experiments.reed_solomon import decode_batch, encode_batch, get_codec, quantize_sketch, syndromes_batch
+
+
+def test_encode_batch_matches_reedsolo():
+    messages = np.random.default_rng(0).integers(0, 256, size=(200, 30), dtype=np.uint8)
+    for ecc_bytes in (2, 10, 32):
+        codewords = encode_batch(messages, ecc_bytes)
+        codec = get_codec(ecc_bytes)
+        for message, codeword in zip(messages, codewords):
+            assert codeword.tobytes() == bytes(codec.encode(message.tobytes()))
+        assert not syndromes_batch(codewords, ecc_bytes).any()
+
+
+def test_decode_batch_corrects_and_flags_rows():
+    rng = np.random.default_rng(1)
+    ecc_bytes = 10
+    messages = rng.integers(0, 256, size=(300, 40), dtype=np.uint8)
+    received = encode_batch(messages, ecc_bytes)
+
+    # Rows 0-99 intact, 100-199 with 5 symbol errors (correctable), 200-299 with 20 (not)
+    for row in range(100, 300):
+        errors = 5 if row < 200 else 20
+        positions = rng.choice(received.shape[1], size=errors, replace=False)
+        received[row, positions] ^= rng.integers(1, 256, size=errors, dtype=np.uint8)
+    assert np.array_equal(syndromes_batch(received, ecc_bytes).any(axis=1), np.arange(300) >= 100)
+
+    decoded, ok = decode_batch(received, ecc_bytes)
+    assert ok[:200].all()
+    assert np.array_equal(decoded[:200], messages[:200])
+    # A miscorrection to another codeword is possible but must not return the original message
+    assert not any(ok[row] and np.array_equal(decoded[row], messages[row]) for row in range(200, 300))
+
+
+def test_quantize_sketch_is_deterministic():
+    sketch = np.array([-2.0, -0.5, -1 / 256, 0.0, 1 / 256, 0.3, 0.99, 2.0])
+    levels = quantize_sketch(sketch)
+    assert levels.dtype == np.uint8
+    assert levels.tolist() == [0, 64, 128, 128, 128, 166, 255, 255]
+    assert np.array_equal(quantize_sketch(np.tile(sketch, (3, 1))), np.tile(levels, (3, 1)))
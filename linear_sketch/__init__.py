@@ -0,0 +1,3 @@
+from linear_sketch.linear_sketch import LinearSketch
+
+__all__ = ["LinearSketch"]
@@ -0,0 +1,138 @@
+import numpy as np
+
+COMPACT_DTYPES = (np.int8, np.int16)
+# Rows per block in the distance kernel, so the widened int32 differences stay in cache
+DISTANCE_BLOCK_ROWS = 256
+# Probe codes up to this magnitude keep the squared distances exact in int64; larger probes use float64
+PROBE_CODE_LIMIT = 2 ** 24
+
+
+def key_dtype(modulus):
+    """
+    Smallest unsigned integer dtype holding every proxy key in Z_modulus.
+
+    :param modulus: Proxy-key modulus p
+    :return: numpy dtype (uint8 for small moduli)
+    """
+    return np.min_scalar_type(int(modulus) - 1)
+
+
+def quantize(sketches, scale, dtype=np.int16, clip=True):
+    """
+    Fixed-point codes round(c / scale), clipped to the range of dtype.
+
+    :param sketches: Sketch vector or (N, n) matrix of sketches
+    :param scale: Real value of one code step
+    :param dtype: np.int8 or np.int16
+    :param clip: Clip out-of-range codes; if False, raise ValueError instead
+    :return: Integer codes of the same shape
+    """
+    info = np.iinfo(dtype)
+    codes = np.rint(np.asarray(sketches, dtype=np.float64) / scale)
+    if not clip and codes.size and np.abs(codes).max() > info.max:
+        raise ValueError(
+            f"Sketch value {np.abs(codes).max() * scale:.6g} exceeds the {np.dtype(dtype)} range "
+            f"at scale {scale:.6g} (largest {info.max * scale:.6g})"
+        )
+    return np.clip(codes, -info.max, info.max).astype(dtype)
+
+
+class CompactTemplates:
+    """
+    Enrolled templates in fixed-point form: sketch offsets c ≈ codes · scale as
+    int8/int16 and proxy keys in the smallest unsigned dtype for the modulus.
+
+    A float64 template of n coordinates takes 8n bytes; int16 codes take 2n
+    and int8 codes n. Distances are computed on the integer codes (the probe
+    is quantized with the same scale), so each coordinate is off by at most
+    scale / 2 compared with the float64 sketch. Probes are never clipped to
+    the template range, so a probe outside it is never pulled closer.
+    """
+
+    def __init__(self, codes, scale, proxy_keys, modulus):
+        """
+        :param codes: (N, n) int8/int16 codes
+        :param scale: Declared real value of one code step
+        :param proxy_keys: Length-N proxy keys
+        :param modulus: Proxy-key modulus p
+        """
+        codes = np.asarray(codes)
+        if codes.ndim != 2 or codes.dtype not in COMPACT_DTYPES:
+            raise ValueError(f"Expected an (N, n) int8 or int16 code matrix, got {codes.dtype} with shape {codes.shape}")
+        if scale <= 0:
+            raise ValueError(f"Scale must be positive, got {scale}")
+        self.codes = codes
+        self.scale = float(scale)
+        self.modulus = modulus
+        self.proxy_keys = np.asarray(proxy_keys).astype(key_dtype(modulus))
+        if self.proxy_keys.shape != (len(codes),):
+            raise ValueError(f"Expected {len(codes)} proxy keys, got shape {self.proxy_keys.shape}")
+
+    @classmethod
+    def from_sketches(cls, sketches, proxy_keys, modulus, dtype=np.int16, scale=None):
+        """
+        Quantize float sketches.
+
+        :param sketches: (N, n) sketches c
+        :param proxy_keys: Length-N proxy keys a
+        :param modulus: Proxy-key modulus p (e.g., ``linear_sketch.modulus``)
+        :param dtype: np.int16 (default) or np.int8
+        :param scale: Code step; default fits the largest |c| in the batch. Declare it explicitly
+            (e.g., the lattice's covering radius / np.iinfo(dtype).max) so later batches share the same codes.
+        :return: CompactTemplates
+        :raises ValueError: If a sketch does not fit the dtype at the given scale
+        """
+        sketches = np.asarray(sketches, dtype=np.float64)
+        if scale is None:
+            largest = float(np.abs(sketches).max()) if sketches.size else 0.0
+            scale = largest / np.iinfo(dtype).max if largest > 0 else 1.0
+        return cls(quantize(sketches, scale, dtype, clip=False), scale, proxy_keys, modulus)
+
+    def __len__(self):
+        return len(self.codes)
+
+    @property
+    def nbytes(self):
+        return self.codes.nbytes + self.proxy_keys.nbytes
+
+    def to_sketches(self, dtype=np.float32):
+        """
+        :param dtype: Output float dtype
+        :return: (N, n) dequantized sketches codes · scale
+        """
+        return self.codes.astype(dtype) * dtype(self.scale)
+
+    def squared_distances(self, sketch):
+        """
+        Squared Euclidean distance from a probe sketch to every template, in integer arithmetic.
+
+        :param sketch: Probe sketch c (float vector)
+        :return: Length-N float64 squared distances in sketch units
+        """
+        # The probe is not clipped to the template dtype: clamping it toward the templates would shrink distances
+        probe = np.rint(np.asarray(sketch, dtype=np.float64) / self.scale)
+        exact = probe.size == 0 or np.abs(probe).max() <= PROBE_CODE_LIMIT
+        work_dtype = np.int64 if exact else np.float64
+        probe = probe.astype(work_dtype)
+        squared = np.empty(len(self.codes), dtype=work_dtype)
+        for start in range(0, len(self.codes), DISTANCE_BLOCK_ROWS):
+            difference = self.codes[start:start + DISTANCE_BLOCK_ROWS].astype(work_dtype) - probe
+            squared[start:start + DISTANCE_BLOCK_ROWS] = np.einsum("ij,ij->i", difference, difference)
+        return squared * self.scale ** 2
+
+    def distances(self, sketch):
+        """
+        :param sketch: Probe sketch c
+        :return: Length-N Euclidean distances in sketch units
+        """
+        return np.sqrt(self.squared_distances(sketch))
+
+    def within_radius(self, sketch, radius):
+        """
+        Acceptance test of a probe against every template (distance between sketches at most radius).
+
+        :param sketch: Probe sketch c
+        :param radius: Acceptance radius
+        :return: Length-N bool array
+        """
+        return self.squared_distances(sketch) <= radius ** 2
@@ -1,56 +1,168 @@
+import argparse
+import glob
+import os
 import numpy as np
-import matplotlib.pyplot as plt
-from linear_sketch import LinearSketch
-
-def fine_tune_acceptance_radius(fingerprint_1, fingerprint_2, perturbations, radii):
-    results = {"radius": [], "FMR": [], "FNMR": []}
-    linear_sketch = LinearSketch(basis_length=40.0)
-
-    for radius in radii:
-        false_matches = 0
-        false_non_matches = 0
-        total_matches = 0
-
-        # Generate sketches for original fingerprints
-        sketch_1, _ = linear_sketch.project_to_lattice(fingerprint_1)
-        sketch_2, _ = linear_sketch.project_to_lattice(fingerprint_2)
-
-        # Test perturbed fingerprints
-        for perturbation in perturbations:
-            perturbed_fingerprint = fingerprint_1 + perturbation
-            perturbed_sketch, _ = linear_sketch.project_to_lattice(perturbed_fingerprint)
-
-            if not linear_sketch.within_acceptance_region(sketch_1, perturbed_fingerprint, threshold=radius):
-                false_non_matches += 1
-            total_matches += 1
-
-        # Test distinct fingerprints
-        if linear_sketch.within_acceptance_region(fingerprint_1, fingerprint_2, threshold=radius):
-            false_matches += 1
-
-        # Record metrics
-        fnmr = false_non_matches / total_matches
-        fmr = false_matches / 1  # Only one pair of different fingerprints in this example
-        results["radius"].append(radius)
-        results["FMR"].append(fmr)
-        results["FNMR"].append(fnmr)
-
-    return results
-
-# Example execution
-fingerprint_1 = np.load("/home/canna/Documents/learning/fuzzy_schnoor_signature/data/processed/fingerprints/fingerprint_1_processed_2.npy")
-fingerprint_2 = np.load("/home/canna/Documents/learning/fuzzy_schnoor_signature/data/processed/fingerprints/fingerprint_2_processed_2.npy")
-perturbations = [np.random.normal(0, 0.01, fingerprint_1.shape) for _ in range(10)]
-radii = np.linspace(1, 20, 10)  # Test radii from 1 to 20
-
-results = fine_tune_acceptance_radius(fingerprint_1, fingerprint_2, perturbations, radii)
-
-# Plot results
-plt.plot(results["radius"], results["FMR"], label="False Match Rate (FMR)")
-plt.plot(results["radius"], results["FNMR"], label="False Non-Match Rate (FNMR)")
-plt.xlabel("Acceptance Radius")
-plt.ylabel("Rate")
-plt.title("FMR and FNMR vs. Acceptance Radius")
-plt.legend()
-plt.grid()
-plt.show()
+from linear_sketch.linear_sketch import LinearSketch
+
+PROCESSED_DATA_DIR = "data/processed/fingerprints"
+TRIANGULAR_BASIS = [[1, 0], [0.5, np.sqrt(3) / 2]]
+MODULUS = 7
+# Captures per fingerprint compared against every other template; bounds the impostor list to F²·IMPOSTOR_CAPTURES
+IMPOSTOR_CAPTURES = 1000
+
+
+def sweep_acceptance_radius(genuine_distances, impostor_distances, radii):
+    """
+    Read FMR/FNMR at every radius from two sorted distance lists.
+
+    Each distance is computed once by the caller; here both lists are sorted
+    and every radius is a binary search into them, so the sweep costs
+    O((G + I) log(G + I) + R log(G + I)) rather than one sketch call per
+    radius and sample.
+
+    :param genuine_distances: Sketch distances between a template and its own noisy captures
+    :param impostor_distances: Sketch distances between different fingerprints
+    :param radii: Acceptance radii to report; a pair matches when distance <= radius
+    :return: Dict with "radius", "FMR", "FNMR" arrays, plus "EER" and "EER_radius"
+    """
+    genuine = np.sort(np.asarray(genuine_distances, dtype=np.float64).ravel())
+    impostor = np.sort(np.asarray(impostor_distances, dtype=np.float64).ravel())
+    if genuine.size == 0 or impostor.size == 0:
+        raise ValueError("Need at least one genuine and one impostor distance")
+
+    def rates(thresholds):
+        fmr = np.searchsorted(impostor, thresholds, side="right") / impostor.size
+        fnmr = 1.0 - np.searchsorted(genuine, thresholds, side="right") / genuine.size
+        return fmr, fnmr
+
+    radii = np.asarray(radii, dtype=np.float64)
+    fmr, fnmr = rates(radii)
+    eer, eer_radius = equal_error_rate(genuine, impostor, rates)
+    return {"radius": radii, "FMR": fmr, "FNMR": fnmr, "EER": eer, "EER_radius": eer_radius}
+
+
+def equal_error_rate(genuine, impostor, rates):
+    """
+    Estimate the EER where the FMR and FNMR curves cross.
+
+    The curves only change at observed distances, so those are the candidate
+    thresholds; FMR - FNMR is non-decreasing over them, and the crossing is
+    interpolated linearly between the two thresholds around the sign change.
+
+    :param genuine: Sorted genuine distances
+    :param impostor: Sorted impostor distances
+    :param rates: Callable mapping thresholds to (FMR, FNMR)
+    :return: (eer, radius)
+    """
+    thresholds = np.unique(np.concatenate((genuine, impostor)))
+    fmr, fnmr = rates(thresholds)
+    gap = fmr - fnmr
+    k = int(np.searchsorted(gap, 0.0, side="left"))
+    if k == 0:
+        return float((fmr[0] + fnmr[0]) / 2), float(thresholds[0])
+    if k == len(thresholds):
+        return float((fmr[-1] + fnmr[-1]) / 2), float(thresholds[-1])
+
+    weight = -gap[k - 1] / (gap[k] - gap[k - 1])
+    eer = fmr[k - 1] + weight * (fmr[k] - fmr[k - 1])
+    radius = thresholds[k - 1] + weight * (thresholds[k] - thresholds[k - 1])
+    return float(eer), float(radius)
+
+
+def sketch_distances(linear_sketch, fingerprints, perturbations, impostor_captures=IMPOSTOR_CAPTURES):
+    """
+    Compute genuine and impostor sketch distances with batched sketching.
+
+    Captures are fingerprints[i] + perturbation. Genuine pairs compare each
+    capture with its own template. Impostor pairs compare the first
+    ``impostor_captures`` captures of each fingerprint with every other
+    template (one cdist per fingerprint), plus templates with each other,
+    so the impostor list holds F·(F-1)·min(P, impostor_captures) + F·(F-1)/2
+    distances rather than growing with every perturbation.
+
+    :param linear_sketch: LinearSketch used for enrolment and captures
+    :param fingerprints: (F, n) enrolled fingerprint vectors
+    :param perturbations: (P, n) noise vectors applied to every fingerprint
+    :param impostor_captures: Captures per fingerprint compared with the other templates (None: all)
+    :return: (genuine_distances (F*P,), impostor_distances)
+    """
+    from scipy.spatial.distance import cdist, pdist
+
+    fingerprints = np.atleast_2d(np.asarray(fingerprints, dtype=np.float64))
+    perturbations = np.atleast_2d(np.asarray(perturbations, dtype=np.float64))
+    templates, _ = linear_sketch.sketch_batch(fingerprints)
+    others = ~np.eye(len(templates), dtype=bool)
+
+    genuine = []
+    impostor = [pdist(templates)]
+    for i, fingerprint in enumerate(fingerprints):
+        captures, _ = linear_sketch.sketch_batch(fingerprint + perturbations)
+        genuine.append(np.linalg.norm(captures - templates[i], axis=1))
+        impostor.append(cdist(captures[:impostor_captures], templates[others[i]]).ravel())
+    return np.concatenate(genuine), np.concatenate(impostor)
+
+
+def fine_tune_acceptance_radius(fingerprints, perturbations, radii, linear_sketch=None,
+                                impostor_captures=IMPOSTOR_CAPTURES):
+    """
+    Sweep the acceptance radius over noisy captures of the given fingerprints.
+
+    :param fingerprints: (F, n) enrolled fingerprint vectors, F >= 2
+    :param perturbations: (P, n) noise vectors
+    :param radii: Acceptance radii to report
+    :param linear_sketch: LinearSketch to use (default: triangular lattice)
+    :param impostor_captures: Captures per fingerprint compared with the other templates
+    :return: Result dict of ``sweep_acceptance_radius``
+    """
+    if linear_sketch is None:
+        linear_sketch = LinearSketch(TRIANGULAR_BASIS, MODULUS)
+    genuine, impostor = sketch_distances(linear_sketch, fingerprints, perturbations, impostor_captures)
+    return sweep_acceptance_radius(genuine, impostor, radii)
+
+
+def main():
+    import matplotlib.pyplot as plt
+
+    parser = argparse.ArgumentParser(description="Sweep the acceptance radius and plot FMR/FNMR.")
+    parser.add_argument("--data-dir", default=PROCESSED_DATA_DIR, help="Directory with fingerprint_*_processed_2.npy")
+    parser.add_argument("--corpus", help="Template corpus file (preprocessing.template_corpus); overrides --data-dir")
+    parser.add_argument("--perturbations", type=int, default=10000, help="Noisy captures per fingerprint")
+    parser.add_argument("--impostor-captures", type=int, default=IMPOSTOR_CAPTURES,
+                        help="Captures per fingerprint compared with every other template")
+    parser.add_argument("--noise", type=float, default=0.01, help="Standard deviation of the capture noise")
+    parser.add_argument("--radii", type=int, default=200, help="Number of radii between 0 and the largest distance")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the capture noise")
+    args = parser.parse_args()
+
+    if args.corpus:
+        from preprocessing.template_corpus import TemplateCorpus
+
+        fingerprints = TemplateCorpus(args.corpus).vectors
+    else:
+        paths = sorted(glob.glob(os.path.join(args.data_dir, "fingerprint_*_processed_2.npy")))
+        fingerprints = np.stack([np.load(path) for path in paths]) if paths else np.zeros((0, 0))
+    if len(fingerprints) < 2:
+        raise ValueError(f"Need at least two processed fingerprints in {args.corpus or args.data_dir}")
+
+    rng = np.random.default_rng(args.seed)
+    perturbations = rng.normal(0, args.noise, size=(args.perturbations, fingerprints.shape[1]))
+
+    linear_sketch = LinearSketch(TRIANGULAR_BASIS, MODULUS)
+    genuine, impostor = sketch_distances(linear_sketch, fingerprints, perturbations, args.impostor_captures)
+    radii = np.linspace(0, max(genuine.max(), impostor.max()), args.radii)
+    results = sweep_acceptance_radius(genuine, impostor, radii)
+    print(f"EER {results['EER']:.4f} at radius {results['EER_radius']:.4f}")
+
+    # Plot results
+    plt.plot(results["radius"], results["FMR"], label="False Match Rate (FMR)")
+    plt.plot(results["radius"], results["FNMR"], label="False Non-Match Rate (FNMR)")
+    plt.xlabel("Acceptance Radius")
+    plt.ylabel("Rate")
+    plt.title("FMR and FNMR vs. Acceptance Radius")
+    plt.legend()
+    plt.grid()
+    plt.show()
+
+
+if __name__ == "__main__":
+    main()
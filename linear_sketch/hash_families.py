@@ -0,0 +1,192 @@
+import numpy as np
+
+# Mersenne prime 2^61 - 1: products of limbs stay exact and reduction is a shift and an add
+MERSENNE_61 = (1 << 61) - 1
+_LIMB_BITS = 16
+_LIMB_MASK = (1 << _LIMB_BITS) - 1
+_LIMBS = 4  # 16-bit limbs needed for a 61-bit (or 63-bit magnitude) value
+_FLOAT_EXACT = 1 << 53
+# Every partial sum of the limb product must stay below 2^53 to be exact in float64
+MAX_LINEAR_HASH_DIMENSION = _FLOAT_EXACT // (_LIMBS << (2 * _LIMB_BITS))
+
+
+def _as_coordinates(coordinates):
+    """
+    Integer lattice coordinates as an (N, n) int64 matrix (rounded floats are cast exactly).
+    """
+    coordinates = np.asarray(coordinates)
+    if coordinates.dtype.kind == "f":
+        coordinates = np.rint(coordinates)
+    coordinates = coordinates.astype(np.int64, copy=False)
+    if coordinates.ndim != 2:
+        raise ValueError(f"Expected an (N, n) matrix of integer coordinates, got shape {coordinates.shape}")
+    return coordinates
+
+
+class HashFamily:
+    """
+    A keyed hash from integer lattice coordinates Z^n to Z_modulus.
+
+    Subclasses implement ``hash_batch`` on an (N, n) matrix; calling the
+    family works on a single vector or a matrix. ``linear`` families satisfy
+    h(k1) - h(k2) ≡ h(k1 - k2) (mod modulus), which DiffRec relies on.
+    """
+
+    linear = False
+
+    def __init__(self, modulus):
+        self.modulus = modulus
+
+    def hash_batch(self, coordinates):
+        """
+        :param coordinates: (N, n) integer coordinate matrix
+        :return: Length-N int64 hashes in [0, modulus)
+        """
+        raise NotImplementedError
+
+    def __call__(self, coordinates):
+        """
+        :param coordinates: Integer coordinate vector, or (N, n) matrix of them
+        :return: Hash of the vector, or one hash per row
+        """
+        coordinates = np.asarray(coordinates)
+        if coordinates.ndim == 1:
+            return self.hash_batch(coordinates[np.newaxis, :])[0]
+        return self.hash_batch(coordinates)
+
+
+class SumHash(HashFamily):
+    """
+    The original proxy-key hash: sum of the coordinates mod p. Linear, but not universal.
+    """
+
+    linear = True
+
+    def hash_batch(self, coordinates):
+        return self(coordinates)
+
+    def __call__(self, coordinates):
+        # Convert vector to integers in Z_p
+        vector_mod_p = (np.asarray(coordinates) % self.modulus).astype(int)
+        return np.sum(vector_mod_p, axis=-1) % self.modulus
+
+
+class LinearHash(HashFamily):
+    """
+    Random-coefficient linear hash h(k) = Σ a_i k_i mod P over the prime P = 2^61 - 1.
+
+    The product is evaluated exactly without 128-bit arithmetic: every
+    coefficient is split into 16-bit limbs (for each 16-bit position of the
+    coordinates), and coordinates are split into signed 16-bit limbs, so the
+    whole batch is one float64 matrix product whose partial sums are
+    integers below 2^53. Small coordinates, the common case, need a single
+    limb, and the product is then an (N, n) @ (n, 4) matmul. The four limb
+    sums are recombined mod P with Mersenne rotations.
+    """
+
+    linear = True
+
+    def __init__(self, coefficients):
+        """
+        :param coefficients: Length-n coefficients in [0, 2^61 - 1)
+        """
+        super().__init__(MERSENNE_61)
+        coefficients = [int(a) % MERSENNE_61 for a in coefficients]
+        self.dimension = len(coefficients)
+        if self.dimension >= MAX_LINEAR_HASH_DIMENSION:
+            raise ValueError(f"LinearHash supports fewer than {MAX_LINEAR_HASH_DIMENSION} coordinates")
+        self.coefficients = np.array(coefficients, dtype=np.int64)
+
+        # limb_matrix[j, i, l] = limb l of (a_i · 2^(16j) mod P)
+        limb_matrix = np.zeros((_LIMBS, self.dimension, _LIMBS), dtype=np.float64)
+        for j in range(_LIMBS):
+            for i, a in enumerate(coefficients):
+                shifted = (a << (_LIMB_BITS * j)) % MERSENNE_61
+                for l in range(_LIMBS):
+                    limb_matrix[j, i, l] = (shifted >> (_LIMB_BITS * l)) & _LIMB_MASK
+        self._limb_matrix = limb_matrix
+
+    @classmethod
+    def random(cls, dimension, seed=None):
+        """
+        :param dimension: Number of coordinates n
+        :param seed: Seed for the coefficients
+        :return: LinearHash with coefficients drawn uniformly from [1, P)
+        """
+        rng = np.random.default_rng(seed)
+        return cls(rng.integers(1, MERSENNE_61, size=dimension, dtype=np.int64))
+
+    def hash_batch(self, coordinates):
+        coordinates = _as_coordinates(coordinates)
+        if coordinates.shape[1] != self.dimension:
+            raise ValueError(f"Expected {self.dimension} coordinates, got {coordinates.shape[1]}")
+
+        magnitude = np.abs(coordinates)
+        largest = int(magnitude.max()) if magnitude.size else 0
+        limbs = max(1, -(-largest.bit_length() // _LIMB_BITS))
+        if limbs == 1:
+            coordinate_limbs = coordinates.astype(np.float64)
+        else:
+            sign = np.sign(coordinates)
+            coordinate_limbs = np.concatenate([
+                (sign * ((magnitude >> (_LIMB_BITS * j)) & _LIMB_MASK)).astype(np.float64) for j in range(limbs)
+            ], axis=1)
+
+        # (N, limbs·n) @ (limbs·n, 4): every partial sum is an integer below 2^53, so float64 is exact
+        sums = coordinate_limbs @ self._limb_matrix[:limbs].reshape(limbs * self.dimension, _LIMBS)
+        sums = np.mod(sums.astype(np.int64), MERSENNE_61).astype(np.uint64)
+
+        total = np.zeros(len(coordinates), dtype=np.uint64)
+        modulus = np.uint64(MERSENNE_61)
+        for l in range(_LIMBS):
+            # x · 2^s mod (2^61 - 1) is a 61-bit rotation of x
+            shift = _LIMB_BITS * l
+            limb = sums[:, l]
+            total += ((limb << np.uint64(shift)) & modulus) | (limb >> np.uint64(61 - shift))
+        total = (total & modulus) + (total >> np.uint64(61))
+        total = np.where(total >= modulus, total - modulus, total)
+        return total.astype(np.int64)
+
+
+class MultiplyShiftHash(HashFamily):
+    """
+    Vector multiply-shift hash h(k) = ((Σ a_i k_i + b) mod 2^64) >> (64 - bits).
+
+    One wrapping uint64 matrix-vector product per batch. Not linear, so it
+    cannot be used with DiffRec.
+    """
+
+    def __init__(self, coefficients, offset, output_bits=32):
+        """
+        :param coefficients: Length-n odd 64-bit multipliers
+        :param offset: 64-bit additive term b
+        :param output_bits: Hash width; values lie in [0, 2^output_bits)
+        """
+        if not 0 < output_bits < 64:
+            raise ValueError(f"output_bits must be between 1 and 63, got {output_bits}")
+        super().__init__(1 << output_bits)
+        self.coefficients = np.asarray(coefficients, dtype=np.uint64)
+        self.dimension = len(self.coefficients)
+        self.offset = np.uint64(offset)
+        self.output_bits = output_bits
+
+    @classmethod
+    def random(cls, dimension, output_bits=32, seed=None):
+        """
+        :param dimension: Number of coordinates n
+        :param output_bits: Hash width
+        :param seed: Seed for the multipliers and offset
+        :return: MultiplyShiftHash with random odd multipliers
+        """
+        rng = np.random.default_rng(seed)
+        coefficients = rng.integers(0, np.iinfo(np.uint64).max, size=dimension, dtype=np.uint64, endpoint=True)
+        offset = rng.integers(0, np.iinfo(np.uint64).max, dtype=np.uint64, endpoint=True)
+        return cls(coefficients | np.uint64(1), offset, output_bits)
+
+    def hash_batch(self, coordinates):
+        coordinates = _as_coordinates(coordinates)
+        if coordinates.shape[1] != self.dimension:
+            raise ValueError(f"Expected {self.dimension} coordinates, got {coordinates.shape[1]}")
+        # Two's complement view: arithmetic mod 2^64 is the same for signed coordinates
+        products = coordinates.view(np.uint64) @ self.coefficients
+        return ((products + self.offset) >> np.uint64(64 - self.output_bits)).astype(np.int64)
@@ -0,0 +1,143 @@
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+# Stage names used by the pipeline
+G_L = "g_L"
+HASH = "hash"
+DIFF_REC = "diff_rec"
+HKDF = "hkdf"
+KEYGEN = "keygen"
+RS_DECODE = "rs_decode"
+
+_NULL_TIMER = nullcontext()
+
+
+class Instrumentation:
+    """
+    No-op instrumentation sink, the process-wide default.
+
+    Hot paths call ``timer(stage)`` and ``count(name)`` unconditionally; here
+    both do nothing and format nothing, so an uninstrumented run pays only
+    for the method call. Subclasses attach a real sink. Sinks only ever see
+    stage names, durations and counts, never sketches or keys.
+    """
+
+    def timer(self, stage):
+        """
+        Context manager timing one call of a stage.
+
+        :param stage: Stage name
+        """
+        return _NULL_TIMER
+
+    def count(self, name, value=1):
+        """
+        Add to a named counter.
+
+        :param name: Counter name
+        :param value: Amount to add
+        """
+
+
+class _StageTimer:
+    __slots__ = ("_recorder", "_stage", "_start")
+
+    def __init__(self, recorder, stage):
+        self._recorder = recorder
+        self._stage = stage
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._recorder.record(self._stage, time.perf_counter() - self._start)
+        return False
+
+
+class StageRecorder(Instrumentation):
+    """
+    Instrumentation sink accumulating per-stage call counts and durations, and counters.
+
+    Thread-safe, so it can be attached while the auth service runs batches on a thread pool.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stages = {}
+        self.counters = {}
+
+    def timer(self, stage):
+        return _StageTimer(self, stage)
+
+    def record(self, stage, seconds):
+        """
+        Add one timed call of a stage.
+
+        :param stage: Stage name
+        :param seconds: Duration of the call
+        """
+        with self._lock:
+            calls, total, worst = self.stages.get(stage, (0, 0.0, 0.0))
+            self.stages[stage] = (calls + 1, total + seconds, max(worst, seconds))
+
+    def count(self, name, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def summary(self):
+        """
+        Snapshot of everything recorded so far.
+
+        :return: Dict with "stages" (calls, total/mean/max µs per stage) and "counters"
+        """
+        with self._lock:
+            stages = {
+                stage: {
+                    "calls": calls,
+                    "total_us": total * 1e6,
+                    "mean_us": total / calls * 1e6,
+                    "max_us": worst * 1e6,
+                }
+                for stage, (calls, total, worst) in self.stages.items()
+            }
+            return {"stages": stages, "counters": dict(self.counters)}
+
+
+_instrumentation = Instrumentation()
+
+
+def get_instrumentation():
+    """
+    Return the process-wide instrumentation sink.
+    """
+    return _instrumentation
+
+
+def set_instrumentation(instrumentation):
+    """
+    Replace the process-wide instrumentation sink; None restores the no-op default.
+
+    :param instrumentation: Instrumentation instance or None
+    :return: The previous sink
+    """
+    global _instrumentation
+    previous = _instrumentation
+    _instrumentation = Instrumentation() if instrumentation is None else instrumentation
+    return previous
+
+
+@contextmanager
+def instrumented(instrumentation):
+    """
+    Attach a sink for the duration of a with-block.
+
+    :param instrumentation: Instrumentation instance, e.g. StageRecorder()
+    :return: The attached sink
+    """
+    previous = set_instrumentation(instrumentation)
+    try:
+        yield instrumentation
+    finally:
+        set_instrumentation(previous)
@@ -0,0 +1,264 @@
+import math
+from functools import cached_property
+import numpy as np
+
+# Triangular lattice basis used throughout the experiments; it gets a closed-form fast path
+TRIANGULAR_BASIS = np.array([[1, 0], [0.5, math.sqrt(3) / 2]])
+_INV_SQRT3 = 1 / math.sqrt(3)
+_TWO_INV_SQRT3 = 2 / math.sqrt(3)
+_HALF_SQRT3 = math.sqrt(3) / 2
+
+
+class Lattice:
+    """
+    Lattice given by a dense basis B (one basis vector per row).
+
+    g_L rounds the coordinates B⁻ᵀx, so every call costs O(n²) against the
+    inverse cached at construction. Structured subclasses override
+    ``closest_points`` with O(n) decoders.
+    """
+
+    def __init__(self, basis):
+        """
+        :param basis: (n, n) basis matrix, rows are basis vectors
+        """
+        basis = np.array(basis, dtype=np.float64)
+        if basis.ndim != 2 or basis.shape[0] != basis.shape[1]:
+            raise ValueError(f"Lattice basis must be a square matrix, got shape {basis.shape}")
+        self.dimension = basis.shape[0]
+        self.basis = basis
+        # The basis never changes after construction, so invert it once here
+        self._basis_inv = np.linalg.inv(basis)
+
+    def _check_rows(self, vectors):
+        vectors = np.asarray(vectors, dtype=np.float64)
+        if vectors.ndim != 2 or vectors.shape[1] != self.dimension:
+            raise ValueError(f"Expected an (N, {self.dimension}) matrix of vectors, got shape {vectors.shape}")
+        return vectors
+
+    def closest_points(self, vectors):
+        """
+        Round each row of an (N, n) matrix to its lattice point.
+
+        Rows are processed independently of the batch size, so single-vector and
+        batched callers get identical bits.
+
+        :param vectors: (N, n) matrix of input vectors
+        :return: (y, k) where y are the lattice points and k their integer coordinates (y = kB)
+        """
+        vectors = self._check_rows(vectors)
+        # Row-vector form of B⁻ᵀx: x @ B⁻¹. einsum keeps every row's reduction
+        # independent of the batch size, which BLAS matmul does not guarantee.
+        k = np.round(np.einsum("ij,jk->ik", vectors, self._basis_inv))
+        y = np.einsum("ij,jk->ik", k, self.basis)
+        return y, k
+
+    def closest_point(self, vector):
+        """
+        Single-vector variant of ``closest_points``.
+
+        :param vector: Input vector
+        :return: (y, k) where y is the lattice point and k its integer coordinates
+        """
+        y, k = self.closest_points(np.asarray(vector)[np.newaxis, :])
+        return y[0], k[0]
+
+
+class TriangularLattice(Lattice):
+    """
+    The 2-D triangular lattice with basis [[1, 0], [0.5, √3/2]], using the closed form
+    B⁻¹ = [[1, 0], [-1/√3, 2/√3]].
+    """
+
+    def __init__(self):
+        self.dimension = 2
+        self.basis = TRIANGULAR_BASIS.astype(np.float64)
+
+    def closest_points(self, vectors):
+        vectors = self._check_rows(vectors)
+        x0 = vectors[:, 0]
+        x1 = vectors[:, 1]
+        k = np.empty_like(vectors)
+        k[:, 0] = np.round(x0 - x1 * _INV_SQRT3)
+        k[:, 1] = np.round(x1 * _TWO_INV_SQRT3)
+        y = np.empty_like(vectors)
+        y[:, 0] = k[:, 0] + 0.5 * k[:, 1]
+        y[:, 1] = k[:, 1] * _HALF_SQRT3
+        return y, k
+
+    def closest_point(self, vector):
+        # The closed form on Python floats skips the per-call numpy overhead while
+        # performing the same IEEE operations (and round-half-to-even) as the batch path
+        if np.ndim(vector) != 1 or len(vector) != 2:
+            return super().closest_point(vector)
+        x0 = float(vector[0])
+        x1 = float(vector[1])
+        k0 = float(round(x0 - x1 * _INV_SQRT3))
+        k1 = float(round(x1 * _TWO_INV_SQRT3))
+        return np.array((k0 + 0.5 * k1, k1 * _HALF_SQRT3)), np.array((k0, k1))
+
+
+class IntegerLattice(Lattice):
+    """
+    The scaled integer lattice sZ^n. Rounding is exact closest-vector decoding, O(n).
+    """
+
+    def __init__(self, dimension, scale=1.0):
+        """
+        :param dimension: Lattice dimension n
+        :param scale: Spacing s between neighbouring lattice points
+        """
+        self.dimension = dimension
+        self.scale = float(scale)
+
+    @cached_property
+    def basis(self):
+        return self.scale * np.eye(self.dimension)
+
+    def closest_points(self, vectors):
+        vectors = self._check_rows(vectors)
+        k = np.round(vectors / self.scale)
+        return k * self.scale, k
+
+
+class DnLattice(Lattice):
+    """
+    The scaled checkerboard lattice sD_n = s{z ∈ Z^n : Σz even}, with the exact
+    O(n) closest-vector decoder of Conway & Sloane.
+
+    Basis rows are b_0 = e_0 + e_1 and b_i = e_i - e_{i-1} for i ≥ 1, so the
+    coordinates of a lattice point follow from one sum and one suffix sum.
+    """
+
+    def __init__(self, dimension, scale=1.0):
+        """
+        :param dimension: Lattice dimension n (at least 2)
+        :param scale: Scale s applied to the lattice
+        """
+        if dimension < 2:
+            raise ValueError("D_n needs dimension >= 2")
+        self.dimension = dimension
+        self.scale = float(scale)
+
+    @cached_property
+    def basis(self):
+        basis = np.eye(self.dimension) - np.eye(self.dimension, k=-1)
+        basis[0, 1] = 1.0
+        return self.scale * basis
+
+    def closest_points(self, vectors):
+        vectors = self._check_rows(vectors)
+        x = vectors / self.scale
+        z = np.round(x)
+
+        # Where Σz is odd, re-round the coordinate that was furthest from an integer the other way
+        odd_rows = np.flatnonzero(np.sum(z, axis=1) % 2 != 0)
+        if odd_rows.size:
+            residual = x[odd_rows] - z[odd_rows]
+            worst = np.argmax(np.abs(residual), axis=1)
+            step = np.where(residual[np.arange(odd_rows.size), worst] >= 0, 1.0, -1.0)
+            z[odd_rows, worst] += step
+
+        # Coordinates: k_0 = Σz / 2, then k_i = Σ_{j ≥ i} w_j over w = z - k_0 b_0
+        k = np.empty_like(z)
+        k[:, 0] = np.sum(z, axis=1) / 2
+        w = z.copy()
+        w[:, 0] -= k[:, 0]
+        w[:, 1] -= k[:, 0]
+        k[:, 1:] = np.cumsum(w[:, :0:-1], axis=1)[:, ::-1]
+        return z * self.scale, k
+
+
+class ProductLattice(Lattice):
+    """
+    Direct sum L_1 ⊕ L_2 ⊕ ... of lattices acting on consecutive coordinate blocks,
+    i.e. a block-diagonal basis. The closest point decomposes block by block, so a
+    product of fixed-size blocks is sketched in O(n).
+    """
+
+    def __init__(self, components):
+        """
+        :param components: Sequence of Lattice instances, one per coordinate block
+        """
+        self.components = list(components)
+        if not self.components:
+            raise ValueError("ProductLattice needs at least one component")
+        self.dimension = sum(component.dimension for component in self.components)
+
+        # Group consecutive repeats of the same component so each run is decoded
+        # with a single reshaped call instead of one call per block
+        self._runs = []
+        start = 0
+        for component in self.components:
+            if self._runs and self._runs[-1][0] is component:
+                self._runs[-1][2] += 1
+            else:
+                self._runs.append([component, start, 1])
+            start += component.dimension
+
+    @classmethod
+    def repeat(cls, component, count):
+        """
+        Product of ``count`` copies of one lattice, e.g. ``ProductLattice.repeat(TriangularLattice(), 150)``
+        for 300-dimensional vectors.
+        """
+        return cls([component] * count)
+
+    @cached_property
+    def basis(self):
+        basis = np.zeros((self.dimension, self.dimension))
+        offset = 0
+        for component in self.components:
+            block = slice(offset, offset + component.dimension)
+            basis[block, block] = component.basis
+            offset += component.dimension
+        return basis
+
+    def closest_points(self, vectors):
+        vectors = self._check_rows(vectors)
+        n_rows = vectors.shape[0]
+        y = np.empty_like(vectors)
+        k = np.empty_like(vectors)
+        for component, start, count in self._runs:
+            block = slice(start, start + component.dimension * count)
+            run = vectors[:, block].reshape(n_rows * count, component.dimension)
+            run_y, run_k = component.closest_points(run)
+            y[:, block] = run_y.reshape(n_rows, -1)
+            k[:, block] = run_k.reshape(n_rows, -1)
+        return y, k
+
+
+def block_diagonal_lattice(blocks):
+    """
+    Build the lattice with a block-diagonal basis from a list of square blocks.
+
+    :param blocks: Sequence of square basis matrices, or Lattice instances
+    :return: ProductLattice over the blocks
+    """
+    # Share one Lattice between equal blocks so ProductLattice decodes them in a single run
+    shared = {}
+    components = []
+    for block in blocks:
+        if not isinstance(block, Lattice):
+            block = np.array(block, dtype=np.float64)
+            key = (block.shape, block.tobytes())
+            if key not in shared:
+                shared[key] = as_lattice(block)
+            block = shared[key]
+        components.append(block)
+    return ProductLattice(components)
+
+
+def as_lattice(basis):
+    """
+    Wrap a basis matrix in the fastest matching Lattice; Lattice instances pass through.
+
+    :param basis: Lattice instance or (n, n) basis matrix
+    :return: Lattice
+    """
+    if isinstance(basis, Lattice):
+        return basis
+    basis = np.array(basis)
+    if np.array_equal(basis, TRIANGULAR_BASIS):
+        return TriangularLattice()
+    return Lattice(basis)
@@ -1,15 +1,35 @@
 import numpy as np
+from linear_sketch import instrumentation
+from linear_sketch.compact import CompactTemplates
+from linear_sketch.hash_families import SumHash
+from linear_sketch.lattices import as_lattice
 
 class LinearSketch:
-    def __init__(self, basis_vectors, modulus, default_radius=5.0):
+    def __init__(self, basis_vectors, modulus=None, default_radius=5.0, hash_family=None):
         """
         Initialize the linear sketch with the given lattice basis vectors and default acceptance radius.
 
-        :param basis_vectors: Basis for the triangular lattice (e.g., B = [[1, 0], [0.5, np.sqrt(3) / 2]])
-        :param modulus: Modulus p for operations in Z_p
+        :param basis_vectors: Basis for the triangular lattice (e.g., B = [[1, 0], [0.5, np.sqrt(3) / 2]]),
+            or a Lattice from linear_sketch.lattices (e.g., ProductLattice, DnLattice) for high dimensions
+        :param modulus: Modulus p for operations in Z_p; may be omitted when hash_family is given
         :param default_radius: Default acceptance radius for verifying matches
+        :param hash_family: HashFamily from linear_sketch.hash_families used for proxy keys
+            (e.g., LinearHash.random(n)); defaults to the coordinate sum mod p
         """
-        self.basis_vectors = np.array(basis_vectors)
+        self.lattice = as_lattice(basis_vectors)
+        self.basis_vectors = self.lattice.basis
+        if hash_family is None:
+            if modulus is None:
+                raise ValueError("A modulus is required when no hash family is given")
+            hash_family = SumHash(modulus)
+        elif modulus is None:
+            modulus = hash_family.modulus
+        elif modulus != hash_family.modulus:
+            raise ValueError(f"Modulus {modulus} does not match the hash family's modulus {hash_family.modulus}")
+        dimension = getattr(hash_family, "dimension", self.lattice.dimension)
+        if dimension != self.lattice.dimension:
+            raise ValueError(f"Hash family takes {dimension} coordinates but the lattice has dimension {self.lattice.dimension}")
+        self.hash_family = hash_family
         self.modulus = modulus
         self.default_radius = default_radius
 
@@ -20,21 +40,20 @@ class LinearSketch:
         :param vector: Input vector
         :return: Closest lattice point y
         """
-        lattice_coords = np.linalg.solve(self.basis_vectors.T, vector)
-        rounded_coords = np.round(lattice_coords)
-        closest_point = self.basis_vectors.T @ rounded_coords
+        with instrumentation.get_instrumentation().timer(instrumentation.G_L):
+            closest_point, _ = self.lattice.closest_point(vector)
         return closest_point
 
     def universal_hash(self, vector):
         """
-        Universal hash function to map vectors in Z_p^n to Z_p.
+        Universal hash function to map vectors in Z_p^n to Z_p, using the sketch's hash family.
 
-        :param vector: Input vector
-        :return: Hashed value
+        Works row-wise on an (N, n) matrix, returning one hash per row.
+
+        :param vector: Input vector, or matrix of input vectors
+        :return: Hashed value(s)
         """
-        # Convert vector to integers in Z_p
-        vector_mod_p = (vector % self.modulus).astype(int)
-        return np.sum(vector_mod_p) % self.modulus
+        return self.hash_family(vector)
 
     def sketch(self, vector):
         """
@@ -43,10 +62,32 @@ class LinearSketch:
         :param vector: Input biometric vector
         :return: (c, a) where c = x - g_L(x) and a = UH(B⁻¹y)
         """
-        y = self.g_L(vector)  # Closest lattice point
+        sink = instrumentation.get_instrumentation()
+        vector = np.asarray(vector, dtype=np.float64)
+        with sink.timer(instrumentation.G_L):
+            y, lattice_coords = self.lattice.closest_point(vector)  # Closest lattice point
         c = vector - y  # Sketch c
-        B_inv_y = np.linalg.solve(self.basis_vectors.T, y)  # Compute B⁻¹y
-        a = self.universal_hash(B_inv_y)  # Compute a using UH
+        with sink.timer(instrumentation.HASH):
+            a = self.universal_hash(lattice_coords)  # a = UH(B⁻¹y); B⁻¹y is exactly the rounded coordinates
+        return c, a
+
+    def sketch_batch(self, vectors):
+        """
+        Generate sketches (c, a) for a batch of vectors in one vectorized pass.
+
+        Every row shares the lattice's cached decoder, and row i of
+        the result matches ``sketch(vectors[i])`` bit for bit.
+
+        :param vectors: (N, n) matrix of biometric vectors, one per row
+        :return: (C, a) where C is the (N, n) sketch matrix and a the length-N proxy keys
+        """
+        sink = instrumentation.get_instrumentation()
+        vectors = np.asarray(vectors, dtype=np.float64)
+        with sink.timer(instrumentation.G_L):
+            y, lattice_coords = self.lattice.closest_points(vectors)  # Closest lattice points
+        c = vectors - y  # Sketches c
+        with sink.timer(instrumentation.HASH):
+            a = self.universal_hash(lattice_coords)  # a = UH(B⁻¹y); B⁻¹y is exactly the rounded coordinates
         return c, a
 
     def diff_rec(self, sketch_c1, sketch_c2):
@@ -56,25 +97,58 @@ class LinearSketch:
         :param sketch_c1: Sketch c1 of the first fingerprint
         :param sketch_c2: Sketch c2 of the second fingerprint
         :return: Δa (signed difference in proxy keys)
+        :raises ValueError: If the hash family is not linear, so Δa cannot be recovered from Δc
         """
-        delta_c = sketch_c2 - sketch_c1  # Difference between sketches
-        delta_y = self.g_L(delta_c)  # Projected lattice point
+        if not self.hash_family.linear:
+            raise ValueError(f"DiffRec needs a linear hash family, {type(self.hash_family).__name__} is not linear")
+        sink = instrumentation.get_instrumentation()
+        # c1 - c2 = (x1 - x2) + (k2 - k1)B, so for close inputs it rounds to k2 - k1, which hashes to a2 - a1
+        delta_c = sketch_c1 - sketch_c2  # Difference between sketches
+        with sink.timer(instrumentation.G_L):
+            delta_y, delta_k = self.lattice.closest_point(delta_c)  # Projected lattice point
 
         # Use the direction of delta_c to determine the sign of Δa
         sign = 1 if np.dot(delta_y, delta_c) > 0 else -1
 
         # Recover Δa (signed difference in proxy keys)
-        delta_a = sign * self.universal_hash(np.linalg.solve(self.basis_vectors.T, delta_y))
-
-        # Debugging outputs
-        print(f"Sketch c1: {sketch_c1}")
-        print(f"Sketch c2: {sketch_c2}")
-        print(f"Delta c: {delta_c}")
-        print(f"Delta y (lattice projection): {delta_y}")
-        print(f"Recovered Δa (signed difference): {delta_a}")
+        with sink.timer(instrumentation.HASH):
+            delta_a = sign * self.universal_hash(delta_k)
+        sink.count(instrumentation.DIFF_REC)
 
         return delta_a
 
+    def diff_rec_batch(self, sketch_probe, sketch_templates, proxy_key_probe):
+        """
+        Perform DiffRec of a probe against many template sketches in one vectorized pass.
+
+        Row j equals ``diff_rec(sketch_templates[j], sketch_probe)``; the differences
+        are broadcast, so an (N, n) matrix of probes with one template (or with N
+        templates, row by row) works too. All rows are projected with the lattice's
+        cached decoder in a single call.
+
+        :param sketch_probe: Sketch c2 of the probe, or (N, n) probe sketches
+        :param sketch_templates: (K, n) template sketches c1, or a single template
+        :param proxy_key_probe: Proxy key a2 of the probe, or one per probe row
+        :return: (Δa, recalculated proxy keys (a2 - Δa + p) % p); a recalculated key equals
+            the template's a1 when the probe lies in that template's acceptance region
+        :raises ValueError: If the hash family is not linear
+        """
+        if not self.hash_family.linear:
+            raise ValueError(f"DiffRec needs a linear hash family, {type(self.hash_family).__name__} is not linear")
+        sink = instrumentation.get_instrumentation()
+        delta_c = np.asarray(sketch_templates, dtype=np.float64) - np.asarray(sketch_probe, dtype=np.float64)
+        delta_c = np.atleast_2d(delta_c)
+        with sink.timer(instrumentation.G_L):
+            delta_y, delta_k = self.lattice.closest_points(delta_c)
+
+        sign = np.where(np.einsum("ij,ij->i", delta_y, delta_c) > 0, 1, -1)
+        with sink.timer(instrumentation.HASH):
+            delta_a = sign * self.universal_hash(delta_k)
+        sink.count(instrumentation.DIFF_REC, len(delta_a))
+
+        recalculated = (np.asarray(proxy_key_probe) - delta_a + self.modulus) % self.modulus
+        return delta_a, recalculated
+
 
     def dynamic_radius_adjustment(self, similarity_score, noise_level, min_radius=2.0, max_radius=15.0):
         """
@@ -94,20 +168,23 @@ class LinearSketch:
         """
         Verify if two vectors are in the same fundamental parallelepiped (i.e., within the acceptance region).
 
-        :param vector1: First vector
+        :param vector1: First vector, or CompactTemplates (linear_sketch.compact) of enrolled sketches
         :param vector2: Second vector
         :param similarity_score: Fingerprint similarity score (optional, required for dynamic radius adjustment).
         :param noise_level: Noise level in data (optional, required for dynamic radius adjustment).
-        :return: True if vectors are within the acceptance region, False otherwise
+        :return: True if vectors are within the acceptance region, False otherwise;
+            one bool per template when vector1 is CompactTemplates
         """
-        c1, _ = self.sketch(vector1)
-        c2, _ = self.sketch(vector2)
-
         # Adjust radius dynamically if scores are provided
         if similarity_score is not None and noise_level is not None:
             radius = self.dynamic_radius_adjustment(similarity_score, noise_level)
         else:
             radius = self.default_radius
 
+        c2, _ = self.sketch(vector2)
+        if isinstance(vector1, CompactTemplates):
+            return vector1.within_radius(c2, radius)
+        c1, _ = self.sketch(vector1)
+
         distance = np.linalg.norm(c1 - c2)
         return distance <= radius
@@ -0,0 +1,172 @@
+import numpy as np
+from scipy.spatial import cKDTree
+from linear_sketch import instrumentation
+
+SKETCH_INDEX_VERSION = 2
+# Templates inserted since the last tree build are scanned directly until there are this many
+PENDING_LIMIT = 256
+# Counter of templates whose exact distance a query computed
+CANDIDATES = "sketch_index_candidates"
+
+
+class SketchIndex:
+    """
+    1:N identification index over enrolled sketches.
+
+    Sketches c = x - g_L(x) all lie in one fundamental cell, so only their
+    exact position separates templates. One KD-tree covers every enrolled
+    sketch and the proxy keys are kept in an array aligned with its rows,
+    so a query costs O(log N) plus the number of templates actually within
+    the radius, and ``proxy_key`` only filters the tree's hits. Inserts and
+    deletes are buffered and folded into the tree at the next query once
+    more than ``PENDING_LIMIT`` have accumulated. Acceptance uses the same
+    rule as ``LinearSketch.verify_acceptance``: the Euclidean distance
+    between sketches is at most the radius, so large radii necessarily
+    return a large share of the corpus.
+    """
+
+    def __init__(self, radius):
+        """
+        :param radius: Default acceptance radius for queries
+        """
+        if radius <= 0:
+            raise ValueError(f"Radius must be positive, got {radius}")
+        self.radius = float(radius)
+        self.dimension = None
+        self._sketches = {}
+        self._proxy_keys = {}
+        self._tree = None
+        self._tree_ids = []
+        self._tree_keys = np.zeros(0, dtype=np.int64)
+        self._pending = {}
+        self._removed = set()
+
+    def __len__(self):
+        return len(self._sketches)
+
+    def __contains__(self, template_id):
+        return template_id in self._sketches
+
+    def _check_sketch(self, sketch):
+        sketch = np.asarray(sketch, dtype=np.float64)
+        if sketch.ndim != 1:
+            raise ValueError(f"Expected a 1-D sketch, got shape {sketch.shape}")
+        if self.dimension is not None and sketch.shape[0] != self.dimension:
+            raise ValueError(f"Expected a sketch of length {self.dimension}, got {sketch.shape[0]}")
+        return sketch
+
+    def insert(self, template_id, sketch, proxy_key):
+        """
+        Enroll a template, replacing any template already stored under the same id.
+
+        :param template_id: Hashable id (int or str to allow saving)
+        :param sketch: Sketch c of the enrolled fingerprint
+        :param proxy_key: Proxy key a of the enrolled fingerprint
+        """
+        sketch = self._check_sketch(sketch)
+        if template_id in self._sketches:
+            self.delete(template_id)
+        self.dimension = sketch.shape[0]
+
+        self._sketches[template_id] = sketch
+        self._proxy_keys[template_id] = int(proxy_key)
+        self._pending[template_id] = None
+
+    def delete(self, template_id):
+        """
+        Remove an enrolled template.
+
+        :param template_id: Id passed to ``insert``
+        :raises KeyError: If the id is not enrolled
+        """
+        if template_id not in self._sketches:
+            raise KeyError(f"Template {template_id!r} is not enrolled")
+        if template_id in self._pending:
+            del self._pending[template_id]
+        else:
+            self._removed.add(template_id)
+        del self._sketches[template_id]
+        del self._proxy_keys[template_id]
+
+    def _rebuild(self):
+        self._tree_ids = [template_id for template_id in self._tree_ids if template_id not in self._removed]
+        self._tree_ids.extend(self._pending)
+        self._tree_keys = np.array([self._proxy_keys[template_id] for template_id in self._tree_ids], dtype=np.int64)
+        self._tree = cKDTree(np.stack([self._sketches[template_id] for template_id in self._tree_ids])) if self._tree_ids else None
+        self._pending = {}
+        self._removed = set()
+
+    def query(self, sketch, radius=None, proxy_key=None):
+        """
+        Find the enrolled templates within the acceptance radius of a probe sketch.
+
+        :param sketch: Sketch c of the probe
+        :param radius: Acceptance radius (default: the index radius)
+        :param proxy_key: Only return templates with this proxy key, if given
+        :return: List of (template_id, distance, proxy_key), closest first
+        """
+        sketch = self._check_sketch(sketch)
+        radius = self.radius if radius is None else radius
+        # Rebuild lazily, so a bulk enrolment pays for one build at its first query
+        if len(self._pending) > PENDING_LIMIT or len(self._removed) > len(self._tree_ids) // 2:
+            self._rebuild()
+
+        candidates = list(self._pending)
+        if proxy_key is not None:
+            candidates = [template_id for template_id in candidates if self._proxy_keys[template_id] == int(proxy_key)]
+        hits = 0
+        if self._tree is not None:
+            rows = np.asarray(self._tree.query_ball_point(sketch, radius), dtype=np.int64)
+            hits = len(rows)
+            if proxy_key is not None:
+                rows = rows[self._tree_keys[rows] == int(proxy_key)]
+            found = [self._tree_ids[row] for row in rows]
+            if self._removed:
+                found = [template_id for template_id in found if template_id not in self._removed]
+            candidates.extend(found)
+        instrumentation.get_instrumentation().count(CANDIDATES, hits + len(self._pending))
+        if not candidates:
+            return []
+
+        distances = np.linalg.norm(np.stack([self._sketches[template_id] for template_id in candidates]) - sketch, axis=1)
+        matches = [
+            (template_id, float(distance), self._proxy_keys[template_id])
+            for template_id, distance in zip(candidates, distances)
+            if distance <= radius
+        ]
+        matches.sort(key=lambda match: match[1])
+        return matches
+
+    def save(self, path):
+        """
+        Write the index to an .npz file (no pickled objects).
+
+        :param path: Output path
+        """
+        template_ids = list(self._sketches)
+        dimension = self.dimension or 0
+        np.savez(
+            path,
+            version=SKETCH_INDEX_VERSION,
+            config=np.array([self.radius, dimension], dtype=np.float64),
+            template_ids=np.array(template_ids),
+            sketches=np.array([self._sketches[template_id] for template_id in template_ids]).reshape(-1, dimension),
+            proxy_keys=np.array([self._proxy_keys[template_id] for template_id in template_ids], dtype=np.int64),
+        )
+
+    @classmethod
+    def load(cls, path):
+        """
+        Read an index written by ``save``.
+
+        :param path: .npz path
+        :return: SketchIndex
+        """
+        with np.load(path, allow_pickle=False) as data:
+            version = int(data["version"])
+            if version != SKETCH_INDEX_VERSION:
+                raise ValueError(f"Unsupported sketch index version {version}")
+            index = cls(float(data["config"][0]))
+            for template_id, sketch, proxy_key in zip(data["template_ids"].tolist(), data["sketches"], data["proxy_keys"]):
+                index.insert(template_id, sketch, proxy_key)
+        return index
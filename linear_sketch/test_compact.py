@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+from linear_sketch.compact import CompactTemplates, quantize
+from linear_sketch.linear_sketch import LinearSketch
+
+
+def test_compact_distances_match_float_within_quantization_error():
+    rng = np.random.default_rng(0)
+    sketches = rng.uniform(-0.6, 0.6, size=(5000, 300))
+    probe = rng.uniform(-0.6, 0.6, size=300)
+    exact = np.linalg.norm(sketches - probe, axis=1)
+
+    for dtype in (np.int16, np.int8):
+        templates = CompactTemplates.from_sketches(sketches, rng.integers(0, 7, size=5000), 7, dtype=dtype)
+        assert templates.codes.dtype == dtype and templates.proxy_keys.dtype == np.uint8
+        assert templates.codes.nbytes * (4 if dtype == np.int16 else 8) == sketches.nbytes
+        # Each coordinate of both sides is off by at most scale / 2
+        assert np.all(np.abs(templates.distances(probe) - exact) <= templates.scale * np.sqrt(300) + 1e-9)
+        assert np.allclose(templates.to_sketches(np.float64), sketches, atol=templates.scale / 2 + 1e-12)
+
+
+def test_verify_acceptance_on_compact_templates():
+    linear_sketch = LinearSketch([[1, 0], [0.5, np.sqrt(3) / 2]], 7, default_radius=0.3)
+    rng = np.random.default_rng(1)
+    vectors = rng.normal(0, 300, size=(2000, 2))
+    sketches, proxy_keys = linear_sketch.sketch_batch(vectors)
+    templates = CompactTemplates.from_sketches(sketches, proxy_keys, linear_sketch.modulus, scale=1 / 2 ** 14)
+
+    probe = vectors[0] + rng.normal(0, 0.01, size=2)
+    accepted = linear_sketch.verify_acceptance(templates, probe)
+    expected = [linear_sketch.verify_acceptance(vector, probe) for vector in vectors]
+    assert accepted[0]
+    assert np.array_equal(accepted, expected)
+
+
+def test_out_of_range_sketches_raise():
+    sketches = np.array([[0.5, -0.25], [0.1, 0.0]])
+    # An explicit scale too fine for int8 cannot represent 0.5
+    with pytest.raises(ValueError):
+        CompactTemplates.from_sketches(sketches, [0, 1], 7, dtype=np.int8, scale=1 / 1024)
+    with pytest.raises(ValueError):
+        quantize(sketches, 1 / 1024, np.int8, clip=False)
+
+    # Exactly at the edge of the range still fits, and the fitted default scale always does
+    edge = CompactTemplates.from_sketches(sketches, [0, 1], 7, dtype=np.int8, scale=0.5 / 127)
+    assert edge.codes[0, 0] == 127
+    fitted = CompactTemplates.from_sketches(sketches * 1e6, [0, 1], 7, dtype=np.int8)
+    assert np.abs(fitted.codes).max() == 127
+    # quantize itself still clips by default
+    assert quantize([1.0], 0.5 / 127, np.int8).tolist() == [127]
+
+
+def test_out_of_range_probe_is_not_pulled_closer():
+    templates = CompactTemplates.from_sketches([[0.1, 0.1], [0.2, -0.2]], [0, 1], 7, dtype=np.int8)
+    for probe in ([0.5, 0.1], [1e12, 0.1]):
+        exact = np.linalg.norm(np.array([[0.1, 0.1], [0.2, -0.2]]) - probe, axis=1)
+        assert np.allclose(templates.distances(probe), exact, rtol=1e-6, atol=templates.scale)
+        assert not templates.within_radius(probe, 0.15).any()
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+from linear_sketch.hash_families import MERSENNE_61, LinearHash, MultiplyShiftHash, SumHash
+from linear_sketch.linear_sketch import LinearSketch
+
+
+def test_linear_hash_matches_exact_integer_arithmetic():
+    """
+    The limb-split matmul equals Σ a_i k_i mod P computed with Python integers, for small and huge coordinates.
+    """
+    family = LinearHash.random(6, seed=0)
+    rng = np.random.default_rng(1)
+    for bound in (50, 1 << 20, 1 << 62):
+        coordinates = rng.integers(-bound, bound, size=(200, 6), dtype=np.int64)
+        expected = [sum(int(a) * int(k) for a, k in zip(family.coefficients, row)) % MERSENNE_61 for row in coordinates]
+        assert family.hash_batch(coordinates).tolist() == expected
+
+    # Linear: h(k1) - h(k2) ≡ h(k1 - k2)
+    k1, k2 = rng.integers(-1000, 1000, size=(2, 100, 6))
+    assert np.array_equal((family(k1) - family(k2)) % MERSENNE_61, family(k1 - k2))
+
+
+def test_multiply_shift_matches_exact_integer_arithmetic():
+    family = MultiplyShiftHash.random(5, output_bits=20, seed=2)
+    coordinates = np.random.default_rng(3).integers(-10 ** 6, 10 ** 6, size=(200, 5))
+    expected = [
+        ((sum(int(a) * int(k) for a, k in zip(family.coefficients, row)) + int(family.offset)) % (1 << 64)) >> 44
+        for row in coordinates
+    ]
+    assert family(coordinates).tolist() == expected
+    assert family(coordinates[0]) == expected[0]
+
+
+def test_sketch_with_hash_families():
+    basis_vectors = [[1, 0], [0.5, np.sqrt(3) / 2]]
+    vectors = np.random.default_rng(4).normal(0, 300, size=(300, 2))
+
+    # The default family keeps the original proxy keys
+    default = LinearSketch(basis_vectors, 7)
+    assert np.array_equal(default.sketch_batch(vectors)[1], LinearSketch(basis_vectors, hash_family=SumHash(7)).sketch_batch(vectors)[1])
+
+    linear = LinearSketch(basis_vectors, hash_family=LinearHash.random(2, seed=5))
+    assert linear.modulus == MERSENNE_61
+    sketches, proxy_keys = linear.sketch_batch(vectors)
+    for vector, sketch, proxy_key in zip(vectors, sketches, proxy_keys):
+        single_sketch, single_key = linear.sketch(vector)
+        assert np.array_equal(single_sketch, sketch)
+        assert single_key == proxy_key
+
+    nonlinear = LinearSketch(basis_vectors, hash_family=MultiplyShiftHash.random(2, seed=6))
+    with pytest.raises(ValueError):
+        nonlinear.diff_rec(sketches[0], sketches[1])
+    with pytest.raises(ValueError):
+        LinearSketch(basis_vectors, 7, hash_family=LinearHash.random(2))
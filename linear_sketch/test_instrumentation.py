@@ -0,0 +1,27 @@
+import numpy as np
+from linear_sketch import instrumentation
+from linear_sketch.instrumentation import StageRecorder, instrumented
+from linear_sketch.linear_sketch import LinearSketch
+
+
+def test_diff_rec_is_silent_and_recorded(capsys):
+    linear_sketch = LinearSketch([[1, 0], [0.5, np.sqrt(3) / 2]], 7)
+    sketch_1, _ = linear_sketch.sketch(np.array([10.3, 4.4]))
+    sketch_2, _ = linear_sketch.sketch(np.array([10.35, 4.41]))
+
+    # No sink attached: nothing is printed or recorded
+    linear_sketch.diff_rec(sketch_1, sketch_2)
+    assert capsys.readouterr().out == ""
+
+    with instrumented(StageRecorder()) as recorder:
+        linear_sketch.sketch(np.array([1.0, 2.0]))
+        linear_sketch.sketch_batch(np.zeros((5, 2)))
+        linear_sketch.diff_rec(sketch_1, sketch_2)
+    assert capsys.readouterr().out == ""
+    assert not isinstance(instrumentation.get_instrumentation(), StageRecorder)
+
+    summary = recorder.summary()
+    assert summary["stages"][instrumentation.G_L]["calls"] == 3
+    assert summary["stages"][instrumentation.HASH]["calls"] == 3
+    assert summary["counters"][instrumentation.DIFF_REC] == 1
+    assert summary["stages"][instrumentation.G_L]["max_us"] >= summary["stages"][instrumentation.G_L]["mean_us"] > 0
@@ -0,0 +1,77 @@
+import itertools
+import numpy as np
+from linear_sketch.lattices import (
+    DnLattice,
+    IntegerLattice,
+    Lattice,
+    ProductLattice,
+    TriangularLattice,
+    block_diagonal_lattice,
+)
+from linear_sketch.linear_sketch import LinearSketch
+
+
+def test_coordinates_reconstruct_lattice_points():
+    """
+    For every lattice type the returned coordinates satisfy y = kB with integer k.
+    """
+    rng = np.random.default_rng(0)
+    lattices = [
+        TriangularLattice(),
+        IntegerLattice(6, scale=2.5),
+        DnLattice(7, scale=3.0),
+        ProductLattice.repeat(TriangularLattice(), 4),
+        block_diagonal_lattice([[[2.0, 0.0], [0.3, 1.5]], [[1.0]], [[2.0, 0.0], [0.3, 1.5]]]),
+    ]
+    for lattice in lattices:
+        vectors = rng.normal(0, 20, size=(200, lattice.dimension))
+        y, k = lattice.closest_points(vectors)
+        assert np.array_equal(k, np.round(k))
+        assert np.allclose(k @ lattice.basis, y)
+
+
+def test_dn_decoder_finds_closest_vector():
+    """
+    The D_n decoder agrees with a brute-force search over nearby even-sum points.
+    """
+    rng = np.random.default_rng(1)
+    lattice = DnLattice(4)
+    offsets = np.array(list(itertools.product([-1, 0, 1], repeat=4)))
+    for x in rng.normal(0, 5, size=(300, 4)):
+        candidates = np.floor(x) + offsets
+        candidates = np.concatenate([candidates, candidates + 1])
+        candidates = candidates[candidates.sum(axis=1) % 2 == 0]
+        best = np.min(np.linalg.norm(candidates - x, axis=1))
+        y, _ = lattice.closest_point(x)
+        assert y.sum() % 2 == 0
+        assert np.isclose(np.linalg.norm(y - x), best)
+
+
+def test_product_lattice_matches_dense_block_diagonal_basis():
+    """
+    A product of triangular blocks decodes like the equivalent dense block-diagonal basis.
+    """
+    rng = np.random.default_rng(2)
+    product = ProductLattice.repeat(TriangularLattice(), 5)
+    dense = Lattice(product.basis)
+    vectors = rng.normal(0, 30, size=(500, 10))
+    y_product, k_product = product.closest_points(vectors)
+    y_dense, k_dense = dense.closest_points(vectors)
+    assert np.array_equal(k_product, k_dense)
+    assert np.allclose(y_product, y_dense)
+
+
+def test_sketch_300_dimensional_vectors():
+    """
+    300-component PCA vectors sketch through structured lattices, batched and per vector alike.
+    """
+    rng = np.random.default_rng(3)
+    vectors = rng.normal(0, 200, size=(50, 300))
+    for lattice in (ProductLattice.repeat(TriangularLattice(), 150), DnLattice(300, scale=4.0)):
+        linear_sketch = LinearSketch(lattice, modulus=7)
+        sketches, proxy_keys = linear_sketch.sketch_batch(vectors)
+        assert sketches.shape == (50, 300)
+        for vector, batch_sketch, batch_key in zip(vectors, sketches, proxy_keys):
+            sketch, proxy_key = linear_sketch.sketch(vector)
+            assert np.array_equal(sketch, batch_sketch)
+            assert proxy_key == batch_key
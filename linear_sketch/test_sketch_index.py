@@ -0,0 +1,102 @@
+import numpy as np
+from linear_sketch import instrumentation
+from linear_sketch.hash_families import LinearHash
+from linear_sketch.linear_sketch import LinearSketch
+from linear_sketch.sketch_index import CANDIDATES, PENDING_LIMIT, SketchIndex
+
+
+def _brute_force(sketches, probe, radius):
+    distances = np.linalg.norm(sketches - probe, axis=1)
+    return sorted(np.flatnonzero(distances <= radius).tolist())
+
+
+def test_query_matches_linear_scan():
+    rng = np.random.default_rng(11)
+    sketches = rng.uniform(-5, 5, size=(2000, 6))
+    proxy_keys = rng.integers(0, 7, size=2000)
+    index = SketchIndex(radius=1.5)
+    for template_id, (sketch, proxy_key) in enumerate(zip(sketches, proxy_keys)):
+        index.insert(template_id, sketch, proxy_key)
+
+    for probe in sketches[:50] + rng.normal(0, 0.5, size=(50, 6)):
+        matches = index.query(probe)
+        assert sorted(template_id for template_id, _, _ in matches) == _brute_force(sketches, probe, 1.5)
+        assert [distance for _, distance, _ in matches] == sorted(distance for _, distance, _ in matches)
+
+        # Radii wider than the default reach further out
+        wide = index.query(probe, radius=4.0)
+        assert sorted(template_id for template_id, _, _ in wide) == _brute_force(sketches, probe, 4.0)
+
+        keyed = index.query(probe, proxy_key=3)
+        assert all(proxy_key == 3 for _, _, proxy_key in keyed)
+
+
+def test_delete_and_round_trip(tmp_path):
+    index = SketchIndex(radius=0.5)
+    index.insert("alice", [0.1, 0.2], 3)
+    index.insert("bob", [0.15, 0.25], 5)
+    index.insert("alice", [0.3, 0.1], 4)  # Re-enrolment replaces the old template
+    assert len(index) == 2
+
+    index.delete("bob")
+    assert "bob" not in index
+    assert [template_id for template_id, _, _ in index.query([0.1, 0.2])] == ["alice"]
+
+    path = tmp_path / "index.npz"
+    index.save(path)
+    loaded = SketchIndex.load(path)
+    assert len(loaded) == 1
+    assert loaded.query([0.3, 0.1]) == [("alice", 0.0, 4)]
+    assert loaded.radius == 0.5
+
+
+def test_real_sketches_query_few_candidates():
+    """
+    Sketches from sketch_batch all lie in one lattice cell; the index must still inspect only a small share of them.
+    """
+    linear_sketch = LinearSketch([[1, 0], [0.5, np.sqrt(3) / 2]], 7)
+    rng = np.random.default_rng(3)
+    vectors = rng.normal(0, 300, size=(20000, 2))
+    sketches, proxy_keys = linear_sketch.sketch_batch(vectors)
+    radius = 0.01
+    index = SketchIndex(radius)
+    for template_id, (sketch, proxy_key) in enumerate(zip(sketches, proxy_keys)):
+        index.insert(template_id, sketch, proxy_key)
+    for template_id in range(0, 2 * PENDING_LIMIT, 2):
+        index.delete(template_id)
+    live = np.ones(len(sketches), dtype=bool)
+    live[:2 * PENDING_LIMIT:2] = False
+
+    probes, _ = linear_sketch.sketch_batch(vectors[:100] + rng.normal(0, 0.003, size=(100, 2)))
+    recorder = instrumentation.StageRecorder()
+    with instrumentation.instrumented(recorder):
+        for probe in probes:
+            matches = index.query(probe)
+            expected = [i for i in _brute_force(sketches, probe, radius) if live[i]]
+            assert sorted(template_id for template_id, _, _ in matches) == expected
+    assert recorder.counters[CANDIDATES] / len(probes) < len(sketches) / 200
+
+    # Restricting to the probe's expected proxy key filters the same tree hits
+    keyed = index.query(sketches[1001], proxy_key=proxy_keys[1001])
+    assert keyed[0][0] == 1001 and all(proxy_key == proxy_keys[1001] for _, _, proxy_key in keyed)
+
+
+def test_unique_proxy_keys_still_use_the_tree():
+    """
+    With a 2^61 - 1 modulus nearly every template has its own proxy key; an unkeyed query must not scan them all.
+    """
+    linear_sketch = LinearSketch([[1, 0], [0.5, np.sqrt(3) / 2]], hash_family=LinearHash.random(2, seed=4))
+    rng = np.random.default_rng(5)
+    vectors = rng.normal(0, 300, size=(20000, 2))
+    sketches, proxy_keys = linear_sketch.sketch_batch(vectors)
+    index = SketchIndex(0.01)
+    for template_id, (sketch, proxy_key) in enumerate(zip(sketches, proxy_keys)):
+        index.insert(template_id, sketch, proxy_key)
+
+    recorder = instrumentation.StageRecorder()
+    with instrumentation.instrumented(recorder):
+        for template_id in range(50):
+            matches = index.query(sketches[template_id])
+            assert sorted(i for i, _, _ in matches) == _brute_force(sketches, sketches[template_id], 0.01)
+            assert index.query(sketches[template_id], proxy_key=proxy_keys[template_id])[0][0] == template_id
+    assert recorder.counters[CANDIDATES] / 100 < len(sketches) / 200
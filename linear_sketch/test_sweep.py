@@ -0,0 +1,61 @@
+import numpy as np
+from linear_sketch.exp import fine_tune_acceptance_radius, sketch_distances, sweep_acceptance_radius
+from linear_sketch.linear_sketch import LinearSketch
+
+
+def test_sweep_matches_per_radius_counts():
+    rng = np.random.default_rng(3)
+    genuine = rng.exponential(1.0, size=500)
+    impostor = rng.normal(5.0, 1.0, size=2000)
+    radii = np.linspace(0, 8, 33)
+
+    results = sweep_acceptance_radius(genuine, impostor, radii)
+
+    for k, radius in enumerate(radii):
+        assert np.isclose(results["FMR"][k], np.mean(impostor <= radius))
+        assert np.isclose(results["FNMR"][k], np.mean(genuine > radius))
+
+
+def test_equal_error_rate():
+    # Overlap of one sample on each side: both rates are 1/4 between 3 and 4
+    genuine = np.array([1.0, 2.0, 3.0, 6.0])
+    impostor = np.array([4.0, 7.0, 8.0, 9.0])
+    results = sweep_acceptance_radius(genuine, impostor, [3.5])
+    assert np.isclose(results["EER"], 0.25)
+    assert 3.0 <= results["EER_radius"] <= 6.0
+
+    separable = sweep_acceptance_radius([0.1, 0.2], [5.0, 6.0], [1.0])
+    assert separable["EER"] == 0.0
+
+
+def test_fine_tune_on_fingerprints():
+    fingerprints = np.stack([
+        np.load("data/processed/fingerprints/fingerprint_1_processed_2.npy"),
+        np.load("data/processed/fingerprints/fingerprint_2_processed_2.npy"),
+    ])
+    perturbations = np.random.default_rng(0).normal(0, 0.01, size=(1000, 2))
+    results = fine_tune_acceptance_radius(fingerprints, perturbations, np.linspace(0, 2, 21))
+    assert np.all(np.diff(results["FMR"]) >= 0)
+    assert np.all(np.diff(results["FNMR"]) <= 0)
+    assert 0.0 <= results["EER"] <= 1.0
+
+
+def test_sketch_distances_match_pairwise_loops():
+    linear_sketch = LinearSketch([[1, 0], [0.5, np.sqrt(3) / 2]], 7)
+    rng = np.random.default_rng(4)
+    fingerprints = rng.normal(0, 50, size=(5, 2))
+    perturbations = rng.normal(0, 0.05, size=(40, 2))
+    templates = [linear_sketch.sketch(fingerprint)[0] for fingerprint in fingerprints]
+    captures = [[linear_sketch.sketch(fingerprint + noise)[0] for noise in perturbations] for fingerprint in fingerprints]
+
+    genuine, impostor = sketch_distances(linear_sketch, fingerprints, perturbations, impostor_captures=None)
+    expected_genuine = [np.linalg.norm(capture - templates[i]) for i in range(5) for capture in captures[i]]
+    expected_impostor = [np.linalg.norm(templates[i] - templates[j]) for i in range(5) for j in range(i + 1, 5)]
+    expected_impostor += [np.linalg.norm(capture - templates[j]) for i in range(5) for j in range(5) if j != i for capture in captures[i]]
+    assert np.allclose(genuine, expected_genuine)
+    assert np.allclose(np.sort(impostor), np.sort(expected_impostor))
+
+    # Impostor captures are capped per fingerprint; genuine distances are not
+    genuine, impostor = sketch_distances(linear_sketch, fingerprints, perturbations, impostor_captures=7)
+    assert len(genuine) == 5 * 40
+    assert len(impostor) == 5 * 4 * 7 + 10
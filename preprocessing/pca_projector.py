@@ -0,0 +1,114 @@
+import argparse
+import pickle
+import numpy as np
+
+PROJECTOR_FILE = "pca_projector.npy"
+
+
+class PCAProjector:
+    """
+    Apply a fitted PCA as a single matrix-vector product, without sklearn.
+
+    The projector keeps only the component matrix W (k, d) and the mean μ (d,).
+    Whitening is folded into W when exporting, and μ·Wᵀ is precomputed, so a
+    projection is ``W @ x - offset``: one GEMV and a k-length subtraction.
+
+    On disk it is one .npy file of shape (k + 1, d): row 0 is the mean, the
+    remaining rows are the components. A single plain array can be memory-mapped,
+    so servers share the pages instead of each unpickling a copy.
+    """
+
+    def __init__(self, components, mean):
+        """
+        :param components: (k, d) projection matrix (whitening already applied)
+        :param mean: (d,) mean subtracted before projecting
+        """
+        self.components = components
+        self.mean = mean
+        if components.ndim != 2 or mean.shape != (components.shape[1],):
+            raise ValueError(f"Incompatible shapes: components {components.shape}, mean {mean.shape}")
+        self.offset = components @ mean
+
+    @property
+    def dtype(self):
+        return self.components.dtype
+
+    @classmethod
+    def from_model(cls, pca_model, dtype=np.float64):
+        """
+        Build a projector from a fitted sklearn PCA or IncrementalPCA.
+
+        :param pca_model: Fitted model, e.g. the one pickled to pca_model.pkl
+        :param dtype: np.float64 or np.float32
+        :return: PCAProjector giving the same output as ``pca_model.transform``
+        """
+        components = np.asarray(pca_model.components_, dtype=np.float64)
+        if getattr(pca_model, "whiten", False):
+            components = components / np.sqrt(pca_model.explained_variance_)[:, np.newaxis]
+        return cls(np.ascontiguousarray(components, dtype=dtype), np.asarray(pca_model.mean_, dtype=dtype))
+
+    @classmethod
+    def from_pickle(cls, model_path, dtype=np.float64):
+        """
+        Build a projector from a pca_model.pkl file (needs sklearn to unpickle).
+        """
+        with open(model_path, "rb") as f:
+            return cls.from_model(pickle.load(f), dtype)
+
+    def save(self, path):
+        """
+        Write the projector as one (k + 1, d) .npy file in its own dtype.
+
+        :param path: Output .npy path
+        """
+        np.save(path, np.vstack((self.mean, self.components)))
+
+    @classmethod
+    def load(cls, path, mmap=False):
+        """
+        Load a projector written by ``save``.
+
+        :param path: .npy path
+        :param mmap: Memory-map the file read-only instead of reading it into memory
+        :return: PCAProjector in the dtype it was saved with
+        """
+        matrix = np.load(path, mmap_mode="r" if mmap else None)
+        if matrix.ndim != 2 or matrix.shape[0] < 2:
+            raise ValueError(f"{path} is not a PCA projector file (shape {matrix.shape})")
+        return cls(matrix[1:], matrix[0])
+
+    def project(self, vector):
+        """
+        Project one standardized, flattened fingerprint.
+
+        :param vector: (d,) vector
+        :return: (k,) reduced vector in the projector's dtype
+        """
+        vector = np.asarray(vector, dtype=self.dtype)
+        return self.components @ vector - self.offset
+
+    def project_batch(self, vectors):
+        """
+        Project many fingerprints with one matrix product.
+
+        :param vectors: (N, d) matrix, one fingerprint per row
+        :return: (N, k) reduced vectors
+        """
+        vectors = np.asarray(vectors, dtype=self.dtype)
+        return vectors @ self.components.T - self.offset
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export a pickled PCA model as a compact projector file.")
+    parser.add_argument("model", help="Path to pca_model.pkl")
+    parser.add_argument("--output", default=PROJECTOR_FILE, help="Output .npy path")
+    parser.add_argument("--dtype", choices=["float64", "float32"], default="float64", help="Stored precision")
+    args = parser.parse_args()
+
+    projector = PCAProjector.from_pickle(args.model, np.dtype(args.dtype))
+    projector.save(args.output)
+    print(f"PCA projector ({projector.components.shape[0]}x{projector.components.shape[1]}, {args.dtype}) saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,43 +1,127 @@
-import cv2
+import argparse
 import numpy as np
 import os
 import pickle
-from sklearn.decomposition import PCA
+from concurrent.futures import ProcessPoolExecutor
 
-# Path for saving processed data
-processed_data_dir = "/home/canna/Documents/learning/fuzzy_schnoor_signature/data/processed/fingerprints"
-os.makedirs(processed_data_dir, exist_ok = True)
+# Default locations, relative to the repository root
+RAW_DATA_DIR = "data/raw/fingerprints"
+PROCESSED_DATA_DIR = "data/processed/fingerprints"
 
-def preprocess_fingerprints_as_float(image_paths):
+
+def load_standardized_fingerprint(image_path):
     """
-    Process multiple fingerprint images into high precison floating point 
-    representations with PCA
-    
+    Load one fingerprint image as a flattened, standardized float64 vector.
     """
-    all_flat_vectors = []
-    
-    # Process each fingerprint
-    for image_path in image_paths:
-        # Load the fingerprint image
-        image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
-        if image is None:
-            raise FileNotFoundError(f"Image file not found: {image_path}")
-        
-        # Normalize pixel values to [0,1] with high precision
-        normalized_image = image.astype(np.float64) / 255.0
+    import cv2
+
+    # Load the fingerprint image
+    image = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+    if image is None:
+        raise FileNotFoundError(f"Image file not found: {image_path}")
+
+    # Normalize pixel values to [0,1] with high precision
+    normalized_image = image.astype(np.float64) / 255.0
+
+    # Flatten the image into a 1D vector
+    flat_vector = normalized_image.flatten()
+
+    # Standardize with high precison
+    mean = np.mean(flat_vector, dtype=np.float64)
+    std = np.std(flat_vector, dtype = np.float64)
+    return (flat_vector - mean) / (std + 1e-8)
+
+
+# Memmap of the ingest matrix, opened once per pool worker by ``_open_ingest_memmap``
+_worker_vectors = None
 
-        # Flatten the image into a 1D vector
-        flat_vector = normalized_image.flatten()
 
-        # Standardize with high precison
-        mean = np.mean(flat_vector, dtype=np.float64)
-        std = np.std(flat_vector, dtype = np.float64)
-        standardized_vector = (flat_vector - mean) / (std + 1e-8)
+def _open_ingest_memmap(memmap_path):
+    """
+    Pool initializer: map the shared .npy once for all of this worker's tasks.
+    """
+    global _worker_vectors
+    _worker_vectors = np.load(memmap_path, mmap_mode="r+")
+
+
+def _ingest_into_memmap(task):
+    """
+    Worker: standardize one image and write it straight into the shared memmap row.
+
+    Rows are not flushed here; the mapping is shared, and the parent re-reads
+    the file after the pool has joined.
+    """
+    row, image_path = task
+    vector = load_standardized_fingerprint(image_path)
+    if vector.shape[0] != _worker_vectors.shape[1]:
+        raise ValueError(f"Image {image_path} has {vector.shape[0]} pixels, expected {_worker_vectors.shape[1]}")
+    _worker_vectors[row] = vector
+    return row
 
-        all_flat_vectors.append(standardized_vector)
 
-    # Convert to  2D array for PCA
-    all_flat_vectors = np.array(all_flat_vectors, dtype=np.float64)
+def ingest_fingerprints(image_paths, workers=1, memmap_path=None, chunksize=8):
+    """
+    Decode and standardize fingerprint images into one preallocated (N, pixels) matrix.
+
+    Rows are written as soon as each image is ready, so the corpus is never
+    held twice as a list of vectors plus a stacked copy. With ``memmap_path``
+    the matrix lives in a .npy file that pool workers write into directly,
+    so image data never travels back through the parent process.
+
+    :param image_paths: Paths of the fingerprint images, all the same size
+    :param workers: Number of worker processes (1 decodes in-process)
+    :param memmap_path: Optional .npy path to back the matrix on disk
+    :param chunksize: Images handed to a worker at a time
+    :return: (N, pixels) float64 array, or memmap when memmap_path is given
+    """
+    image_paths = list(image_paths)
+    if not image_paths:
+        raise ValueError("No fingerprint images to ingest")
+
+    # The first image fixes the row length for the whole corpus
+    first_vector = load_standardized_fingerprint(image_paths[0])
+    shape = (len(image_paths), first_vector.shape[0])
+    if memmap_path is not None:
+        vectors = np.lib.format.open_memmap(memmap_path, mode="w+", dtype=np.float64, shape=shape)
+    else:
+        vectors = np.empty(shape, dtype=np.float64)
+    vectors[0] = first_vector
+
+    remaining = list(enumerate(image_paths))[1:]
+    if workers <= 1:
+        for row, image_path in remaining:
+            vector = load_standardized_fingerprint(image_path)
+            if vector.shape[0] != shape[1]:
+                raise ValueError(f"Image {image_path} has {vector.shape[0]} pixels, expected {shape[1]}")
+            vectors[row] = vector
+    elif memmap_path is not None:
+        vectors.flush()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_open_ingest_memmap, initargs=(memmap_path,)) as executor:
+            for _ in executor.map(_ingest_into_memmap, remaining, chunksize=chunksize):
+                pass
+        vectors = np.load(memmap_path, mmap_mode="r+")
+    else:
+        paths = [image_path for _, image_path in remaining]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(load_standardized_fingerprint, paths, chunksize=chunksize)
+            for (row, image_path), vector in zip(remaining, results):
+                if vector.shape[0] != shape[1]:
+                    raise ValueError(f"Image {image_path} has {vector.shape[0]} pixels, expected {shape[1]}")
+                vectors[row] = vector
+    return vectors
+
+
+def preprocess_fingerprints_as_float(image_paths, workers=1, memmap_path=None):
+    """
+    Process multiple fingerprint images into high precison floating point
+    representations with PCA
+
+    :param image_paths: Paths of the fingerprint images
+    :param workers: Number of worker processes used to decode images
+    :param memmap_path: Optional .npy path backing the ingested matrix on disk
+    :return: (reduced_vectors, pca_model)
+    """
+    all_flat_vectors = ingest_fingerprints(image_paths, workers=workers, memmap_path=memmap_path)
 
     # Determine the valid number of components for PCA
     n_samples, n_features = all_flat_vectors.shape
@@ -45,35 +129,141 @@ def preprocess_fingerprints_as_float(image_paths):
 
     # Apply PCA if more than one sample is available
     if n_samples > 1:
+        from sklearn.decomposition import PCA
+
         pca_model = PCA(n_components=n_components)
         reduced_vectors = pca_model.fit_transform(all_flat_vectors)
     else:
         pca_model=None
-        reduced_vectors=all_flat_vectors
+        reduced_vectors=np.array(all_flat_vectors)
+
+    return reduced_vectors, pca_model
+
+
+def _batch_bounds(n_samples, batch_size, min_batch_size):
+    """
+    Split range(n_samples) into batches of ``batch_size`` rows; a short tail is
+    merged into the previous batch so every batch has at least ``min_batch_size`` rows.
+    """
+    bounds = [(start, min(start + batch_size, n_samples)) for start in range(0, n_samples, batch_size)]
+    if len(bounds) > 1 and bounds[-1][1] - bounds[-1][0] < min_batch_size:
+        start, _ = bounds[-2]
+        bounds[-2:] = [(start, n_samples)]
+    return bounds
+
+
+def iter_fingerprint_batches(source, bounds, executor=None):
+    """
+    Yield (start, batch) for each (start, stop) in ``bounds``.
+
+    :param source: List of image paths (decoded on the fly) or an (N, pixels) array / memmap
+    :param bounds: (start, stop) row ranges
+    :param executor: Optional process pool used to decode images
+    """
+    for start, stop in bounds:
+        if not isinstance(source, list):
+            yield start, np.asarray(source[start:stop], dtype=np.float64)
+            continue
+        paths = source[start:stop]
+        if executor is None:
+            vectors = map(load_standardized_fingerprint, paths)
+        else:
+            vectors = executor.map(load_standardized_fingerprint, paths)
+        yield start, np.stack(list(vectors))
+
+
+def preprocess_fingerprints_streaming(source, n_components=300, batch_size=512, workers=1, output_path=None):
+    """
+    Fit PCA in mini-batches and project the corpus, with memory bounded by the batch size.
+
+    The model is an sklearn IncrementalPCA; it exposes the same components_,
+    mean_ and transform() as PCA and is pickled to the same pca_model.pkl.
+    Images are decoded twice (one pass to fit, one to project) rather than kept.
+    Projected batches are written as they are produced; with ``output_path``
+    they go to a .npy memmap, so the reduced corpus is not held in RAM either.
+
+    :param source: List of image paths, or an (N, pixels) array / memmap such as ``ingest_fingerprints`` output
+    :param n_components: Number of components to keep (capped by samples and features)
+    :param batch_size: Rows per partial_fit batch
+    :param workers: Worker processes for decoding image paths
+    :param output_path: Optional .npy path backing the (N, n_components) result on disk
+    :return: (reduced_vectors, pca_model); reduced_vectors is a memmap when output_path is given
+    """
+    if isinstance(source, (list, tuple)):
+        source = list(source)
+        n_samples = len(source)
+        n_features = load_standardized_fingerprint(source[0]).shape[0] if source else 0
+    else:
+        n_samples, n_features = source.shape
+    if n_samples < 2:
+        raise ValueError("Streaming PCA needs at least two fingerprints")
+
+    n_components = min(n_components, n_samples, n_features)
+    bounds = _batch_bounds(n_samples, max(batch_size, n_components), n_components)
+    from sklearn.decomposition import IncrementalPCA
+
+    pca_model = IncrementalPCA(n_components=n_components)
+    shape = (n_samples, n_components)
+    if output_path is not None:
+        reduced_vectors = np.lib.format.open_memmap(output_path, mode="w+", dtype=np.float64, shape=shape)
+    else:
+        reduced_vectors = np.empty(shape, dtype=np.float64)
+
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 and isinstance(source, list) else None
+    try:
+        for _, batch in iter_fingerprint_batches(source, bounds, executor):
+            pca_model.partial_fit(batch)
+        for start, batch in iter_fingerprint_batches(source, bounds, executor):
+            reduced_vectors[start:start + batch.shape[0]] = pca_model.transform(batch)
+    finally:
+        if executor is not None:
+            executor.shutdown()
 
+    if output_path is not None:
+        reduced_vectors.flush()
     return reduced_vectors, pca_model
 
+
 def main():
+    parser = argparse.ArgumentParser(description="Preprocess raw fingerprint images into PCA feature vectors.")
+    parser.add_argument("--input-dir", default=RAW_DATA_DIR, help="Directory of raw .bmp fingerprint images")
+    parser.add_argument("--output-dir", default=PROCESSED_DATA_DIR, help="Directory for processed vectors and the PCA model")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Worker processes for image decoding")
+    parser.add_argument("--memmap", help="Optional .npy file to stage the ingested images on disk")
+    parser.add_argument("--streaming", action="store_true", help="Fit PCA in mini-batches with bounded memory")
+    parser.add_argument("--batch-size", type=int, default=512, help="Images per mini-batch in streaming mode")
+    parser.add_argument("--reduced-memmap", help="Optional .npy file for the projected vectors in streaming mode")
+    args = parser.parse_args()
+
     # Paths to raw fingerprint images
-    raw_data_dir = "/home/canna/Documents/learning/fuzzy_schnoor_signature/data/raw/fingerprints"
-    image_files = [ os.path.join(raw_data_dir, file) for file in os.listdir(raw_data_dir) if file.endswith(".bmp")]
+    image_files = sorted(os.path.join(args.input_dir, file) for file in os.listdir(args.input_dir) if file.endswith(".bmp"))
 
     if not image_files:
-        raise ValueError("No fingerprint image files in the data/raw/fingerprints was found")
-    
+        raise ValueError(f"No fingerprint image files were found in {args.input_dir}")
+
+    os.makedirs(args.output_dir, exist_ok = True)
+
     # Preprocess fingerprints and save the results
-    reduced_vectors, pca_model = preprocess_fingerprints_as_float(image_files)
+    if args.streaming:
+        source = image_files
+        if args.memmap:
+            source = ingest_fingerprints(image_files, workers=args.workers, memmap_path=args.memmap)
+        reduced_vectors, pca_model = preprocess_fingerprints_streaming(
+            source, batch_size=args.batch_size, workers=args.workers, output_path=args.reduced_memmap
+        )
+    else:
+        reduced_vectors, pca_model = preprocess_fingerprints_as_float(image_files, workers=args.workers, memmap_path=args.memmap)
 
     # Save processed vector with high precision
     for i, vector in enumerate(reduced_vectors, start=1):
-        output_path = os.path.join(processed_data_dir, f"fingerprint_{i}_processed.npy")
+        output_path = os.path.join(args.output_dir, f"fingerprint_{i}_processed.npy")
         np.save(output_path, vector.astype(np.float64))
         print(f"Processed fingerprint saved to {output_path}")
 
 
     # Save PCA model if available
     if pca_model is not None:
-        pca_model_path = os.path.join(processed_data_dir, "pca_model.pkl")
+        pca_model_path = os.path.join(args.output_dir, "pca_model.pkl")
         with open(pca_model_path, "wb") as f:
             pickle.dump(pca_model, f)
         print(f"PCA model was saved to {pca_model_path}")
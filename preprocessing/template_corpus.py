@@ -0,0 +1,250 @@
+import argparse
+import hashlib
+import os
+import struct
+import numpy as np
+
+CORPUS_MAGIC = b"FZTC"
+CORPUS_VERSION = 1
+# magic, version, dimension, count, dtype string (e.g. "<f8"), id bytes, PCA model id
+_HEADER = struct.Struct("<4sBxxxIQ8sI64s")
+DATA_OFFSET = 128  # The matrix starts on a cache-line boundary after the header
+WRITE_CHUNK_ROWS = 65536
+
+
+def pca_model_id(model_path):
+    """
+    Identify a PCA model by the SHA-256 of its file (pca_model.pkl or a projector .npy).
+
+    :param model_path: Model file
+    :return: 64-character hex digest
+    """
+    digest = hashlib.sha256()
+    with open(model_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _encode_id(template_id, id_bytes):
+    encoded = template_id.encode() if isinstance(template_id, str) else bytes(template_id)
+    if len(encoded) > id_bytes or encoded.endswith(b"\x00"):
+        raise ValueError(f"Template id must encode to at most {id_bytes} bytes without trailing NULs")
+    return encoded
+
+
+def _layout(dimension, count, dtype, id_bytes):
+    matrix_bytes = count * dimension * dtype.itemsize
+    ids_offset = DATA_OFFSET + matrix_bytes
+    rows_offset = ids_offset + count * id_bytes
+    rows_offset += -rows_offset % 8
+    return ids_offset, rows_offset
+
+
+def _write(path, ids, dimension, dtype, row_chunks, model_id, id_bytes):
+    """
+    Write a corpus from an iterator of (rows, dimension) chunks, then swap it in atomically.
+    """
+    dtype = np.dtype(dtype)
+    encoded_ids = np.array([_encode_id(template_id, id_bytes) for template_id in ids], dtype=f"S{id_bytes}")
+    count = len(encoded_ids)
+    order = np.argsort(encoded_ids, kind="stable")
+    sorted_ids = encoded_ids[order]
+    if count > 1 and np.any(sorted_ids[1:] == sorted_ids[:-1]):
+        raise ValueError("Template ids must be unique")
+    ids_offset, rows_offset = _layout(dimension, count, dtype, id_bytes)
+
+    temporary_path = f"{path}.tmp"
+    try:
+        with open(temporary_path, "wb") as f:
+            f.write(_HEADER.pack(
+                CORPUS_MAGIC, CORPUS_VERSION, dimension, count, dtype.str.encode(), id_bytes, model_id.encode()
+            ))
+            f.write(b"\x00" * (DATA_OFFSET - _HEADER.size))
+            written = 0
+            for chunk in row_chunks:
+                chunk = np.asarray(chunk, dtype=dtype)
+                if chunk.ndim != 2 or chunk.shape[1] != dimension:
+                    raise ValueError(f"Expected rows of dimension {dimension}, got shape {chunk.shape}")
+                f.write(np.ascontiguousarray(chunk).tobytes())
+                written += len(chunk)
+            if written != count:
+                raise ValueError(f"Got {written} vectors for {count} ids")
+            f.write(sorted_ids.tobytes())
+            f.write(b"\x00" * (rows_offset - ids_offset - sorted_ids.nbytes))
+            f.write(order.astype("<i8").tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary_path, path)
+    except BaseException:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+        raise
+
+
+def write_corpus(path, ids, vectors, model_id="", dtype=None, id_bytes=32):
+    """
+    Write templates to a corpus file.
+
+    :param path: Output path
+    :param ids: N unique str or bytes ids, in row order
+    :param vectors: (N, n) matrix (array or memmap); written in chunks
+    :param model_id: Id of the PCA model that produced the vectors (see ``pca_model_id``)
+    :param dtype: Stored dtype (default: the dtype of vectors)
+    :param id_bytes: Maximum encoded length of an id
+    """
+    dtype = np.dtype(dtype if dtype is not None else np.asarray(vectors[:0]).dtype)
+    if len(vectors) != len(ids):
+        raise ValueError(f"Got {len(vectors)} vectors for {len(ids)} ids")
+    dimension = np.shape(vectors)[1]
+    chunks = (vectors[start:start + WRITE_CHUNK_ROWS] for start in range(0, len(vectors), WRITE_CHUNK_ROWS))
+    _write(path, ids, dimension, dtype, chunks, model_id, id_bytes)
+
+
+def write_corpus_from_files(path, vector_paths, model_id="", dtype=np.float64, id_bytes=32):
+    """
+    Pack one-vector-per-file .npy templates (e.g. fingerprint_{i}_processed.npy) into a corpus.
+
+    Ids are the file names without the .npy extension.
+
+    :param path: Output path
+    :param vector_paths: .npy paths, one template each
+    :param model_id: Id of the PCA model that produced the vectors
+    :param dtype: Stored dtype
+    :param id_bytes: Maximum encoded length of an id
+    """
+    ids = [os.path.splitext(os.path.basename(vector_path))[0] for vector_path in vector_paths]
+    dimension = np.load(vector_paths[0], mmap_mode="r").shape[-1] if vector_paths else 0
+
+    def chunks():
+        for start in range(0, len(vector_paths), WRITE_CHUNK_ROWS):
+            yield np.stack([np.load(vector_path).ravel() for vector_path in vector_paths[start:start + WRITE_CHUNK_ROWS]])
+
+    _write(path, ids, dimension, dtype, chunks(), model_id, id_bytes)
+
+
+class TemplateCorpus:
+    """
+    Read-only, memory-mapped template corpus.
+
+    The file is a 128-byte header (dimension, dtype, count, id width and the
+    PCA model id), the (count, dimension) template matrix, the ids sorted
+    bytewise, and the row of each sorted id. Opening maps the file and reads
+    the header only; id lookups are binary searches over the mapped sorted
+    ids, so start-up does not grow with the corpus size.
+    """
+
+    def __init__(self, path, expected_model_id=None):
+        """
+        :param path: Corpus file written by ``write_corpus``
+        :param expected_model_id: If given, raise ValueError unless the corpus was built with this PCA model
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            header = f.read(_HEADER.size)
+        if len(header) != _HEADER.size:
+            raise ValueError(f"{path} is not a template corpus")
+        magic, version, dimension, count, dtype, id_bytes, model_id = _HEADER.unpack(header)
+        if magic != CORPUS_MAGIC or version != CORPUS_VERSION:
+            raise ValueError(f"{path} is not a version {CORPUS_VERSION} template corpus")
+        self.dimension = dimension
+        self.dtype = np.dtype(dtype.rstrip(b"\x00").decode())
+        self.id_bytes = id_bytes
+        self.model_id = model_id.rstrip(b"\x00").decode()
+        if expected_model_id is not None and expected_model_id != self.model_id:
+            raise ValueError(f"{path} was built with PCA model {self.model_id!r}, expected {expected_model_id!r}")
+
+        self._count = count
+        ids_offset, rows_offset = _layout(dimension, count, self.dtype, id_bytes)
+        if count:
+            self.vectors = np.memmap(path, dtype=self.dtype, mode="r", offset=DATA_OFFSET, shape=(count, dimension))
+            self._sorted_ids = np.memmap(path, dtype=f"S{id_bytes}", mode="r", offset=ids_offset, shape=(count,))
+            self._sorted_rows = np.memmap(path, dtype="<i8", mode="r", offset=rows_offset, shape=(count,))
+        else:
+            self.vectors = np.zeros((0, dimension), dtype=self.dtype)
+            self._sorted_ids = np.zeros(0, dtype=f"S{id_bytes}")
+            self._sorted_rows = np.zeros(0, dtype=np.int64)
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, template_id):
+        try:
+            self.row(template_id)
+        except KeyError:
+            return False
+        return True
+
+    def rows(self, template_ids):
+        """
+        :param template_ids: str or bytes ids
+        :return: int64 row of each id
+        :raises KeyError: If any id is not in the corpus
+        """
+        encoded = np.array([_encode_id(template_id, self.id_bytes) for template_id in template_ids], dtype=f"S{self.id_bytes}")
+        positions = np.searchsorted(self._sorted_ids, encoded)
+        found = positions < self._count
+        found[found] = self._sorted_ids[positions[found]] == encoded[found]
+        if not found.all():
+            raise KeyError(f"Not in the corpus: {template_ids[int(np.argmin(found))]!r}")
+        return np.asarray(self._sorted_rows[positions])
+
+    def row(self, template_id):
+        """
+        :param template_id: str or bytes id
+        :return: Row of the id in ``vectors``
+        :raises KeyError: If the id is not in the corpus
+        """
+        return int(self.rows([template_id])[0])
+
+    def get(self, template_id):
+        """
+        :param template_id: str or bytes id
+        :return: Read-only view of the template (no copy)
+        """
+        return self.vectors[self.row(template_id)]
+
+    def get_range(self, start, stop):
+        """
+        :return: Read-only (stop - start, dimension) view of consecutive templates (no copy)
+        """
+        return self.vectors[start:stop]
+
+    def get_batch(self, template_ids):
+        """
+        Templates for many ids. Ids that map to consecutive rows return a view;
+        other selections are gathered into a new array.
+
+        :param template_ids: str or bytes ids
+        :return: (len(template_ids), dimension) matrix
+        """
+        rows = self.rows(template_ids)
+        if len(rows) and np.all(np.diff(rows) == 1):
+            return self.vectors[rows[0]:rows[-1] + 1]
+        return self.vectors[rows]
+
+    def ids(self):
+        """
+        :return: All ids as bytes, in row order
+        """
+        ids = np.empty(self._count, dtype=f"S{self.id_bytes}")
+        ids[self._sorted_rows] = self._sorted_ids
+        return ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack one-per-file .npy templates into a memory-mapped corpus.")
+    parser.add_argument("vectors", nargs="+", help="Template .npy files (ids are the file names)")
+    parser.add_argument("--output", required=True, help="Corpus file to write")
+    parser.add_argument("--pca-model", help="PCA model file the templates came from; its SHA-256 is stored as the model id")
+    parser.add_argument("--dtype", choices=("float64", "float32"), default="float64", help="Stored dtype")
+    args = parser.parse_args()
+
+    model_id = pca_model_id(args.pca_model) if args.pca_model else ""
+    write_corpus_from_files(args.output, sorted(args.vectors), model_id, np.dtype(args.dtype))
+    corpus = TemplateCorpus(args.output)
+    print(f"Wrote {len(corpus)} templates of dimension {corpus.dimension} ({corpus.dtype}) to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+import numpy as np
+from sklearn.decomposition import PCA
+
+from preprocessing.pca_projector import PCAProjector
+
+
+def _fitted_pca(whiten):
+    rng = np.random.default_rng(0)
+    samples = rng.normal(size=(40, 64)) @ rng.normal(size=(64, 64))
+    return PCA(n_components=10, whiten=whiten).fit(samples), samples
+
+
+def test_projection_matches_sklearn():
+    for whiten in (False, True):
+        pca_model, samples = _fitted_pca(whiten)
+        expected = pca_model.transform(samples)
+        projector = PCAProjector.from_model(pca_model)
+
+        assert np.allclose(projector.project_batch(samples), expected)
+        assert np.allclose(projector.project(samples[3]), expected[3])
+
+        projector_32 = PCAProjector.from_model(pca_model, np.float32)
+        assert projector_32.project(samples[3]).dtype == np.float32
+        assert np.allclose(projector_32.project_batch(samples), expected, rtol=1e-3, atol=1e-3)
+
+
+def test_save_and_memory_mapped_load(tmp_path):
+    pca_model, samples = _fitted_pca(False)
+    path = tmp_path / "projector.npy"
+    PCAProjector.from_model(pca_model, np.float32).save(path)
+
+    projector = PCAProjector.load(path, mmap=True)
+    assert isinstance(projector.components, np.memmap)
+    assert projector.dtype == np.float32
+    assert np.allclose(projector.project_batch(samples), pca_model.transform(samples), rtol=1e-3, atol=1e-3)
@@ -0,0 +1,65 @@
+import os
+import numpy as np
+import pytest
+from preprocessing.preprocess_fingerprints import (
+    ingest_fingerprints, load_standardized_fingerprint, preprocess_fingerprints_as_float,
+    preprocess_fingerprints_streaming,
+)
+
+cv2 = pytest.importorskip("cv2")
+
+
+@pytest.fixture
+def image_paths(tmp_path):
+    rng = np.random.default_rng(0)
+    # Low-rank images, so a few principal components carry almost all of the variance
+    basis = rng.normal(0, 1, size=(5, 24 * 20))
+    paths = []
+    for i in range(60):
+        pixels = rng.normal(0, 1, size=5) @ basis
+        image = np.clip(128 + 20 * pixels, 0, 255).astype(np.uint8).reshape(24, 20)
+        path = str(tmp_path / f"fingerprint_{i}.bmp")
+        cv2.imwrite(path, image)
+        paths.append(path)
+    return paths
+
+
+def test_ingest_matches_sequential_loading(image_paths, tmp_path):
+    expected = np.stack([load_standardized_fingerprint(path) for path in image_paths])
+    assert np.array_equal(ingest_fingerprints(image_paths), expected)
+    assert np.array_equal(ingest_fingerprints(image_paths, workers=2, chunksize=4), expected)
+
+    memmap_path = str(tmp_path / "ingest.npy")
+    ingested = ingest_fingerprints(image_paths, workers=2, memmap_path=memmap_path, chunksize=4)
+    assert isinstance(ingested, np.memmap)
+    assert np.array_equal(ingested, expected)
+    assert np.array_equal(np.load(memmap_path), expected)
+
+
+def test_ingest_rejects_mismatched_sizes(image_paths, tmp_path):
+    path = str(tmp_path / "small.bmp")
+    cv2.imwrite(path, np.zeros((10, 10), dtype=np.uint8))
+    with pytest.raises(ValueError):
+        ingest_fingerprints(image_paths[:3] + [path])
+
+
+def test_incremental_pca_matches_pca_up_to_sign(image_paths, tmp_path):
+    n_components = 5
+    reduced, pca_model = preprocess_fingerprints_as_float(image_paths)
+    reduced = reduced[:, :n_components]
+
+    output_path = str(tmp_path / "reduced.npy")
+    streamed, incremental_model = preprocess_fingerprints_streaming(
+        image_paths, n_components=n_components, batch_size=16, output_path=output_path
+    )
+    assert streamed.shape == (len(image_paths), n_components)
+    assert np.array_equal(np.load(output_path), streamed)
+    assert np.allclose(incremental_model.mean_, pca_model.mean_)
+
+    # Components are defined up to sign; align each one before comparing
+    signs = np.sign(np.einsum("ij,ij->i", incremental_model.components_, pca_model.components_[:n_components]))
+    assert np.allclose(incremental_model.components_ * signs[:, np.newaxis], pca_model.components_[:n_components], atol=1e-4)
+    assert np.allclose(streamed * signs, reduced, rtol=1e-3, atol=1e-3)
+
+    in_memory, _ = preprocess_fingerprints_streaming(image_paths, n_components=n_components, batch_size=16)
+    assert np.allclose(in_memory, streamed)
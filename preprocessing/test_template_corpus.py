@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+from preprocessing.template_corpus import TemplateCorpus, write_corpus, write_corpus_from_files
+
+
+def test_corpus_round_trip_and_lookups(tmp_path):
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(1000, 12)).astype(np.float32)
+    ids = [f"user-{i}" for i in rng.permutation(1000)]
+    path = tmp_path / "templates.fztc"
+    write_corpus(path, ids, vectors, model_id="abc123")
+
+    corpus = TemplateCorpus(path, expected_model_id="abc123")
+    assert (len(corpus), corpus.dimension, corpus.dtype) == (1000, 12, np.float32)
+    assert np.array_equal(corpus.vectors, vectors)
+    assert corpus.ids().tolist() == [template_id.encode() for template_id in ids]
+
+    # Single and consecutive lookups are views into the mapping
+    assert np.array_equal(corpus.get(ids[17]), vectors[17])
+    assert np.shares_memory(corpus.get(ids[17]), corpus.vectors)
+    assert np.shares_memory(corpus.get_batch(ids[5:9]), corpus.vectors)
+    assert np.array_equal(corpus.get_batch([ids[9], ids[2]]), vectors[[9, 2]])
+
+    assert ids[3] in corpus and "nobody" not in corpus
+    with pytest.raises(KeyError):
+        corpus.get_batch([ids[0], "nobody"])
+    with pytest.raises(ValueError):
+        TemplateCorpus(path, expected_model_id="other")
+    with pytest.raises(ValueError):
+        write_corpus(tmp_path / "duplicates.fztc", ["a", "a"], vectors[:2])
+
+
+def test_corpus_from_processed_fingerprint_files(tmp_path):
+    paths = ["data/processed/fingerprints/fingerprint_1_processed_2.npy", "data/processed/fingerprints/fingerprint_2_processed_2.npy"]
+    write_corpus_from_files(tmp_path / "fingerprints.fztc", paths)
+    corpus = TemplateCorpus(tmp_path / "fingerprints.fztc")
+    assert np.array_equal(corpus.get("fingerprint_2_processed_2"), np.load(paths[1]))
+
+
+
+def test_failed_write_keeps_previous_corpus(tmp_path):
+    path = tmp_path / "templates.fztc"
+    write_corpus(path, ["a", "b"], np.ones((2, 3)))
+
+    # The second file has the wrong dimension, so the write fails after the temporary file is opened
+    np.save(tmp_path / "a.npy", np.zeros(3))
+    np.save(tmp_path / "b.npy", np.zeros(4))
+    with pytest.raises(ValueError):
+        write_corpus_from_files(path, [str(tmp_path / "a.npy"), str(tmp_path / "b.npy")])
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["a.npy", "b.npy", "templates.fztc"]
+    assert np.array_equal(TemplateCorpus(path).vectors, np.ones((2, 3)))
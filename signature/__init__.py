@@ -0,0 +1,32 @@
+import importlib
+
+# Public names and the submodule defining each; submodules (and the ECC backend) load on first access
+_EXPORTS = {
+    "KEY_ENCODING_VERSION": "signature.key_generation",
+    "P256_ORDER": "signature.key_generation",
+    "fuzzy_key_setting": "signature.key_generation",
+    "fuzzy_key_setting_batch": "signature.key_generation",
+    "generate_key_pair": "signature.key_generation",
+    "generate_key_pair_batch": "signature.key_generation",
+    "sign": "signature.fuzzy_signature",
+    "fuzzy_sign": "signature.fuzzy_signature",
+    "verify": "signature.fuzzy_signature",
+    "batch_verify": "signature.fuzzy_signature",
+    "evaluate_acceptance_radii": "signature.fuzzy_setting",
+    "FuzzyKeySetting": "signature.fuzzy_setting",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module 'signature' has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
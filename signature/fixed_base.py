@@ -0,0 +1,139 @@
+from functools import lru_cache
+from Crypto.PublicKey import ECC
+
+# The fast paths below use pycryptodome internals (pinned in experiments/requirements.txt);
+# other versions fall back to the public EccPoint API
+try:
+    from Crypto.PublicKey._point import EccPoint
+    from Crypto.Util._raw_api import c_size_t, c_uint8_ptr
+    RAW_POINTS = True
+except ImportError:
+    from Crypto.PublicKey.ECC import EccPoint
+    RAW_POINTS = False
+
+
+def clone_point(point):
+    """
+    Copy an EC point through the raw library's clone.
+
+    ``EccPoint.copy`` round-trips through affine coordinates and re-validates
+    the point, which is roughly 100x slower than cloning the internal
+    representation.
+    Args:
+        point (EccPoint): Point to copy.
+    Returns:
+        EccPoint: Independent copy of the point.
+    """
+    if not RAW_POINTS:
+        return point.copy()
+    clone = EccPoint.__new__(EccPoint)
+    clone._curve = point._curve
+    clone.curve = point.curve
+    return clone.set(point)
+
+
+def encode_point(point):
+    """
+    Encode a point as big-endian affine X || Y straight from the raw library.
+
+    ``EccPoint.xy`` builds two ``Integer`` objects only for callers to turn
+    them back into bytes; this writes the bytes directly.
+    Args:
+        point (EccPoint): Point to encode.
+    Returns:
+        bytes: X || Y, each coordinate padded to the curve's field size.
+    """
+    size = point.size_in_bytes()
+    if not RAW_POINTS:
+        x, y = point.xy
+        return int(x).to_bytes(size, "big") + int(y).to_bytes(size, "big")
+    x_bytes = bytearray(size)
+    y_bytes = bytearray(size)
+    result = point._curve.rawlib.get_xy(
+        c_uint8_ptr(x_bytes), c_uint8_ptr(y_bytes), c_size_t(size), point._point.get()
+    )
+    if result:
+        raise ValueError(f"Error {result} while encoding an EC point")
+    return bytes(x_bytes + y_bytes)
+
+
+class FixedBaseTable:
+    """
+    Windowed comb table for multiplying one fixed point by many scalars.
+
+    Row i holds j·2^(w·i)·B for every w-bit digit j, so k·B is the sum of one
+    entry per row: 256/w in-place additions and no doublings. Every row is
+    added, including zero digits (the point at infinity), so the number of
+    additions does not depend on the scalar. Table lookups are plain Python
+    list indexing and the point additions take data-dependent time, so the
+    table is not constant time: use it for public scalars (verification) and
+    enrollment-time public-key derivation, never for signing nonces.
+    """
+
+    def __init__(self, base, order, window=8):
+        """
+        Args:
+            base (EccPoint): Fixed base point B.
+            order (int): Order of B; scalars are reduced modulo it.
+            window (int): Digit width w in bits; the table holds (bits / w)·2^w points.
+        """
+        self.order = int(order)
+        self.window = window
+        self._mask = (1 << window) - 1
+        self._rows = -(-self.order.bit_length() // window)
+
+        infinity = base.point_at_infinity()
+        self._table = []
+        row_base = clone_point(base)
+        for _ in range(self._rows):
+            row = [infinity]
+            multiple = clone_point(row_base)
+            for _ in range(self._mask):
+                row.append(clone_point(multiple))
+                multiple += row_base
+            self._table.append(row)
+            row_base = multiple  # 2^w times the previous row base
+
+    def multiply(self, scalar):
+        """
+        Compute scalar·B.
+        Args:
+            scalar (int): Scalar, reduced modulo the order.
+        Returns:
+            EccPoint: New point scalar·B.
+        """
+        scalar = int(scalar) % self.order
+        mask = self._mask
+        window = self.window
+        rows = self._table
+        result = clone_point(rows[0][scalar & mask])
+        for i in range(1, self._rows):
+            result += rows[i][(scalar >> (window * i)) & mask]
+        return result
+
+    def multiply_batch(self, scalars):
+        """
+        Compute scalar·B for every scalar.
+        Args:
+            scalars (iterable of int): Scalars, reduced modulo the order.
+        Returns:
+            list: New EccPoint per scalar.
+        """
+        return [self.multiply(scalar) for scalar in scalars]
+
+
+@lru_cache(maxsize=None)
+def generator_table(curve="P-256", window=8):
+    """
+    Process-wide comb table for the curve generator, built on first use.
+
+    For P-256 with an 8-bit window this holds 32·256 points (a few MB) and
+    takes well under a second to build.
+    Args:
+        curve (str): Curve name.
+        window (int): Digit width in bits.
+    Returns:
+        FixedBaseTable: Table for the curve generator.
+    """
+    curve_params = ECC._curves[curve]
+    return FixedBaseTable(curve_params.G, curve_params.order, window)
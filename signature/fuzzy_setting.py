@@ -1,18 +1,143 @@
 import numpy as np
 from linear_sketch.linear_sketch import LinearSketch
 
+# Rows per block when comparing sketch populations; a block of distances is BLOCK_SIZE² floats
+BLOCK_SIZE = 1024
+
+
+def _as_matrix(sketches):
+    sketches = np.asarray(sketches)
+    if sketches.ndim != 2:
+        raise ValueError(f"Expected an (N, n) matrix of sketches, got shape {sketches.shape}")
+    return sketches
+
+
+def _count_within(squared_distances, squared_radii):
+    """
+    Count, for every radius, how many distances fall inside it (distance <= radius).
+
+    The block is sorted once and each radius is located by binary search, so
+    extra radii cost O(log m) each instead of another pass over the block.
+    """
+    ordered = np.sort(squared_distances, axis=None)
+    return np.searchsorted(ordered, squared_radii, side="right")
+
+
+def pairwise_distance_blocks(sketches_a, sketches_b=None, block_size=BLOCK_SIZE):
+    """
+    Yield squared Euclidean distances between two sketch populations, one block at a time.
+
+    Distances use ||a||² + ||b||² - 2a·b with one matrix product per block, so
+    peak memory is a few block_size² arrays whatever the population size.
+
+    Parameters:
+    - sketches_a (numpy array): (N, n) sketches; memmaps are read block by block.
+    - sketches_b (numpy array): (M, n) sketches, or None to compare sketches_a with itself.
+    - block_size (int): Rows per block.
+
+    Yields:
+    - (row_start, col_start, squared_distances): A block of the N x M distance matrix.
+      When sketches_b is None only blocks with col_start >= row_start are produced.
+    """
+    sketches_a = _as_matrix(sketches_a)
+    symmetric = sketches_b is None
+    sketches_b = sketches_a if symmetric else _as_matrix(sketches_b)
+
+    col_blocks = []
+    for col_start in range(0, len(sketches_b), block_size):
+        block = np.asarray(sketches_b[col_start:col_start + block_size], dtype=np.float64)
+        col_blocks.append((col_start, block, np.einsum("ij,ij->i", block, block)))
+
+    for row_start in range(0, len(sketches_a), block_size):
+        rows = np.asarray(sketches_a[row_start:row_start + block_size], dtype=np.float64)
+        row_norms = np.einsum("ij,ij->i", rows, rows)
+        for col_start, cols, col_norms in col_blocks:
+            if symmetric and col_start < row_start:
+                continue
+            squared = row_norms[:, np.newaxis] + col_norms[np.newaxis, :] - 2.0 * (rows @ cols.T)
+            np.maximum(squared, 0.0, out=squared)
+            yield row_start, col_start, squared
+
+
+def evaluate_acceptance_radii(sketches, perturbed_sketches, radii, block_size=BLOCK_SIZE):
+    """
+    Compute FNMR, FMR and ConFMR for many acceptance radii in one pass over the data.
+
+    A pair is accepted when the Euclidean distance between its sketches is at
+    most the radius, as in ``LinearSketch.verify_acceptance``.
+    - FNMR: genuine pairs (sketches[i], perturbed_sketches[i]) that are rejected.
+    - FMR: impostor pairs (perturbed_sketches[i], sketches[j]), i != j, that are accepted.
+    - ConFMR: distinct enrolled pairs (sketches[i], sketches[j]), i < j, that are accepted.
+
+    Parameters:
+    - sketches (numpy array): (N, n) enrolled sketches.
+    - perturbed_sketches (numpy array): (N, n) noisy re-captures, row i belonging to sketches[i];
+      None skips FNMR and FMR.
+    - radii (iterable of float): Acceptance radii to evaluate.
+    - block_size (int): Rows per distance block.
+
+    Returns:
+    - rates (dict): "radii" plus "fnmr", "fmr" and "confmr" arrays aligned with it.
+    """
+    sketches = _as_matrix(sketches)
+    radii = np.asarray(radii, dtype=np.float64)
+    squared_radii = radii ** 2
+    n_templates = len(sketches)
+
+    def as_rate(counts, total):
+        return counts / total if total else np.zeros(len(radii))
+
+    confmr_counts = np.zeros(len(radii), dtype=np.int64)
+    for row_start, col_start, squared in pairwise_distance_blocks(sketches, block_size=block_size):
+        if row_start == col_start:
+            squared = squared[np.triu_indices(len(squared), k=1)]
+        confmr_counts += _count_within(squared, squared_radii)
+    rates = {
+        "radii": radii,
+        "confmr": as_rate(confmr_counts, n_templates * (n_templates - 1) // 2),
+    }
+
+    if perturbed_sketches is not None:
+        perturbed_sketches = _as_matrix(perturbed_sketches)
+        if perturbed_sketches.shape != sketches.shape:
+            raise ValueError("sketches and perturbed_sketches must have the same shape")
+
+        genuine_counts = np.zeros(len(radii), dtype=np.int64)
+        impostor_counts = np.zeros(len(radii), dtype=np.int64)
+        for start in range(0, n_templates, block_size):
+            # Genuine pairs are close, so take the difference directly rather than the expanded form
+            delta = (np.asarray(perturbed_sketches[start:start + block_size], dtype=np.float64)
+                     - np.asarray(sketches[start:start + block_size], dtype=np.float64))
+            genuine_squared = np.einsum("ij,ij->i", delta, delta)
+            genuine_counts += _count_within(genuine_squared, squared_radii)
+        for row_start, col_start, squared in pairwise_distance_blocks(perturbed_sketches, sketches, block_size):
+            impostor_counts += _count_within(squared, squared_radii)
+            if row_start == col_start:
+                impostor_counts -= _count_within(np.diagonal(squared), squared_radii)
+
+        rates["fnmr"] = 1.0 - as_rate(genuine_counts, n_templates)
+        rates["fmr"] = as_rate(impostor_counts, n_templates * (n_templates - 1))
+    return rates
+
+
 class FuzzyKeySetting:
-    def __init__(self, acceptance_radius=15.0, error_tolerance=0.01):
+    def __init__(self, basis_vectors, modulus=None, acceptance_radius=15.0, error_tolerance=0.01):
         """
         Initializes the fuzzy key setting.
         
         Parameters:
+        - basis_vectors (numpy array, Lattice or LinearSketch): Lattice basis (or Lattice) for a new
+          LinearSketch, or an existing LinearSketch to share.
+        - modulus (int): Modulus p of the proxy keys; required unless a LinearSketch is given.
         - acceptance_radius (float): The radius defining the acceptance region AR.
         - error_tolerance (float): The error tolerance for FNMR calculation.
         """
         self.acceptance_radius = acceptance_radius
         self.error_tolerance = error_tolerance
-        self.linear_sketch = LinearSketch(acceptance_radius=acceptance_radius)
+        if isinstance(basis_vectors, LinearSketch):
+            self.linear_sketch = basis_vectors
+        else:
+            self.linear_sketch = LinearSketch(basis_vectors, modulus, default_radius=acceptance_radius)
 
     def generate_sketch(self, fingerprint_vector):
         """
@@ -22,9 +147,10 @@ class FuzzyKeySetting:
         - fingerprint_vector (numpy array): The input fingerprint vector.
         
         Returns:
-        - sketch (numpy array): The generated sketch.
+        - sketch (numpy array): The generated sketch c (the proxy key is dropped).
         """
-        return self.linear_sketch.generate_sketch(fingerprint_vector)
+        sketch, _ = self.linear_sketch.sketch(fingerprint_vector)
+        return sketch
 
     def is_within_acceptance_region(self, sketch_1, sketch_2):
         """
@@ -37,7 +163,7 @@ class FuzzyKeySetting:
         Returns:
         - within_region (bool): True if sketch_2 is within the acceptance region of sketch_1.
         """
-        return self.linear_sketch.is_within_acceptance_region(sketch_1, sketch_2)
+        return bool(np.linalg.norm(np.asarray(sketch_2) - np.asarray(sketch_1)) <= self.acceptance_radius)
 
     def calculate_fnmr(self, sketches, perturbed_sketches):
         """
@@ -50,12 +176,8 @@ class FuzzyKeySetting:
         Returns:
         - fnmr (float): The calculated FNMR.
         """
-        mismatches = 0
-        total = len(sketches)
-        for original, perturbed in zip(sketches, perturbed_sketches):
-            if not self.is_within_acceptance_region(original, perturbed):
-                mismatches += 1
-        return mismatches / total
+        rates = evaluate_acceptance_radii(sketches, perturbed_sketches, [self.acceptance_radius])
+        return float(rates["fnmr"][0])
 
     def calculate_confmr(self, sketches):
         """
@@ -67,11 +189,5 @@ class FuzzyKeySetting:
         Returns:
         - confmr (float): The calculated ConFMR.
         """
-        matches = 0
-        total = 0
-        for i in range(len(sketches)):
-            for j in range(i + 1, len(sketches)):
-                total += 1
-                if self.is_within_acceptance_region(sketches[i], sketches[j]):
-                    matches += 1
-        return matches / total if total > 0 else 0.0
+        rates = evaluate_acceptance_radii(sketches, None, [self.acceptance_radius])
+        return float(rates["confmr"][0])
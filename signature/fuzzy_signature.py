@@ -0,0 +1,227 @@
+import secrets
+from hashlib import sha256, sha512
+from Crypto.PublicKey import ECC
+from Crypto.PublicKey.ECC import EccPoint
+from signature.fixed_base import clone_point, encode_point, generator_table
+from signature.key_generation import generate_key_pair
+
+CURVE = ECC._curves["P-256"]
+ORDER = int(CURVE.order)
+COORDINATE_BYTES = 32
+SIGNATURE_BYTES = 3 * COORDINATE_BYTES  # R.x || R.y || s
+
+# Randomizers for batch verification; a forged batch passes with probability about 2^-128
+BATCH_RANDOMIZER_BITS = 128
+
+
+def _challenge(r_bytes, public_key_bytes, message):
+    """
+    Compute the Schnorr challenge e = H(R || P || m) mod n.
+    """
+    digest = sha256(r_bytes + public_key_bytes + message).digest()
+    return int.from_bytes(digest, "big") % ORDER
+
+
+def _nonce(private_key_int, message):
+    """
+    Derive a deterministic nonce from the private key and message.
+
+    A 512-bit hash is reduced modulo the 256-bit group order, so the bias is negligible.
+    """
+    digest = sha512(private_key_int.to_bytes(COORDINATE_BYTES, "big") + sha256(message).digest()).digest()
+    return int.from_bytes(digest, "big") % (ORDER - 1) + 1
+
+
+def sign(private_key, message):
+    """
+    Sign a message with a Schnorr signature over P-256.
+    Args:
+        private_key (EccKey): Private key, e.g. ``generate_key_pair(...)["private_key"]``.
+        message (bytes): Message to sign.
+    Returns:
+        bytes: Signature R.x || R.y || s (96 bytes).
+    """
+    d = int(private_key.d)
+    public_key_bytes = encode_point(private_key.pointQ)
+
+    k = _nonce(d, message)
+    # The nonce is secret: use pycryptodome's native multiplication, not the (non-constant-time) comb table
+    r_point = CURVE.G * k
+    r_bytes = encode_point(r_point)
+
+    e = _challenge(r_bytes, public_key_bytes, message)
+    s = (k + e * d) % ORDER
+    return r_bytes + s.to_bytes(COORDINATE_BYTES, "big")
+
+
+def fuzzy_sign(sketch, lattice_basis, message):
+    """
+    Sign a message with the key pair derived from a fuzzy sketch.
+    Args:
+        sketch (numpy array): The linear sketch of the biometric data.
+        lattice_basis (numpy array): Basis for the triangular lattice.
+        message (bytes): Message to sign.
+    Returns:
+        tuple: (signature bytes, public key) so the verifier can be handed the public key.
+    """
+    key_pair = generate_key_pair(sketch, lattice_basis)
+    return sign(key_pair["private_key"], message), key_pair["public_key"]
+
+
+def _decode_signature(signature):
+    """
+    Split a signature into (R bytes, R point, s); returns None if it is malformed.
+    """
+    if len(signature) != SIGNATURE_BYTES:
+        return None
+    r_bytes = bytes(signature[: 2 * COORDINATE_BYTES])
+    s = int.from_bytes(signature[2 * COORDINATE_BYTES:], "big")
+    if s >= ORDER:
+        return None
+    x = int.from_bytes(r_bytes[:COORDINATE_BYTES], "big")
+    y = int.from_bytes(r_bytes[COORDINATE_BYTES:], "big")
+    if x == 0 and y == 0:  # Encoding of the point at infinity
+        return None
+    try:
+        r_point = EccPoint(x, y, "P-256")
+    except ValueError:
+        return None
+    return r_bytes, r_point, s
+
+
+def verify(public_key, message, signature):
+    """
+    Verify a Schnorr signature: s·G == R + e·P.
+    Args:
+        public_key (EccKey): Signer's public key.
+        message (bytes): Signed message.
+        signature (bytes): Signature produced by ``sign``.
+    Returns:
+        bool: True if the signature is valid.
+    """
+    decoded = _decode_signature(signature)
+    if decoded is None:
+        return False
+    r_bytes, r_point, s = decoded
+
+    public_point = public_key.pointQ
+    e = _challenge(r_bytes, encode_point(public_point), message)
+
+    lhs = generator_table().multiply(s)
+    rhs = clone_point(public_point)
+    rhs *= e
+    rhs += r_point
+    return lhs == rhs
+
+
+def multi_scalar_mult(points, scalars):
+    """
+    Compute Σ scalars[i]·points[i] with Pippenger's bucket method.
+
+    Every bucket and running sum is updated in place, so each step costs one
+    point addition and no point copies.
+    Args:
+        points (list of EccPoint): Points on the same curve.
+        scalars (list of int): Non-negative scalars, one per point.
+    Returns:
+        EccPoint or None: The sum, or None for the point at infinity (e.g. empty input).
+    """
+    if len(points) != len(scalars):
+        raise ValueError("points and scalars must have the same length")
+    if not points:
+        return None
+
+    max_bits = max(int(scalar).bit_length() for scalar in scalars)
+    if max_bits == 0:
+        return None
+    # Each window costs one addition per point plus about two per bucket
+    window = min(range(1, 17), key=lambda c: -(-max_bits // c) * (len(points) + (2 << c)))
+    mask = (1 << window) - 1
+
+    result = None
+    for shift in reversed(range(0, max_bits, window)):
+        if result is not None:
+            for _ in range(window):
+                result.double()
+
+        buckets = [None] * (mask + 1)
+        for point, scalar in zip(points, scalars):
+            digit = (scalar >> shift) & mask
+            if digit:
+                if buckets[digit] is None:
+                    buckets[digit] = clone_point(point)
+                else:
+                    buckets[digit] += point
+
+        # Σ j·bucket[j] as a running sum from the top bucket down
+        running = None
+        window_sum = None
+        for bucket in reversed(buckets[1:]):
+            if bucket is not None:
+                if running is None:
+                    running = bucket
+                else:
+                    running += bucket
+            if running is not None:
+                if window_sum is None:
+                    window_sum = clone_point(running)
+                else:
+                    window_sum += running
+
+        if window_sum is not None:
+            if result is None:
+                result = window_sum
+            else:
+                result += window_sum
+    return result
+
+
+def batch_verify(items):
+    """
+    Verify many Schnorr signatures at once with a randomized linear combination.
+
+    Checks (Σ z_i·s_i)·G == Σ z_i·R_i + Σ (z_i·e_i)·P_i for random 128-bit z_i,
+    with the right-hand side as a single multi-scalar multiplication. A False
+    result only says that at least one signature is invalid; call ``verify`` on
+    each item to find it.
+    Args:
+        items (iterable): (message, signature, public_key) triples.
+    Returns:
+        bool: True if every signature is valid.
+    """
+    points = []
+    scalars = []
+    g_scalar = 0
+    # The same public key often signs many messages in a burst: encode it once
+    # and fold all of its terms into a single MSM point
+    public_keys = {}
+    for message, signature, public_key in items:
+        decoded = _decode_signature(signature)
+        if decoded is None:
+            return False
+        r_bytes, r_point, s = decoded
+
+        public_point = public_key.pointQ
+        key_id = id(public_point)
+        if key_id not in public_keys:
+            public_keys[key_id] = [public_point, encode_point(public_point), 0]
+        entry = public_keys[key_id]
+        e = _challenge(r_bytes, entry[1], message)
+
+        z = secrets.randbits(BATCH_RANDOMIZER_BITS) | 1
+        g_scalar = (g_scalar + z * s) % ORDER
+        points.append(r_point)
+        scalars.append(z)
+        entry[2] = (entry[2] + z * e) % ORDER
+
+    if not points:
+        return True
+    for public_point, _, scalar in public_keys.values():
+        points.append(public_point)
+        scalars.append(scalar)
+
+    rhs = multi_scalar_mult(points, scalars)
+    lhs = generator_table().multiply(g_scalar)
+    if rhs is None:
+        return lhs.is_point_at_infinity()
+    return lhs == rhs
@@ -1,45 +1,160 @@
+import struct
 import numpy as np
 from hashlib import sha256
-from Crypto.PublicKey import ECC
-from linear_sketch.linear_sketch import LinearSketch
+from linear_sketch import instrumentation
 
+# Version 0 hashes the comma-joined str() of every float (the original scheme).
+# Version 1 hashes a canonical binary encoding, independent of numpy's float printing.
+KEY_ENCODING_VERSION = 1
+KEY_ENCODING_MAGIC = b"FZKS"
 
-def fuzzy_key_setting(sketch, lattice_basis):
+# Version 1 stores values as little-endian int64 fixed point with this many fractional bits
+FIXED_POINT_BITS = 24
+_FIXED_POINT_SCALE = float(1 << FIXED_POINT_BITS)
+_FIXED_POINT_LIMIT = float(2 ** 63 - 1) / _FIXED_POINT_SCALE
+
+# Order of the P-256 group; private keys are reduced modulo it without loading the ECC backend
+P256_ORDER = 0xFFFFFFFF00000000FFFFFFFFFFFFFFFFBCE6FAADA7179E84F3B9CAC2FC632551
+
+
+def _to_fixed_point(values):
+    """
+    Convert floats to little-endian int64 fixed point (round half to even).
+    Args:
+        values (numpy array): Values to convert.
+    Returns:
+        numpy array: C-contiguous '<i8' array of the same shape.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if not np.all(np.isfinite(values)) or np.any(np.abs(values) >= _FIXED_POINT_LIMIT):
+        raise ValueError("Key material must be finite and fit the int64 fixed-point range")
+    return np.ascontiguousarray(np.rint(values * _FIXED_POINT_SCALE), dtype="<i8")
+
+
+def _canonical_prefix(sketch_length, lattice_basis):
+    """
+    Hash state over the version-1 header and basis, shared by every sketch under that basis.
+
+    Layout: magic || version (u8) || sketch length (u32) || basis rows (u32) || basis cols (u32)
+    || basis (i64 fixed point), followed by the sketch (i64 fixed point) when hashing a key.
+    """
+    lattice_basis = np.atleast_2d(np.asarray(lattice_basis, dtype=np.float64))
+    header = KEY_ENCODING_MAGIC + struct.pack("<BIII", 1, sketch_length, *lattice_basis.shape)
+    hasher = sha256(header)
+    hasher.update(memoryview(_to_fixed_point(lattice_basis)).cast("B"))
+    return hasher
+
+
+def _legacy_digest(sketch, lattice_basis):
+    # Concatenate sketch and lattice basis
+    combined_data = np.concatenate((sketch, lattice_basis.flatten()))
+    combined_string = ",".join(map(str, combined_data))
+    return sha256(combined_string.encode()).digest()
+
+
+def fuzzy_key_setting(sketch, lattice_basis, encoding_version=KEY_ENCODING_VERSION):
     """
     Derive a deterministic private key using the fuzzy sketch and lattice basis.
     Args:
         sketch (numpy array): The linear sketch of the biometric data.
         lattice_basis (numpy array): Basis for the triangular lattice.
+        encoding_version (int): 1 for the canonical binary encoding, 0 for the legacy text encoding.
     Returns:
         int: Deterministic private key.
     """
-    # Concatenate sketch and lattice basis
-    combined_data = np.concatenate((sketch, lattice_basis.flatten()))
-    combined_string = ",".join(map(str, combined_data))
+    if encoding_version == 0:
+        digest = _legacy_digest(sketch, lattice_basis)
+    elif encoding_version == 1:
+        fixed_sketch = _to_fixed_point(sketch).reshape(-1)
+        hasher = _canonical_prefix(fixed_sketch.size, lattice_basis)
+        hasher.update(memoryview(fixed_sketch).cast("B"))
+        digest = hasher.digest()
+    else:
+        raise ValueError(f"Unknown key encoding version: {encoding_version}")
 
-    # Hash the concatenated string and reduce modulo ECC order
-    hashed = sha256(combined_string.encode()).hexdigest()
-    ecc_order = int(ECC._curves['P-256'].order)  # Convert to standard Python integer
-    private_key_int = int(hashed, 16) % ecc_order
+    # Reduce the hash modulo ECC order
+    private_key_int = int.from_bytes(digest, "big") % P256_ORDER
     return private_key_int
 
-def generate_key_pair(sketch, lattice_basis):
+def fuzzy_key_setting_batch(sketches, lattice_basis, encoding_version=KEY_ENCODING_VERSION):
     """
-    Generate an ECC key pair using the fuzzy sketch and lattice basis.
+    Derive private keys for many sketches under one lattice basis.
+
+    With the binary encoding the whole (N, n) matrix is converted to fixed
+    point in one pass, the header and basis are hashed once, and each row is
+    hashed from a slice of one memoryview, so no per-row bytes are built.
     Args:
-        sketch (numpy array): The linear sketch of the biometric data.
+        sketches (numpy array): (N, n) matrix of sketches, one per row.
         lattice_basis (numpy array): Basis for the triangular lattice.
+        encoding_version (int): 1 for the canonical binary encoding, 0 for the legacy text encoding.
     Returns:
-        dict: A dictionary containing the private and public keys.
+        list: Deterministic private key per sketch, same as ``fuzzy_key_setting`` row by row.
     """
-    # Generate the private key
-    private_key_int = fuzzy_key_setting(sketch, lattice_basis)
-    private_key = ECC.construct(curve="P-256", d=private_key_int)
-    public_key = private_key.public_key()
+    sketches = np.asarray(sketches)
+    if sketches.ndim != 2:
+        raise ValueError(f"Expected an (N, n) matrix of sketches, got shape {sketches.shape}")
+    if encoding_version != 1:
+        return [fuzzy_key_setting(sketch, lattice_basis, encoding_version) for sketch in sketches]
+
+    fixed_sketches = _to_fixed_point(sketches)
+    row_bytes = fixed_sketches.shape[1] * fixed_sketches.itemsize
+    buffer = memoryview(fixed_sketches).cast("B")
+    prefix = _canonical_prefix(fixed_sketches.shape[1], lattice_basis)
+
+    private_keys = []
+    for start in range(0, len(buffer), row_bytes):
+        hasher = prefix.copy()
+        hasher.update(buffer[start:start + row_bytes])
+        private_keys.append(int.from_bytes(hasher.digest(), "big") % P256_ORDER)
+    return private_keys
+
+def _key_pair_from_private_int(private_key_int, public_point):
+    from Crypto.PublicKey import ECC
 
+    # EccKey takes the point as-is instead of recomputing it through a generic scalar multiplication
+    private_key = ECC.EccKey(curve="P-256", d=private_key_int, point=public_point)
+    public_key = ECC.EccKey(curve="P-256", point=public_point)
     return {
         "private_key": private_key,
         "public_key": public_key,
     }
 
+def generate_key_pair(sketch, lattice_basis, encoding_version=KEY_ENCODING_VERSION):
+    """
+    Generate an ECC key pair using the fuzzy sketch and lattice basis.
+    Args:
+        sketch (numpy array): The linear sketch of the biometric data.
+        lattice_basis (numpy array): Basis for the triangular lattice.
+        encoding_version (int): Encoding passed to ``fuzzy_key_setting``.
+    Returns:
+        dict: A dictionary containing the private and public keys.
+    """
+    from signature.fixed_base import generator_table
+
+    with instrumentation.get_instrumentation().timer(instrumentation.KEYGEN):
+        # Generate the private key
+        private_key_int = fuzzy_key_setting(sketch, lattice_basis, encoding_version)
+
+        # Q = dG from the shared comb table
+        public_point = generator_table().multiply(private_key_int)
+        return _key_pair_from_private_int(private_key_int, public_point)
+
+def generate_key_pair_batch(sketches, lattice_basis, encoding_version=KEY_ENCODING_VERSION):
+    """
+    Generate ECC key pairs for many sketches under one lattice basis.
+    Args:
+        sketches (numpy array): (N, n) matrix of sketches, one per row.
+        lattice_basis (numpy array): Basis for the triangular lattice.
+        encoding_version (int): Encoding passed to ``fuzzy_key_setting_batch``.
+    Returns:
+        list: Key pair dictionaries, one per sketch.
+    """
+    from signature.fixed_base import generator_table
 
+    with instrumentation.get_instrumentation().timer(instrumentation.KEYGEN):
+        private_key_ints = fuzzy_key_setting_batch(sketches, lattice_basis, encoding_version)
+        public_points = generator_table().multiply_batch(private_key_ints)
+    return [
+        _key_pair_from_private_int(private_key_int, public_point)
+        for private_key_int, public_point in zip(private_key_ints, public_points)
+    ]
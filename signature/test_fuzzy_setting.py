@@ -0,0 +1,52 @@
+import numpy as np
+from signature.fuzzy_setting import FuzzyKeySetting, evaluate_acceptance_radii
+
+
+def test_rates_match_pairwise_loops():
+    """
+    The blocked engine must agree with a direct loop over every pair, at every radius.
+    """
+    rng = np.random.default_rng(7)
+    sketches = rng.normal(0, 2.0, size=(53, 4))
+    perturbed = sketches + rng.normal(0, 0.8, size=sketches.shape)
+    radii = [3.0, 0.5, 1.5, 6.0, 1.0]
+
+    # A small block size forces partial and diagonal blocks
+    rates = evaluate_acceptance_radii(sketches, perturbed, radii, block_size=16)
+
+    n = len(sketches)
+    for k, radius in enumerate(radii):
+        genuine = [np.linalg.norm(perturbed[i] - sketches[i]) <= radius for i in range(n)]
+        impostor = [np.linalg.norm(perturbed[i] - sketches[j]) <= radius for i in range(n) for j in range(n) if i != j]
+        enrolled = [np.linalg.norm(sketches[i] - sketches[j]) <= radius for i in range(n) for j in range(i + 1, n)]
+
+        assert np.isclose(rates["fnmr"][k], 1 - np.mean(genuine))
+        assert np.isclose(rates["fmr"][k], np.mean(impostor))
+        assert np.isclose(rates["confmr"][k], np.mean(enrolled))
+
+
+def test_confmr_only():
+    sketches = np.array([[0.0, 0.0], [1.0, 0.0], [5.0, 0.0]])
+    rates = evaluate_acceptance_radii(sketches, None, [1.0, 10.0])
+    assert np.allclose(rates["confmr"], [1 / 3, 1.0])
+    assert "fnmr" not in rates
+
+
+def test_fuzzy_key_setting_matches_engine():
+    basis_vectors = [[1, 0], [0.5, np.sqrt(3) / 2]]
+    setting = FuzzyKeySetting(basis_vectors, 7, acceptance_radius=0.3)
+    assert setting.linear_sketch.modulus == 7
+    assert FuzzyKeySetting(setting.linear_sketch).linear_sketch is setting.linear_sketch
+
+    rng = np.random.default_rng(3)
+    fingerprints = rng.normal(0, 50, size=(40, 2))
+    sketches = np.array([setting.generate_sketch(fingerprint) for fingerprint in fingerprints])
+    perturbed = np.array([setting.generate_sketch(fingerprint) for fingerprint in fingerprints + rng.normal(0, 0.2, size=(40, 2))])
+    assert np.array_equal(sketches, setting.linear_sketch.sketch_batch(fingerprints)[0])
+
+    rates = evaluate_acceptance_radii(sketches, perturbed, [0.3])
+    assert setting.calculate_fnmr(sketches, perturbed) == rates["fnmr"][0]
+    assert setting.calculate_confmr(sketches) == rates["confmr"][0]
+    rejected = [not setting.is_within_acceptance_region(sketch, probe) for sketch, probe in zip(sketches, perturbed)]
+    assert 0 < np.mean(rejected) < 1
+    assert np.isclose(setting.calculate_fnmr(sketches, perturbed), np.mean(rejected))
@@ -0,0 +1,66 @@
+import numpy as np
+from Crypto.PublicKey import ECC
+from linear_sketch.linear_sketch import LinearSketch
+from signature.fuzzy_signature import batch_verify, fuzzy_sign, multi_scalar_mult, sign, verify
+from signature.key_generation import generate_key_pair
+
+
+def _key_pairs(count, seed=0):
+    rng = np.random.default_rng(seed)
+    lattice_basis = np.array([[1, 0], [0.5, np.sqrt(3) / 2]])
+    return [generate_key_pair(rng.normal(size=2), lattice_basis) for _ in range(count)]
+
+
+def test_sign_and_verify_with_fingerprint_keys():
+    """
+    A signature made with the key from a fingerprint sketch verifies, and tampering breaks it.
+    """
+    fingerprint = np.load("data/processed/fingerprints/fingerprint_1_processed_2.npy")
+    lattice_basis = np.array([[1, 0], [0.5, np.sqrt(3) / 2]])
+    linear_sketch = LinearSketch(lattice_basis, 7)
+    sketch, _ = linear_sketch.sketch(fingerprint)
+
+    message = b"transfer 10 tokens"
+    signature, public_key = fuzzy_sign(sketch, lattice_basis, message)
+
+    assert verify(public_key, message, signature)
+    assert not verify(public_key, b"transfer 99 tokens", signature)
+    tampered = signature[:-1] + bytes([signature[-1] ^ 1])
+    assert not verify(public_key, message, tampered)
+    other_key = _key_pairs(1, seed=5)[0]["public_key"]
+    assert not verify(other_key, message, signature)
+
+
+def test_multi_scalar_mult_matches_naive_sum():
+    """
+    Pippenger's method gives the same point as summing scalar multiples one by one.
+    """
+    generator = ECC._curves["P-256"].G
+    points = [generator * (i + 2) for i in range(20)]
+    scalars = [(7 ** i) % 2 ** 200 + i for i in range(20)]
+
+    expected = points[0] * scalars[0]
+    for point, scalar in zip(points[1:], scalars[1:]):
+        expected = expected + point * scalar
+
+    assert multi_scalar_mult(points, scalars) == expected
+
+
+def test_batch_verify():
+    """
+    A batch of valid signatures passes, and a single bad signature fails the whole batch.
+    """
+    key_pairs = _key_pairs(8)
+    items = []
+    for i in range(40):
+        key_pair = key_pairs[i % len(key_pairs)]
+        message = f"message {i}".encode()
+        items.append((message, sign(key_pair["private_key"], message), key_pair["public_key"]))
+
+    assert batch_verify(items)
+    assert batch_verify([])
+
+    message, signature, public_key = items[17]
+    forged = list(items)
+    forged[17] = (message + b"!", signature, public_key)
+    assert not batch_verify(forged)
@@ -1,5 +1,9 @@
 import numpy as np
-from signature.key_generation import generate_key_pair
+from Crypto.PublicKey import ECC
+from signature import fixed_base
+from signature.fixed_base import clone_point, encode_point, generator_table
+from hashlib import sha256
+from signature.key_generation import P256_ORDER, fuzzy_key_setting, fuzzy_key_setting_batch, generate_key_pair
 from linear_sketch.linear_sketch import LinearSketch
 
 def test_key_generation_with_fingerprints():
@@ -36,5 +40,65 @@ def test_key_generation_with_fingerprints():
     print(f"Private Key: {key_pair_2['private_key'].d}")
     print(f"Public Key: {key_pair_2['public_key'].pointQ}")
 
+def test_generator_table_matches_scalar_multiplication():
+    """
+    The fixed-base comb table agrees with pycryptodome's scalar multiplication, edge scalars included.
+    """
+    curve = ECC._curves["P-256"]
+    order = int(curve.order)
+    table = generator_table()
+    for scalar in (1, 2, 255, 256, 2 ** 128 + 7, order - 1, 0xDEADBEEF * 2 ** 200 + 12345):
+        assert table.multiply(scalar) == curve.G * scalar
+    assert table.multiply(order).is_point_at_infinity()
+
+
+def test_public_api_fallback_matches_raw_points(monkeypatch):
+    """
+    Without pycryptodome's internals, cloning and encoding fall back to the public EccPoint API with the same results.
+    """
+    point = ECC._curves["P-256"].G * 123456789
+    raw_clone, raw_bytes = clone_point(point), encode_point(point)
+    monkeypatch.setattr(fixed_base, "RAW_POINTS", False)
+    fallback_clone = clone_point(point)
+    assert fallback_clone == raw_clone and fallback_clone is not point
+    assert encode_point(point) == raw_bytes
+    assert raw_bytes == int(point.x).to_bytes(32, "big") + int(point.y).to_bytes(32, "big")
+
+
+def test_key_pair_matches_constructed_key():
+    """
+    Keys built from the comb table match the ones ECC.construct derives for the same private key.
+    """
+    lattice_basis = np.array([[1, 0], [0.5, np.sqrt(3) / 2]])
+    key_pair = generate_key_pair(np.array([0.25, -0.125]), lattice_basis)
+    expected = ECC.construct(curve="P-256", d=int(key_pair["private_key"].d))
+    assert key_pair["public_key"] == expected.public_key()
+    assert key_pair["private_key"] == expected
+
+
+def test_fuzzy_key_setting_encodings():
+    """
+    Version 0 reproduces the legacy text hash; version 1 is batchable and ignores numpy print options.
+    """
+    rng = np.random.default_rng(0)
+    lattice_basis = np.array([[1, 0], [0.5, np.sqrt(3) / 2]])
+    sketches = rng.normal(0, 1, size=(20, 300))
+    order = int(ECC._curves["P-256"].order)
+
+    legacy_text = ",".join(map(str, np.concatenate((sketches[0], lattice_basis.flatten()))))
+    legacy_key = int(sha256(legacy_text.encode()).hexdigest(), 16) % order
+    assert fuzzy_key_setting(sketches[0], lattice_basis, encoding_version=0) == legacy_key
+
+    keys = [fuzzy_key_setting(sketch, lattice_basis) for sketch in sketches]
+    assert fuzzy_key_setting_batch(sketches, lattice_basis) == keys
+    assert len(set(keys)) == len(keys)
+    with np.printoptions(legacy="1.13", precision=3):
+        assert fuzzy_key_setting(sketches[0], lattice_basis) == keys[0]
+
+
+def test_p256_order_constant():
+    assert P256_ORDER == int(ECC._curves["P-256"].order)
+
+
 if __name__ == "__main__":
     test_key_generation_with_fingerprints()